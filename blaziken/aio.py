@@ -0,0 +1,861 @@
+"""
+Module with the asyncio counterparts of :class:`~blaziken.api.BackBlazeB2` and of the
+object-oriented models, so that many B2 operations can run concurrently on a single event loop
+instead of being wrapped in threads.
+
+.. note::
+
+    This module requires the optional `aiohttp <https://docs.aiohttp.org/>`_ package, which can be
+    installed with ``pip install blaziken[async]``.
+
+ """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from asyncio import Queue
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import create_task
+from asyncio import gather
+from asyncio import get_running_loop
+from contextlib import asynccontextmanager
+from functools import partial
+from pathlib import Path
+from threading import Lock
+from urllib.parse import quote
+# Third-party imports
+try:
+    from aiohttp import BasicAuth
+    from aiohttp import ClientError
+    from aiohttp import ClientSession
+    from aiohttp import ClientTimeout
+    from aiohttp import TCPConnector
+except ImportError:  # pragma: no cover  # aiohttp is an optional dependency
+    ClientSession = None
+# Project imports
+from blaziken import __project__
+from blaziken import __version__
+from blaziken.api import BackBlazeB2
+from blaziken.api import BaseBackBlazeB2
+from blaziken.constants import ONE_MB
+from blaziken.enums import BucketType
+from blaziken.enums import Endpoints
+from blaziken.exceptions import BlazeError
+from blaziken.exceptions import BucketError
+from blaziken.exceptions import FileError
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.exceptions import ResponseError
+from blaziken.models import Bucket
+from blaziken.models import File
+from blaziken.pool import UploadUrlPool
+from blaziken.utils import FileRange
+from blaziken.utils import check_b2_errors
+from blaziken.utils import check_status
+from blaziken.utils import content_sha1
+from blaziken.utils import json_decode
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from aiohttp import ClientResponse
+    from blaziken.meta import Json
+    from typing import Any
+    from typing import AsyncGenerator
+    from typing import BinaryIO
+    from typing import Dict
+    from typing import List
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+    AsyncUploadGenerator = AsyncGenerator[Tuple[Json, int, int], None]
+
+
+class AsyncResponse:
+    """
+    The response of a request made by AsyncHttp, with its body already read.
+
+    :ivar status: The HTTP status code of the response.
+    :ivar headers: The headers of the response.
+    :ivar body: The raw body of the response.
+    """
+
+    def __init__(self, status:int, headers:Dict[str, str], body:bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class AsyncHttp:
+    """
+    Class for making asynchronous HTTP requests, the asyncio counterpart of
+    :class:`~blaziken.http.Http`. Requests are made through a single aiohttp session, which keeps
+    the connections to each host alive so they are reused by the following requests.
+
+    :ivar timeout: The default timeout, in seconds, for the HTTP requests.
+    :ivar limit: The maximum number of simultaneous connections, 0 for no limit.
+    :ivar limit_per_host: The maximum number of simultaneous connections to each host, 0 for no
+                          limit.
+    :ivar keep_alive: True to keep connections open after a request, False to close them.
+    """
+
+    def __init__(self, timeout:float=8.0, limit:int=100, limit_per_host:int=0,
+                 keep_alive:bool=True):
+        if ClientSession is None:
+            raise ImportError('The aiohttp package is required for asynchronous requests. '
+                              'Install it with "pip install blaziken[async]".')
+        self.timeout = timeout  # in seconds
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self._session:Optional[ClientSession] = None
+
+    async def __aenter__(self) -> AsyncHttp:
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    @property
+    def session(self) -> ClientSession:
+        """ Gets the session used to make the requests, creating it on first use. """
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                     force_close=not self.keep_alive)
+            self._session = ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """ Closes all pooled connections. A new session will be created if a request is made. """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _request_kwargs(self, kwargs:Dict[str, Any]) -> Dict[str, Any]:
+        """ Converts the timeout (in seconds) and basic auth tuple to their aiohttp objects. """
+        kwargs['timeout'] = ClientTimeout(total=kwargs.pop('timeout', self.timeout))
+        if isinstance(kwargs.get('auth'), tuple):
+            kwargs['auth'] = BasicAuth(*kwargs['auth'])
+        return kwargs
+
+    async def _do_request(self, method:str, url:str, **kwargs) -> AsyncResponse:
+        """
+        Makes an arbitrary HTTP request, reads its body and checks for errors.
+
+        :raises InternetError: If there is no internet connection available.
+        :raises RequestError: If the request contains errors.
+        """
+        try:
+            async with self.session.request(method, url,
+                                            **self._request_kwargs(kwargs)) as response:
+                result = AsyncResponse(response.status, dict(response.headers),
+                                       await response.read())
+        except (ClientError, AsyncTimeoutError) as error:
+            raise InternetError('No internet connection available') from error
+        check_status(result.status, result.body.decode('utf8', errors='replace'))
+        return result
+
+    async def get(self, url:str, **kwargs) -> AsyncResponse:
+        """
+        Makes a HTTP GET request and checks for errors.
+
+        :raises InternetError: If there is no internet connection available.
+        :raises RequestError: If the request contains errors.
+        """
+        return await self._do_request('GET', url, **kwargs)
+
+    async def post(self, url:str, **kwargs) -> AsyncResponse:
+        """
+        Makes a HTTP POST request and checks for errors.
+
+        :raises InternetError: If there is no internet connection available.
+        :raises RequestError: If the request contains errors.
+        """
+        return await self._do_request('POST', url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method:str, url:str,
+                     **kwargs) -> AsyncGenerator[ClientResponse, None]:
+        """
+        Makes a HTTP request without reading its body, so it can be streamed by the caller.
+
+        :raises InternetError: If there is no internet connection available.
+        :raises RequestError: If the request contains errors.
+        """
+        try:
+            async with self.session.request(method, url,
+                                            **self._request_kwargs(kwargs)) as response:
+                if response.status >= 400:
+                    check_status(response.status, await response.text(errors='replace'))
+                yield response
+        except (ClientError, AsyncTimeoutError) as error:
+            raise InternetError('No internet connection available') from error
+
+
+class AsyncUploadUrlPool:
+    """
+    Asyncio counterpart of :class:`~blaziken.pool.UploadUrlPool`, which keeps the upload URLs in
+    a wrapped UploadUrlPool and only requests new ones asynchronously.
+    """
+
+    def __init__(self, api:AsyncBackBlazeB2):
+        """
+        :param api: The AsyncBackBlazeB2 instance used to obtain new upload URLs.
+        """
+        self._api = api
+        self._pool = UploadUrlPool(api)
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    async def acquire(self, bucket_id:str) -> Json:
+        """
+        Checks out an upload URL of a bucket, requesting a new one if none is available.
+
+        :param bucket_id: The id of the bucket where files will be uploaded.
+        :returns: A json-like 3-dict containing the keys: bucketId, uploadUrl, authorizationToken.
+        """
+        upload_data = self._pool.take(bucket_id)
+        return upload_data if upload_data is not None else \
+            await self._api.get_upload_url(bucket_id)
+
+    def release(self, bucket_id:str, upload_data:Json):
+        """ Same as :func:`UploadUrlPool.release() <blaziken.pool.UploadUrlPool.release>`. """
+        self._pool.release(bucket_id, upload_data)
+
+    def clear(self, bucket_id:Optional[str]=None):
+        """ Same as :func:`UploadUrlPool.clear() <blaziken.pool.UploadUrlPool.clear>`. """
+        self._pool.clear(bucket_id)
+
+    @staticmethod
+    def must_discard(error:Exception) -> bool:
+        """
+        Same as :func:`UploadUrlPool.must_discard() <blaziken.pool.UploadUrlPool.must_discard>`.
+        """
+        return UploadUrlPool.must_discard(error)
+
+    @asynccontextmanager
+    async def checkout(self, bucket_id:str) -> AsyncGenerator[Json, None]:
+        """
+        Checks out an upload URL for the duration of the context. The URL is returned to the pool
+        if the context exits successfully (or the error does not invalidate the URL).
+        """
+        upload_data = await self.acquire(bucket_id)
+        try:
+            yield upload_data
+        except Exception as error:
+            if not self.must_discard(error):
+                self.release(bucket_id, upload_data)
+            raise
+        self.release(bucket_id, upload_data)
+
+
+async def _iter_file_range(data:FileRange, block_size:int=65536) -> AsyncGenerator[bytes, None]:
+    """
+    Yields the content of a file range block by block, to be streamed as a request body. The
+    blocks are read in the default executor, so the event loop is not blocked by the disk.
+    """
+    loop = get_running_loop()
+    data.seek(0)
+    while True:
+        block = await loop.run_in_executor(None, data.read, block_size)
+        if not block:
+            break
+        yield block
+
+
+def _model_field(name:str) -> property:
+    """
+    Creates a property of an asyncio model that gets (and sets) a field of the synchronous model
+    it wraps, so the json-encoded data is only decoded by the synchronous models.
+    """
+    # pylint: disable = protected-access
+    def getter(model):
+        return getattr(model._model, name)
+
+    def setter(model, value):
+        setattr(model._model, name, value)
+
+    return property(getter, setter, doc=f'Same as the "{name}" field of the synchronous model.')
+
+
+class AsyncBackBlazeB2(BaseBackBlazeB2):
+    """
+    Asyncio counterpart of :class:`~blaziken.api.BackBlazeB2`.
+    Methods have the same parameters and return values as their BackBlazeB2 counterparts, but must
+    be awaited (or iterated with "async for", for the upload and download generators).
+    Authentication cannot happen during initialization, await AsyncBackBlazeB2.authenticate().
+
+    :example:
+
+    >>> async with AsyncBackBlazeB2('key_id', 'app_key') as api:
+    >>>     await api.authenticate()
+    >>>     async for result, part_number, total in api.upload(Path('file'), 'name', bucket_id=id):
+    >>>         print(f'Uploaded part {part_number} of {total}')
+
+    """
+
+    def __init__(self, account_id:Optional[str]=None, app_key:Optional[str]=None,
+                 http:Optional[AsyncHttp]=None):
+        """
+        :param account_id: The backblaze account id.
+        :param app_key: The API master key.
+        :param http: An AsyncHttp object for making HTTP requests.
+        """
+        super().__init__(account_id, app_key)
+        self._http = http if http else AsyncHttp()
+        self._upload_urls = AsyncUploadUrlPool(self)
+
+    async def __aenter__(self) -> AsyncBackBlazeB2:
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    @property
+    def upload_urls(self) -> AsyncUploadUrlPool:
+        """ Gets the pool of upload URLs reused by single-part uploads. """
+        return self._upload_urls
+
+    # region Utility methods
+    async def close(self):
+        """ Closes the pooled connections used by the instance. """
+        await self._http.close()
+
+    async def _api_post(self, endpoint:Endpoints, params:Json, error_message:str,
+                        **kwargs) -> Json:
+        """
+        Makes a request to an endpoint of the B2 API and decodes its json-encoded response.
+
+        :param endpoint: The endpoint to which the request is made.
+        :param params: The json-encoded body of the request.
+        :param error_message: The message of the exception raised if the response has errors.
+        :returns: A dict with the json-encoded response data.
+        :raises RequestError: If the user is not authenticated.
+        :raises ResponseError: If the server returned an error.
+        """
+        self._ensure_auth()
+        response = await self._http.post(self._make_url(endpoint.value), json=params,
+                                         headers=self._headers(), **kwargs)
+        data = json_decode(response.body)
+        check_b2_errors(data, f'{error_message} ({data.get("message", "")}).')
+        return data
+    # endregion
+
+    # region B2 Api methods
+    async def authenticate(self, account_id:Optional[str]=None,
+                           app_key:Optional[str]=None) -> Json:
+        """ Same as :func:`BackBlazeB2.authenticate() <blaziken.api.BackBlazeB2.authenticate>`. """
+        self.account_id = account_id or self.account_id
+        self.app_key = app_key or self.app_key
+        response = await self._http.get(self.BASE_URL + Endpoints.auth.value,
+                                        auth=(self.account_id, self.app_key))
+        data = json_decode(response.body)
+        check_b2_errors(data, f'Failed to authenticate with BackBlaze '
+                              f'(account_id={self.account_id}) ({data})')
+        self._use_authorization(data)
+        self._use_restrictions(data)
+        return data
+
+    async def create_bucket(self, bucket_name:str, private:bool,
+                            bucket_info:Optional[Json]=None, cors_rules:Optional[Json]=None,
+                            lifecycle_rules:Optional[Json]=None) -> Json:
+        """
+        Same as :func:`BackBlazeB2.create_bucket()
+        <blaziken.api.BackBlazeB2.create_bucket>`.
+        """
+        params = self._create_bucket_params(bucket_name, private, bucket_info, cors_rules,
+                                            lifecycle_rules)
+        # Endpoint /b2_create_bucket can take a long time to respond, a larger timeout is required
+        return await self._api_post(Endpoints.create_bucket, params,
+                                    f'Failed to create bucket "{bucket_name}"', timeout=90.0)
+
+    async def delete_bucket(self, bucket_id:str) -> Json:
+        """
+        Same as :func:`BackBlazeB2.delete_bucket()
+        <blaziken.api.BackBlazeB2.delete_bucket>`.
+        """
+        # Endpoint /b2_delete_bucket takes a long time to respond, so a larger timeout is warranted
+        return await self._api_post(Endpoints.delete_bucket,
+                                    {'accountId': self.account_id, 'bucketId': bucket_id},
+                                    f'Failed to delete bucket with id "{bucket_id}"', timeout=90.0)
+
+    async def list_buckets(self, bucket_id:Optional[str]=None, bucket_name:Optional[str]=None,
+                           bucket_types:Optional[str]=None) -> Json:
+        """ Same as :func:`BackBlazeB2.list_buckets() <blaziken.api.BackBlazeB2.list_buckets>`. """
+        params = {'accountId': self.account_id}
+        params.update({
+            'bucketId': bucket_id,
+            'bucketName': bucket_name,
+            'bucketTypes': bucket_types,
+        })
+        return await self._api_post(Endpoints.list_buckets, params, 'Failed to list buckets')
+
+    async def get_upload_url(self, bucket_id:str) -> Json:
+        """
+        Same as :func:`BackBlazeB2.get_upload_url() <blaziken.api.BackBlazeB2.get_upload_url>`,
+        but the URL is not stored in the instance.
+        """
+        return await self._api_post(Endpoints.get_upload_url, {'bucketId': bucket_id},
+                                    'Failed to get uploading authorization')
+
+    async def upload_file(self, data:Union[bytes, FileRange], upload_url:str, auth_token:str,
+                          file_name:str, content_type:str='',
+                          last_modified_ms:Optional[int]=None,
+                          info:Optional[Dict[str, str]]=None) -> Json:
+        """
+        Same as :func:`BackBlazeB2.upload_file() <blaziken.api.BackBlazeB2.upload_file>`.
+        File ranges are hashed in a worker thread, so the event loop is not blocked.
+        """
+        self._ensure_auth()
+        sha1 = await get_running_loop().run_in_executor(None, content_sha1, data)
+        headers = self._upload_file_headers(auth_token, file_name, content_type, len(data), sha1,
+                                            last_modified_ms, info)
+        body = _iter_file_range(data) if isinstance(data, FileRange) else data
+        response = await self._http.post(upload_url, data=body, headers=headers, timeout=None)
+        result = json_decode(response.body)
+        check_b2_errors(result, f'Failed to upload file "{file_name}": {result}')
+        return result
+
+    async def start_large_file(self, bucket_id:str, file_name:str, content_type:str='b2/x-auto',
+                               file_info:Optional[Json]=None) -> Json:
+        """
+        Same as :func:`BackBlazeB2.start_large_file()
+        <blaziken.api.BackBlazeB2.start_large_file>`.
+        """
+        params = self._start_large_file_params(bucket_id, file_name, content_type, file_info)
+        return await self._api_post(Endpoints.start_large_file, params,
+                                    'Failed to start large file upload')
+
+    async def get_upload_part_url(self, file_id:str) -> Json:
+        """
+        Same as :func:`BackBlazeB2.get_upload_part_url()
+        <blaziken.api.BackBlazeB2.get_upload_part_url>`.
+        """
+        return await self._api_post(Endpoints.get_upload_part_url, {'fileId': file_id},
+                                    f'Failed to get upload part url for file "{file_id}"')
+
+    async def upload_part(self, data:Union[bytes, FileRange], upload_url:str, part_number:int,
+                          auth_token:str) -> Json:
+        """ Same as :func:`BackBlazeB2.upload_part() <blaziken.api.BackBlazeB2.upload_part>`. """
+        self._ensure_auth()
+        sha1 = await get_running_loop().run_in_executor(None, content_sha1, data)
+        headers = self._upload_part_headers(auth_token, part_number, len(data), sha1)
+        body = _iter_file_range(data) if isinstance(data, FileRange) else data
+        response = await self._http.post(upload_url, data=body, headers=headers, timeout=None)
+        result = json_decode(response.body)
+        check_b2_errors(result, f'Failed to upload file part number #{part_number}: {result}')
+        return result
+
+    async def finish_large_file(self, file_id:str, parts_sha1:List[str]) -> Json:
+        """
+        Same as :func:`BackBlazeB2.finish_large_file()
+        <blaziken.api.BackBlazeB2.finish_large_file>`.
+        """
+        return await self._api_post(Endpoints.finish_large_file,
+                                    {'fileId': file_id, 'partSha1Array': parts_sha1},
+                                    f'Failed to finish large file with id "{file_id}"')
+
+    async def cancel_large_file(self, file_id:str) -> Json:
+        """
+        Same as :func:`BackBlazeB2.cancel_large_file()
+        <blaziken.api.BackBlazeB2.cancel_large_file>`.
+        """
+        return await self._api_post(Endpoints.cancel_large_file, {'fileId': file_id},
+                                    f'Failed to cancel large file with id "{file_id}"')
+
+    async def list_files(self, prefix:Optional[str]=None, delimiter:Optional[str]=None,
+                         max_files:int=0, start_name:str='',
+                         bucket_id:Optional[str]=None) -> Json:
+        """ Same as :func:`BackBlazeB2.list_files() <blaziken.api.BackBlazeB2.list_files>`. """
+        params = self._list_files_params(prefix, delimiter, max_files, start_name, bucket_id)
+        return await self._api_post(
+            Endpoints.list_files, params,
+            f'Failed to get list files <prefix={prefix}, delimiter={delimiter}, '
+            f'start_name={start_name}, max_files={max_files}, bucket_id={bucket_id}>')
+
+    async def get_file_info(self, file_id:str) -> Json:
+        """
+        Same as :func:`BackBlazeB2.get_file_info()
+        <blaziken.api.BackBlazeB2.get_file_info>`.
+        """
+        return await self._api_post(Endpoints.file_info, {'fileId': quote(file_id)},
+                                    f'Failed to get files info <file_id={file_id}>')
+
+    async def get_download_auth(self, file_path_or_prefix:str, auth_duration:int,
+                                bucket_id:str='') -> str:
+        """
+        Same as :func:`BackBlazeB2.get_download_auth()
+        <blaziken.api.BackBlazeB2.get_download_auth>`.
+        """
+        params = {
+            'bucketId': bucket_id if bucket_id else self.bucket_id,
+            'fileNamePrefix': file_path_or_prefix,
+            'validDurationInSeconds': auth_duration,
+        }
+        data = await self._api_post(
+            Endpoints.download_auth, params,
+            f'Failed to get download auth for prefix "{file_path_or_prefix}"')
+        return data['authorizationToken']
+
+    async def delete_file(self, file_id:str, file_path:str) -> Json:
+        """ Same as :func:`BackBlazeB2.delete_file() <blaziken.api.BackBlazeB2.delete_file>`. """
+        return await self._api_post(
+            Endpoints.delete_file, {'fileName': file_path, 'fileId': file_id},
+            f'Failed to delete file with id "{file_id}" and path "{file_path}"')
+    # endregion
+
+    # region Shortcut methods
+    async def iter_download(self, url:str, chunk_size:int=ONE_MB, start:int=0,
+                            end:Optional[int]=None) -> AsyncGenerator[bytes, None]:
+        """
+        Same as :func:`BackBlazeB2.iter_download()
+        <blaziken.api.BackBlazeB2.iter_download>`.
+        """
+        self._ensure_auth()
+        headers = self._headers()
+        if start or end is not None:
+            headers['Range'] = f'bytes={start}-{"" if end is None else end}'
+        async with self._http.stream('GET', url, headers=headers, timeout=None) as response:
+            if 'Range' in headers and response.status != 206:
+                raise RequestError(f'Server did not honor the range {headers["Range"]} of {url}',
+                                   response.status)
+            try:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+            except (ClientError, AsyncTimeoutError) as error:
+                raise InternetError(f'Connection lost while downloading {url}') from error
+
+    async def download_file(self, url:str, save_path:Union[str, Path], chunk_size:int=ONE_MB):
+        """
+        Downloads a file from the server to the file system, streaming it in chunks.
+        Parameters are the same as :func:`BackBlazeB2.download_file()
+        <blaziken.api.BackBlazeB2.download_file>`.
+        """
+        loop = get_running_loop()  # The disk is accessed in the executor, not in the event loop
+        await loop.run_in_executor(None, partial(Path(save_path).parent.mkdir, parents=True,
+                                                 exist_ok=True))
+        file_handle = await loop.run_in_executor(None, open, save_path, 'wb')
+        try:
+            async for chunk in self.iter_download(url, chunk_size):
+                await loop.run_in_executor(None, file_handle.write, chunk)
+        finally:
+            await loop.run_in_executor(None, file_handle.close)
+
+    async def upload_large_file(self, file_or_path:Union[BinaryIO, Path], file_name:str,
+                                file_size:int=0, bucket_id:str='',
+                                workers:int=0) -> AsyncUploadGenerator:
+        """
+        Same as :func:`BackBlazeB2.upload_large_file()
+        <blaziken.api.BackBlazeB2.upload_large_file>`, with the workers running as tasks.
+        """
+        self._ensure_auth()
+        is_path = isinstance(file_or_path, (str, Path))
+        if not is_path and not file_size:
+            raise ValueError("You must specify the file size when uploading an opened file")
+        size, parts_count, parts_size = self.plan_parts(file_or_path if is_path else file_size,
+                                                        workers)
+        file_id = (await self.start_large_file(bucket_id if bucket_id else self.bucket_id,
+                                               file_name))['fileId']
+        loop = get_running_loop()  # The disk is accessed in the executor, not in the event loop
+        file_handle = await loop.run_in_executor(None, open, file_or_path, 'rb') if is_path \
+            else file_or_path
+        parts = Queue()
+        results = Queue()
+        start = file_handle.tell()
+        lock = Lock()  # The parts are read concurrently by the executor threads
+        for i in range(parts_count):
+            parts.put_nowait((i + 1, FileRange(file_handle, start + i * parts_size,
+                                               min(parts_size, size - i * parts_size), lock)))
+
+        async def work():
+            try:
+                upload_url_data = await self.get_upload_part_url(file_id)
+                while not parts.empty():
+                    part_number, data = parts.get_nowait()
+                    await results.put((await self.upload_part(
+                        data, upload_url_data['uploadUrl'], part_number,
+                        upload_url_data['authorizationToken']), part_number))
+            except Exception as error:  # pylint: disable = broad-except  # Re-raised by the caller
+                await results.put((error, 0))
+
+        tasks = [create_task(work())
+                 for _ in range(min(workers if workers else self.upload_workers, parts_count))]
+        try:
+            parts_sha1 = [''] * parts_count
+            for _ in range(parts_count):
+                upload_result, part_number = await results.get()
+                if isinstance(upload_result, Exception):
+                    raise upload_result
+                parts_sha1[part_number - 1] = upload_result['contentSha1']
+                yield (upload_result, part_number, parts_count)
+            yield (await self.finish_large_file(file_id, parts_sha1), 0, parts_count)
+        except BlazeError:
+            await self.cancel_large_file(file_id)
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            if is_path:
+                await loop.run_in_executor(None, file_handle.close)
+
+    async def upload(self, file_or_path:Union[str, Path, BinaryIO], file_name:str='',
+                     append_filename:bool=False, file_size:int=0,
+                     bucket_id:str='') -> AsyncUploadGenerator:
+        """
+        Same as :func:`BackBlazeB2.upload() <blaziken.api.BackBlazeB2.upload>`, but it is an
+        asynchronous generator that must be iterated with "async for".
+        """
+        self._ensure_auth()
+        is_path = isinstance(file_or_path, (str, Path))
+        if is_path:
+            file_or_path = Path(file_or_path)
+            if not file_name:
+                file_name = file_or_path.name
+            elif append_filename:
+                file_name = self.append_filename(file_name, file_or_path.name)
+        elif not file_size:
+            raise ValueError('File size must be specified when uploading an opened file')
+        else:
+            file_or_path.seek(0)
+        bucket_id = bucket_id if bucket_id else self.bucket_id
+        size, parts_count, _ = self.plan_parts(file_or_path if is_path else file_size)
+        if parts_count > 1:
+            async for progress in self.upload_large_file(file_or_path, file_name, size,
+                                                         bucket_id):
+                yield progress
+            return
+        loop = get_running_loop()  # The disk is accessed in the executor, not in the event loop
+        file_handle = await loop.run_in_executor(None, open, file_or_path, 'rb') if is_path \
+            else file_or_path
+        try:
+            async with self._upload_urls.checkout(bucket_id) as upload_data:
+                result = await self.upload_file(
+                    FileRange(file_handle, file_handle.tell(), size, Lock()),
+                    upload_data['uploadUrl'], upload_data['authorizationToken'], file_name)
+        finally:
+            if is_path:
+                await loop.run_in_executor(None, file_handle.close)
+        yield (result, 0, 1)
+    # endregion
+
+
+class AsyncB2Objects:
+    """ Asyncio counterpart of :class:`~blaziken.models.B2Objects`. """
+
+    def __init__(self, account_id:str, app_key:str, http:Optional[AsyncHttp]=None):
+        self._api = AsyncBackBlazeB2(account_id, app_key, http)
+
+    async def __aenter__(self) -> AsyncB2Objects:
+        return self
+
+    async def __aexit__(self, *_):
+        await self._api.close()
+
+    @property
+    def api(self) -> AsyncBackBlazeB2:
+        """ Gets the AsyncBackBlazeB2 instance used to make the requests. """
+        return self._api
+
+    async def authenticate(self, account_id:Optional[str]=None,
+                           app_key:Optional[str]=None) -> Dict[str, Any]:
+        """ Same as :func:`B2Objects.authenticate() <blaziken.models.B2Objects.authenticate>`. """
+        return await self._api.authenticate(account_id, app_key)
+
+    async def buckets(self) -> List[AsyncBucket]:
+        """ Lists all existing buckets in the authenticated account. """
+        return [AsyncBucket(self._api, bucket_info)
+                for bucket_info in (await self._api.list_buckets()).get('buckets', [])]
+
+    async def bucket(self, name:str='', bucket_id:str='') -> AsyncBucket:
+        """ Same as :func:`B2Objects.bucket() <blaziken.models.B2Objects.bucket>`. """
+        if self._api.limited_account:
+            return AsyncBucket(self._api, {'bucketName': self._api.bucket_name,
+                                           'bucketId': self._api.bucket_id})
+        response = (await self._api.list_buckets(
+            bucket_id if bucket_id else None, name if name else None)).get('buckets', [])
+        if not response:
+            raise BucketError(f'No bucket exists with name "{name}" or id "{bucket_id}".')
+        return AsyncBucket(self._api, response[0])
+
+    async def create_bucket(self, bucket_name:str, private:bool, bucket_info=None,
+                            cors_rules=None, lifecycle_rules=None) -> AsyncBucket:
+        """ Same as :func:`B2Objects.create_bucket() <blaziken.models.B2Objects.create_bucket>`. """
+        return AsyncBucket(self._api, await self._api.create_bucket(
+            bucket_name, private, bucket_info, cors_rules, lifecycle_rules))
+
+
+class AsyncBucket:
+    """
+    Asyncio counterpart of :class:`~blaziken.models.Bucket`. All methods that make requests must
+    be awaited (or iterated with "async for", for the generators). The fields of the bucket (e.g.:
+    its id, name and type) are those of a wrapped Bucket, which is never used to make requests.
+    The batch operations of Bucket (e.g.: syncing or deleting many files) are not available, as
+    they run on threads, use the synchronous models for them.
+    """
+
+    id = _model_field('id')
+    name = _model_field('name')
+    info = _model_field('info')
+    type = _model_field('type')
+    cors = _model_field('cors')
+    life_cycle = _model_field('life_cycle')
+    options = _model_field('options')
+    revision = _model_field('revision')
+
+    def __init__(self, api:AsyncBackBlazeB2, data:Dict[str, Any]):
+        self._api = api
+        self._model = Bucket(None, data)
+        self._next_files = None
+        self._next_params = tuple()
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}:{self.id}> {self.name}'
+
+    @property
+    def api(self) -> AsyncBackBlazeB2:
+        """ Gets the AsyncBackBlazeB2 instance used to make the requests. """
+        return self._api
+
+    async def files(self, prefix:str='', delimiter:str=BackBlazeB2.FOLDER_DELIMITER,
+                    max_files:int=BackBlazeB2.DEFAULT_FILE_COUNT,
+                    start_name:str='') -> List[AsyncFile]:
+        """ Same as :func:`Bucket.files() <blaziken.models.Bucket.files>`. """
+        results = await self._api.list_files(prefix, delimiter, max_files, start_name, self.id)
+        self._next_files = results.get('nextFileName')
+        self._next_params = (prefix, delimiter, max_files) if self._next_files else tuple()
+        return [AsyncFile(self._api, self, file_info) for file_info in results.get('files', [])]
+
+    async def more_files(self) -> AsyncGenerator[List[AsyncFile], None]:
+        """ Same as :func:`Bucket.more_files() <blaziken.models.Bucket.more_files>`. """
+        while self._next_files and self._next_params:
+            more_files = await self.files(*self._next_params, self._next_files)
+            if not more_files:
+                break
+            yield more_files
+
+    async def all_files(self, prefix:str='', delimiter:Optional[str]=None,
+                        max_files:int=BackBlazeB2.DEFAULT_FILE_COUNT,
+                        start_name:str='') -> AsyncGenerator[AsyncFile, None]:
+        """
+        Same as :func:`Bucket.all_files() <blaziken.models.Bucket.all_files>`.
+        The pagination state is kept in the generator, so concurrent listings do not interfere.
+        """
+        while True:
+            results = await self._api.list_files(prefix, delimiter, max_files, start_name,
+                                                 self.id)
+            for file_info in results.get('files', []):
+                yield AsyncFile(self._api, self, file_info)
+            start_name = results.get('nextFileName')
+            if not start_name or not results.get('files'):
+                break
+
+    async def folder(self, name:str, delimiter:Optional[str]=BackBlazeB2.FOLDER_DELIMITER,
+                     max_files:int=BackBlazeB2.DEFAULT_FILE_COUNT) -> List[AsyncFile]:
+        """ Same as :func:`Bucket.folder() <blaziken.models.Bucket.folder>`. """
+        return await self.files(name if name.endswith(delimiter) else f'{name}{delimiter}',
+                                delimiter, max_files)
+
+    async def file(self, file_id:str='', file_name:str='') -> AsyncFile:
+        """ Same as :func:`Bucket.file() <blaziken.models.Bucket.file>`. """
+        if file_name:
+            try:
+                return (await self.files(max_files=1, start_name=file_name))[0]
+            except IndexError as exc:
+                raise FileError(
+                    f'No file exists with name "{file_name}" in bucket "{self.name}".') from exc
+        try:
+            return AsyncFile(self._api, self, await self._api.get_file_info(file_id))
+        except ResponseError as exc:
+            raise FileError(f'No file exists with id "{file_id}" in bucket "{self.name}".') from exc
+
+    async def delete(self):
+        """ Deletes the bucket. """
+        await self._api.delete_bucket(self.id)
+
+    async def upload_iter(self, file_or_path:Union[str, Path, BinaryIO], file_name:str='',
+                          append_filename:bool=False,
+                          file_size:int=0) -> AsyncUploadGenerator:
+        """ Same as :func:`Bucket.upload_iter() <blaziken.models.Bucket.upload_iter>`. """
+        async for progress in self._api.upload(file_or_path, file_name, append_filename,
+                                               file_size, self.id):
+            yield progress
+
+    async def upload(self, file_or_path:Union[str, Path, BinaryIO], file_name:str='',
+                     append_filename:bool=False, file_size:int=0) -> AsyncFile:
+        """ Same as :func:`Bucket.upload() <blaziken.models.Bucket.upload>`. """
+        result = None
+        async for result, _, _ in self.upload_iter(file_or_path, file_name, append_filename,
+                                                   file_size):
+            pass
+        return AsyncFile(self._api, self, result)
+
+
+class AsyncFile:
+    """
+    Asyncio counterpart of :class:`~blaziken.models.File`. All methods that make requests must be
+    awaited (or iterated with "async for", for the generators). The fields of the file are those
+    of a wrapped File, which is never used to make requests, so they are decoded lazily as well.
+    """
+
+    __slots__ = ('_api', 'bucket', '_model')
+    id = _model_field('id')
+    name = _model_field('name')
+    size = _model_field('size')
+    md5 = _model_field('md5')
+    sha1 = _model_field('sha1')
+    content_type = _model_field('content_type')
+    timestamp = _model_field('timestamp')
+    upload_time = _model_field('upload_time')
+    extra = _model_field('extra')
+    action = _model_field('action')
+    data = _model_field('data')
+    extension = _model_field('extension')
+    base_name = _model_field('base_name')
+    is_folder = _model_field('is_folder')
+
+    def __init__(self, api:AsyncBackBlazeB2, bucket:AsyncBucket, data:Dict[str, Any]):
+        self._api = api
+        self.bucket = bucket
+        self._model = File(None, None, data)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}:{self.id[:5]}...{self.id[-5:]}> {self.name}'
+
+    @property
+    def api(self) -> AsyncBackBlazeB2:
+        """ Gets the AsyncBackBlazeB2 instance used to make the requests. """
+        return self._api
+
+    @property
+    def url(self) -> str:
+        """ Gets the download URL of the file, without authorization. """
+        return f'{self._api.download_url}/file/{self.bucket.name}/{self.name}'
+
+    async def download_url(self, token_duration:int=File.AUTH_TOKEN_DURATION) -> str:
+        """ Same as :func:`File.download_url() <blaziken.models.File.download_url>`. """
+        if self.bucket.type == BucketType.public:
+            return self._api.download_url_path(self.name, bucket_name=self.bucket.name)
+        auth_token = await self._api.get_download_auth(self.name, token_duration, self.bucket.id)
+        return self._api.download_url_path(self.name, auth_token, self.bucket.name)
+
+    async def download(self, save_path:Path, chunk_size:int=ONE_MB) -> Path:
+        """ Same as :func:`File.download() <blaziken.models.File.download>`. """
+        path = save_path / self.base_name if save_path.is_dir() else save_path
+        await self._api.download_file(await self.download_url(), path, chunk_size)
+        return path
+
+    async def iter_content(self, chunk_size:int=ONE_MB) -> AsyncGenerator[bytes, None]:
+        """ Same as :func:`File.iter_content() <blaziken.models.File.iter_content>`. """
+        async for chunk in self._api.iter_download(await self.download_url(), chunk_size):
+            yield chunk
+
+    async def delete(self):
+        """ Deletes the file version. """
+        await self._api.delete_file(self.id, self.name)
@@ -13,23 +13,52 @@ Module with BackBlaze B2 WebService API integration.
 from __future__ import annotations
 from typing import TYPE_CHECKING
 # Built-in imports
-from hashlib import sha1
-from json import loads as json_loads
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from functools import partial
+from os import replace
 from pathlib import Path
+from queue import Empty
+from queue import Queue
+from tempfile import NamedTemporaryFile
+from threading import Event
+from threading import Lock
+from threading import Timer
+from time import monotonic
+from time import time
+from weakref import finalize
+from weakref import ref
 from urllib.parse import quote
 # Third-party imports
 from requests.auth import HTTPBasicAuth
+from requests.exceptions import RequestException
 # Project imports
 from blaziken import __project__
 from blaziken import __version__
+from blaziken.cache import AuthCache
+from blaziken.cache import DownloadAuthCache
+from blaziken.cache import ListingCache
+from blaziken.checkpoint import DownloadCheckpoint
 from blaziken.constants import FIVE_GB
 from blaziken.constants import FIVE_MB
 from blaziken.constants import HUNDRED_MB
+from blaziken.constants import MAX_LARGE_FILE_PARTS
+from blaziken.constants import ONE_MB
 from blaziken.enums import Endpoints
 from blaziken.exceptions import BlazeError
+from blaziken.exceptions import InternetError
 from blaziken.exceptions import RequestError
+from blaziken.exceptions import ResponseError
 from blaziken.http import Http
+from blaziken.pool import UploadUrlPool
+from blaziken.utils import FileRange
+from blaziken.utils import JsonArrayStream
 from blaziken.utils import check_b2_errors
+from blaziken.utils import content_sha1
+from blaziken.utils import file_sha1
+from blaziken.utils import json_decode
+from blaziken.utils import plan_upload_parts
 from blaziken.utils import python_version_string
 from blaziken.utils import upload_parts_count
 from blaziken.utils import valid_bucket_name
@@ -39,54 +68,37 @@ if TYPE_CHECKING:
     from blaziken.enums import KeyCapabilities
     from blaziken.meta import Json
     from blaziken.meta import UploadGenerator
+    from blaziken.retry import RetryPolicy
     from requests.models import Response
     from typing import Any
     from typing import BinaryIO
+    from typing import Callable
     from typing import Dict
+    from typing import Generator
+    from typing import Iterable
     from typing import List
+    from typing import Mapping
     from typing import Optional
     from typing import Tuple
     from typing import Union
+    from weakref import ReferenceType
 
 
 # https://www.backblaze.com/b2/docs/integration_checklist.html
 
 
-class BackBlazeB2():
-    """
-    Class that manages files and authentication on BackBlaze's B2 service.
-    To find out the structure of the JSON-encoded responses, check B2's documentation:
-    https://www.backblaze.com/b2/docs/
-
-    Class constants:
-
-    :cvar BUCKET_NAME_MAX_SIZE: The maximum size of the name of a bucket.
-    :cvar BUCKET_NAME_MIN_SIZE: The minimum size of the name of a bucket.
-    :cvar BUCKET_TYPE_PRIVATE: String defining that a bucket is private.
-    :cvar BUCKET_TYPE_PUBLIC: String defining that a bucket is public.
-    :cvar FOLDER_DELIMITER: Default delimiter for virtual folders.
-    :cvar MAX_LIST_FILES: Absolute maximum of files able to be retrieved in a single request.
-    :cvar DEFAULT_FILE_COUNT: Default number of files to be retrieved in a single request.
+def _refresh_auth(api_ref:ReferenceType):
+    """ Refreshes the authorization of an api in the background, unless it no longer exists. """
+    api = api_ref()
+    if api is not None:
+        api.refresh_auth()
 
-    Instance variables:
 
-    :ivar account_id: The id of the account.
-    :ivar app_key: A key for accessing the API.
-    :ivar api_url: The URL provided by the B2 authentication service to access the API.
-    :ivar auth_token: The authentication token returned by the B2 authentication service.
-    :ivar download_url: The file download URL provided by the B2 authentication service.
-    :ivar upload_url: The file upload URL provided by the B2 authentication service.
-    :ivar upload_token: The upload token provided by the B2 authentication service.
-    :ivar delimiter: The delimiter used to mark directory paths in the B2 service.
-    :ivar _bucket_id: The id of the bucket to which the upload token is related to.
-    :ivar _bucket_name: The name of the bucket to which the upload token is related to.
-    :ivar _prefix: Prefix to be prefixed to all files, restricts access to only files
-                   with the same prefix.
-    :ivar _http: The Http class used to make HTTP requests.
-    :ivar _useragent: The User-Agent header sent in HTTP requests to the B2 service.
-    :ivar _limited_account: True indicates that the current account is limited to certain buckets.
-    :ivar _capabilities: List of capabilities (permissions) of the current account.
-    :ivar _part_size: The minimum part size for large file uploads, in bytes.
+class BaseBackBlazeB2():
+    """
+    Base class of :class:`BackBlazeB2` and :class:`~blaziken.aio.AsyncBackBlazeB2`, with the state
+    and the methods that don't make requests, so that both clients build them the same way.
+    See BackBlazeB2 for the class constants and the instance variables.
     """
 
     API_VERSION = '/b2api/v2'
@@ -100,32 +112,27 @@ class BackBlazeB2():
     MAX_LIST_FILES = 10000
     DEFAULT_FILE_COUNT = 100
 
-    def __init__(self, account_id:Optional[str]=None, app_key:Optional[str]=None, auth:bool=False,
-                 http:Optional[Http]=None):
+    def __init__(self, account_id:Optional[str]=None, app_key:Optional[str]=None):
         """
         :param account_id: The backblaze account id.
         :param app_key: The API master key.
-        :param auth: True to authenticate during initialization, False to do it manually later.
-        :param http: An Http object for making HTTP requests.
         """
         self.account_id = account_id
         self.app_key = app_key
         self.api_url:Optional[str] = None
         self.auth_token:Optional[str] = None
         self.download_url:Optional[str] = None
-        self.upload_url:Optional[str] = None
-        self.upload_token:Optional[str] = None
         self.delimiter = self.FOLDER_DELIMITER
         self._bucket_id:Optional[str] = None
         self._bucket_name:Optional[str] = None
         self._prefix:str = ''
-        self._http = http if http else Http()
         self._useragent = f'{__project__}/{__version__}+python/{python_version_string()}'
         self._limited_account = False
         self._capabilities = []
-        self._part_size = HUNDRED_MB
-        if auth:
-            self.authenticate()
+        self._part_size = 0
+        self._recommended_part_size = HUNDRED_MB
+        self._minimum_part_size = FIVE_MB
+        self._upload_workers = 1
 
     @property
     def is_authenticated(self) -> bool:
@@ -154,8 +161,16 @@ class BackBlazeB2():
 
     @property
     def part_size(self) -> int:
-        """ Gets the size (in bytes) for each part of a large upload. """
-        return self._part_size
+        """
+        Gets the size (in bytes) for each part of a large upload, either the one set with
+        BackBlazeB2.set_part_size() or the one recommended by the service.
+        """
+        return self._part_size if self._part_size else self._recommended_part_size
+
+    @property
+    def upload_workers(self) -> int:
+        """ Gets the default number of parts of a large file uploaded concurrently. """
+        return self._upload_workers
 
     # region Utility methods
     def _ensure_auth(self):
@@ -165,8 +180,8 @@ class BackBlazeB2():
         :raises RequestError: If the user is not authenticated.
         """
         if not self.is_authenticated:
-            raise RequestError(
-                'User is not authenticated. Use BackBlazeB2.authenticate() to authenticate.')
+            raise RequestError(f'User is not authenticated. '
+                               f'Use {type(self).__name__}.authenticate() to authenticate.')
 
     def _headers(self) -> Dict[str, str]:
         """
@@ -225,31 +240,161 @@ class BackBlazeB2():
         return '{}{}{}'.format(source_name, '' if source_name.endswith(self.delimiter)
                                else self.delimiter, append_name)
 
-    def _upload_file_gen(self, *args, **kwargs) -> UploadGenerator:
+    def _use_authorization(self, data:Json):
         """
-        Calls BackBlazeB2.upload_file() and returns a generator.
-        This exists so that the various "upload" shortcut methods have the same return type.
+        Replaces the authorization token, the URLs and the part sizes with those of an authorization
+        of the account. The selected bucket and prefix are kept.
 
-        :returns: The file-uploading generator.
-        :yields: A 3-tuple containing (upload response, part number, total part count). The part
-                 number starts at 1, and if the upload is successfull, the final tuple will have
-                 part number 0 and the response will contain the finalized file data.
+        :param data: A dict with the json-encoded authorization.
         """
-        yield (self.upload_file(*args, **kwargs), 0, 1)
+        self.api_url = data['apiUrl']
+        self.auth_token = data['authorizationToken']
+        self.download_url = data['downloadUrl']
+        self._recommended_part_size = data.get('recommendedPartSize') or HUNDRED_MB
+        self._minimum_part_size = data.get('absoluteMinimumPartSize') or FIVE_MB
+
+    def _use_restrictions(self, data:Json):
+        """
+        Applies the capabilities and the bucket and prefix restrictions of an application key,
+        selecting the bucket and prefix the key is limited to, if any.
+
+        :param data: A dict with the json-encoded authorization.
+        """
+        allowed = data.get('allowed', {})
+        self._capabilities = allowed.get('capabilities', [])
+        allowed_bucket_id = allowed.get('bucketId', '')
+        allowed_bucket_name = allowed.get('bucketName', '')
+        if allowed_bucket_id:
+            self._bucket_id = allowed_bucket_id
+            self._limited_account = True
+        if allowed_bucket_name:
+            self._bucket_name = allowed_bucket_name
+            self._limited_account = True
+        if self.limited_account:
+            self.set_prefix(allowed.get('namePrefix') or '')
+
+    def _create_bucket_params(self, bucket_name:str, private:bool, bucket_info:Optional[Json],
+                              cors_rules:Optional[Json], lifecycle_rules:Optional[Json]) -> Json:
+        """
+        Builds the parameters of a bucket creation request. See BackBlazeB2.create_bucket().
+
+        :raises RequestError: If the bucket name is not valid.
+        """
+        if not valid_bucket_name(bucket_name):
+            raise RequestError(f'Invalid bucket name "{bucket_name}".')
+        params = self._base_params()
+        params.update({
+            'bucketName': bucket_name,
+            'bucketType': self.BUCKET_TYPE_PRIVATE if private else self.BUCKET_TYPE_PUBLIC,
+            'bucketInfo': bucket_info,
+            'corsRules': cors_rules,
+            'lifecycleRules': lifecycle_rules,
+        })
+        return params
+
+    @staticmethod
+    def _start_large_file_params(bucket_id:str, file_name:str, content_type:str,
+                                 file_info:Optional[Json]) -> Json:
+        """ Builds the parameters of a large file request. See BackBlazeB2.start_large_file(). """
+        return {
+            'bucketId': bucket_id,
+            'fileName': quote(file_name),
+            'contentType': content_type,
+            'fileInfo': file_info,
+        }
+
+    def _upload_file_headers(self, auth_token:str, file_name:str, content_type:str, size:int,
+                             sha1:str, last_modified_ms:Optional[int]=None,
+                             info:Optional[Dict[str, str]]=None) -> Dict[str, str]:
+        """ Builds the headers of an upload request. See BackBlazeB2.upload_file(). """
+        headers = {
+            'Authorization': auth_token,
+            'X-Bz-File-Name': quote(file_name),
+            'Content-Type': content_type if content_type else 'b2/x-auto',
+            'Content-Length': str(size),
+            'X-Bz-Content-Sha1': sha1,
+            'User-Agent': self._useragent,
+        }
+        if last_modified_ms is not None:
+            headers['X-Bz-Info-src_last_modified_millis'] = str(last_modified_ms)
+        if info:
+            headers.update({f'X-Bz-Info-{key}': quote(value) for key, value in info.items()})
+        return headers
+
+    def _upload_part_headers(self, auth_token:str, part_number:int, size:int,
+                             sha1:str) -> Dict[str, str]:
+        """ Builds the headers of a part upload request. See BackBlazeB2.upload_part(). """
+        return {
+            'Authorization': auth_token,
+            'X-Bz-Part-Number': str(part_number),
+            'Content-Length': str(size),
+            'X-Bz-Content-Sha1': sha1,
+            'User-Agent': self._useragent,
+        }
+
+    def _list_files_params(self, prefix:Optional[str], delimiter:Optional[str], max_files:int,
+                           start_name:str, bucket_id:Optional[str]) -> Json:
+        """ Builds the parameters of a listing request. See BackBlazeB2.list_files(). """
+        if not prefix or self.limited_account:
+            prefix = self.prefix(append_slash=bool(self._prefix))
+        params = {
+            'bucketId': bucket_id if bucket_id else self.bucket_id,
+            'prefix': prefix,
+            'delimiter': delimiter if delimiter is not None else self.delimiter,
+            'maxFileCount': max_files,
+            'startFileName': start_name,
+        }
+        if not params['delimiter']:  # An empty delimiter lists all files, recursively
+            del params['delimiter']
+        return params
     # endregion
 
     # region Configuration methods
     def set_part_size(self, size:int):
         """
-        Sets the minimum part size (in bytes) for large uploads. Must be at least 5MB
-        and at most 5GB. Default is 100MB (backblaze's recommendation).
+        Sets a fixed part size (in bytes) for large uploads, instead of choosing it for each file
+        (see BackBlazeB2.plan_parts()). Must be at least 5MB and at most 5GB.
 
+        :param size: The part size, or 0 to choose it for each file again (the default).
         :raises ValueError: If the size is less than 5MB or more than 5GB.
         """
-        if size < FIVE_MB or size > FIVE_GB:
+        if size and (size < FIVE_MB or size > FIVE_GB):
             raise ValueError("Part size cannot be less than 5MB or more than 5GB")
         self._part_size = size
 
+    def plan_parts(self, file_path_or_size:Union[str, Path, int],
+                   workers:int=0) -> Tuple[int, int, int]:
+        """
+        Chooses how a file is uploaded (or copied): with a single request or in parts, and the size
+        of the parts. With a part size set with BackBlazeB2.set_part_size(), files larger than it
+        are split in parts of that size. Otherwise, the parts are chosen from the file size, the
+        part sizes recommended by the service at authentication and the number of workers (see
+        :func:`~blaziken.utils.plan_upload_parts`).
+
+        :param file_path_or_size: The file size, in bytes, or the path to the file.
+        :param workers: The number of parts uploaded concurrently. If 0, the value set with
+                        BackBlazeB2.set_upload_workers() is used.
+        :returns: A 3-tuple containing (total file size, number of parts, part size), sizes in
+                  bytes. A file with a single part is uploaded with a single request.
+        """
+        if self._part_size:
+            return upload_parts_count(file_path_or_size, self._part_size)
+        return plan_upload_parts(file_path_or_size, self._recommended_part_size,
+                                 self._minimum_part_size,
+                                 workers if workers else self.upload_workers)
+
+    def set_upload_workers(self, workers:int):
+        """
+        Sets the default number of parts uploaded concurrently by large uploads. Parts are streamed
+        from the file, so each worker only holds a small buffer in memory. When using more than
+        one worker, the Http instance's pool_maxsize should be at least as large.
+
+        :raises ValueError: If the number of workers is less than 1.
+        """
+        if workers < 1:
+            raise ValueError("The number of upload workers must be at least 1")
+        self._upload_workers = workers
+
     def set_user_agent(self, user_agent:str):
         """ Sets the user agent for the requests. A default user agent is set at initialization. """
         self._useragent = user_agent
@@ -268,6 +413,346 @@ class BackBlazeB2():
         :param delimiter: The character value to be set as the delimiter.
         """
         self.delimiter = delimiter
+    # endregion
+
+class BackBlazeB2(BaseBackBlazeB2):
+    """
+    Class that manages files and authentication on BackBlaze's B2 service.
+    To find out the structure of the JSON-encoded responses, check B2's documentation:
+    https://www.backblaze.com/b2/docs/
+
+    Class constants:
+
+    :cvar BUCKET_NAME_MAX_SIZE: The maximum size of the name of a bucket.
+    :cvar BUCKET_NAME_MIN_SIZE: The minimum size of the name of a bucket.
+    :cvar BUCKET_TYPE_PRIVATE: String defining that a bucket is private.
+    :cvar BUCKET_TYPE_PUBLIC: String defining that a bucket is public.
+    :cvar FOLDER_DELIMITER: Default delimiter for virtual folders.
+    :cvar MAX_LIST_FILES: Absolute maximum of files able to be retrieved in a single request.
+    :cvar DEFAULT_FILE_COUNT: Default number of files to be retrieved in a single request.
+
+    Instance variables:
+
+    :ivar account_id: The id of the account.
+    :ivar app_key: A key for accessing the API.
+    :ivar api_url: The URL provided by the B2 authentication service to access the API.
+    :ivar auth_token: The authentication token returned by the B2 authentication service.
+    :ivar download_url: The file download URL provided by the B2 authentication service.
+    :ivar upload_url: The last upload URL obtained with BackBlazeB2.get_upload_url().
+    :ivar upload_token: The last upload token obtained with BackBlazeB2.get_upload_url().
+    :ivar delimiter: The delimiter used to mark directory paths in the B2 service.
+    :ivar _bucket_id: The id of the bucket to which the upload token is related to.
+    :ivar _bucket_name: The name of the bucket to which the upload token is related to.
+    :ivar _prefix: Prefix to be prefixed to all files, restricts access to only files
+                   with the same prefix.
+    :ivar _http: The Http class used to make HTTP requests. Its connections are kept alive and
+                 reused by all requests made to the api, upload and download hosts.
+    :ivar _useragent: The User-Agent header sent in HTTP requests to the B2 service.
+    :ivar _limited_account: True indicates that the current account is limited to certain buckets.
+    :ivar _capabilities: List of capabilities (permissions) of the current account.
+    :ivar _part_size: The part size for large file uploads, in bytes. If 0, it is chosen for each
+                      file (see BackBlazeB2.plan_parts()).
+    :ivar _recommended_part_size: The part size recommended by the service, in bytes.
+    :ivar _minimum_part_size: The minimum part size allowed by the service, in bytes.
+    :ivar _upload_workers: The default number of parts of a large file uploaded concurrently.
+    :ivar _upload_urls: The pool of upload URLs reused by single-part uploads.
+    :ivar _download_workers: The default number of ranges of a file downloaded concurrently.
+    :ivar _list_cache: The cache of file listings, None if listings are not cached.
+    :ivar _download_auth_cache: The cache of download authorization tokens, None if not cached.
+    :ivar _file_listeners: The functions called when a file is changed through the instance.
+    :ivar _auth_lock: The lock held while re-authenticating, so it is done by one thread at a time.
+    :ivar _auth_refresh: The time, in seconds, after which the authorization token is refreshed in
+                         the background. If 0, it is only refreshed after it expires.
+    :ivar _auth_timer: Cancels the timer of the next background refresh of the authorization token
+                       when called or when the instance is garbage-collected.
+    :ivar _auth_cache: The cache of authorizations shared with other processes, None if not used.
+    """
+
+    AUTH_REFRESH_INTERVAL = 20 * 3600  # Authorization tokens are valid for 24 hours
+    AUTH_REFRESH_RETRY = 300
+    REAUTH_CODES = ('expired_auth_token',)
+
+    def __init__(self, account_id:Optional[str]=None, app_key:Optional[str]=None, auth:bool=False,
+                 http:Optional[Http]=None, auth_cache:Optional[AuthCache]=None):
+        """
+        :param account_id: The backblaze account id.
+        :param app_key: The API master key.
+        :param auth: True to authenticate during initialization, False to do it manually later.
+        :param http: An Http object for making HTTP requests.
+        :param auth_cache: A cache of authorizations, to reuse the authorization of another
+                           process (or of a previous run) instead of authenticating again.
+        """
+        super().__init__(account_id, app_key)
+        self.upload_url:Optional[str] = None
+        self.upload_token:Optional[str] = None
+        self._http = http if http else Http()
+        self._upload_urls = UploadUrlPool(self)
+        self._download_workers = 1
+        self._list_cache:Optional[ListingCache] = None
+        self._download_auth_cache:Optional[DownloadAuthCache] = None
+        self._file_listeners:List[Callable[[Json, bool], None]] = []
+        self._auth_lock = Lock()
+        self._auth_refresh:float = self.AUTH_REFRESH_INTERVAL
+        self._auth_timer:Optional[finalize] = None
+        self._auth_cache = auth_cache
+        if auth:
+            self.authenticate()
+
+    @property
+    def download_workers(self) -> int:
+        """ Gets the default number of ranges of a file downloaded concurrently. """
+        return self._download_workers
+
+    @property
+    def upload_urls(self) -> UploadUrlPool:
+        """ Gets the pool of upload URLs reused by single-part uploads. """
+        return self._upload_urls
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """ Gets the policy that retries failed requests, uploads and upload parts. """
+        return self._http.retry
+
+    @property
+    def list_cache(self) -> Optional[ListingCache]:
+        """ Gets the cache of file listings, if set. """
+        return self._list_cache
+
+    @property
+    def download_auth_cache(self) -> Optional[DownloadAuthCache]:
+        """ Gets the cache of download authorization tokens, if set. """
+        return self._download_auth_cache
+
+    # region Utility methods
+    def close(self):
+        """ Closes the pooled connections used by the instance and stops refreshing its token. """
+        self._auth_refresh = 0
+        self._schedule_auth_refresh()
+        self._http.close()
+
+    def _authorized(self, request:Callable[[Dict[str, str]], Response]) -> Response:
+        """
+        Makes a request with the default headers. If the authorization token expired, the account
+        is re-authenticated (by a single thread) and the request is made again, once.
+
+        :param request: A function that makes the request given its headers.
+        :returns: The response of the request.
+        """
+        headers = self._headers()
+        try:
+            return request(headers)
+        except RequestError as error:
+            if error.code not in self.REAUTH_CODES or not self.app_key:
+                raise
+        with self._auth_lock:
+            if self.auth_token == headers['Authorization']:  # Not renewed by another thread yet
+                self._renew_auth()
+        return request(self._headers())
+
+    def _post(self, endpoint:Endpoints, **kwargs) -> Response:
+        """ Makes an authorized POST request to an endpoint of the B2 API. """
+        return self._authorized(lambda headers: self._http.post(
+            self._make_url(endpoint.value), headers=headers, **kwargs))
+
+    def _call(self, endpoint:Endpoints, error_message:str, **kwargs) -> Json:
+        """
+        Makes an authorized POST request to an endpoint of the B2 API and decodes its json-encoded
+        response.
+
+        :param endpoint: The endpoint to which the request is made.
+        :param error_message: The message of the exception raised if the response has errors.
+        :returns: A dict with the json-encoded response data.
+        :raises ResponseError: If the server returned an error.
+        """
+        return self._decode(self._post(endpoint, **kwargs), error_message)
+
+    @staticmethod
+    def _decode(response:Response, error_message:str) -> Json:
+        """
+        Decodes the json-encoded response of a request to the B2 API.
+
+        :param error_message: The message of the exception raised if the response has errors,
+                              followed by the error message of the response.
+        :returns: A dict with the json-encoded response data.
+        :raises ResponseError: If the server returned an error.
+        """
+        data = json_decode(response.content)
+        check_b2_errors(data, f'{error_message} ({data.get("message", "")}).')
+        return data
+
+    def _schedule_auth_refresh(self, delay:float=0):
+        """ Schedules the background refresh of the token, replacing the one scheduled. """
+        if self._auth_timer is not None:
+            self._auth_timer()
+            self._auth_timer = None
+        if self._auth_refresh > 0 and self.is_authenticated and self.app_key:
+            timer = Timer(delay if delay else self._auth_refresh, _refresh_auth, (ref(self),))
+            timer.daemon = True
+            timer.start()
+            # The timer only holds a weak reference, so the instance can be garbage-collected
+            # without BackBlazeB2.close(). The finalizer then cancels the timer with it
+            self._auth_timer = finalize(self, timer.cancel)
+
+    def refresh_auth(self):
+        """
+        Obtains a new authorization token before the current one expires. Requests made meanwhile
+        keep using the current token, so they are not delayed. Called in the background after the
+        interval set with BackBlazeB2.set_auth_refresh(). If it fails, it is tried again later.
+        """
+        try:
+            with self._auth_lock:
+                self._renew_auth()
+        except BlazeError:
+            self._schedule_auth_refresh(self.AUTH_REFRESH_RETRY)
+
+    def download_urls(self, file_names:Iterable[str], auth_duration:int, bucket_name:str='',
+                      bucket_id:str='') -> List[str]:
+        """
+        Builds the authorized URLs of many files of a private bucket, using one download
+        authorization token for all the files of each folder instead of one token per file.
+        Files at the root of the bucket are authorized one by one, as a token of the root folder
+        would authorize the whole bucket.
+
+        :param file_names: The names of the files in the backblaze service.
+        :param auth_duration: The validity of the tokens, in seconds (at most 604800, one week).
+        :param bucket_name: The name of the bucket of the files. If empty, the currently-set bucket.
+        :param bucket_id: The id of the bucket of the files. If empty, the currently-set bucket.
+        :returns: The download URLs of the files, in the same order as their names.
+        """
+        file_names = list(file_names)
+        prefixes = [name[:name.rfind(self.delimiter) + 1] or name for name in file_names]
+        tokens = {prefix: self.get_download_auth(prefix, auth_duration, bucket_id)
+                  for prefix in dict.fromkeys(prefixes)}
+        return [self.download_url_path(name, tokens[prefix], bucket_name)
+                for name, prefix in zip(file_names, prefixes)]
+
+    def add_file_listener(self, listener:Callable[[Json, bool], None]):
+        """
+        Adds a function to be called whenever a file is uploaded, hidden or deleted through this
+        instance. Listeners are called from the thread that made the request.
+
+        :param listener: A function that receives the json-encoded data of the file (at least its
+                         fileName and fileId) and True if the file was deleted, False otherwise.
+        """
+        self._file_listeners.append(listener)
+
+    def remove_file_listener(self, listener:Callable[[Json, bool], None]):
+        """ Removes a function added with BackBlazeB2.add_file_listener(). """
+        if listener in self._file_listeners:
+            self._file_listeners.remove(listener)
+
+    def _notify_file_change(self, data:Json, deleted:bool=False):
+        """ Calls the file listeners with the data of a changed file. """
+        for listener in self._file_listeners:
+            listener(data, deleted)
+
+    def _upload_file_gen(self, bucket_id:str, file_or_path:Union[str, Path, BinaryIO],
+                         file_size:int, file_name:str, **kwargs) -> UploadGenerator:
+        """
+        Calls BackBlazeB2.upload_file() with an upload URL checked out from the pool and returns a
+        generator. This exists so that the various "upload" shortcut methods have the same return
+        type. The file is streamed from its current position, it is not loaded in memory.
+        Failed uploads are retried with a new upload URL, as allowed by the retry policy of the
+        Http instance.
+
+        :returns: The file-uploading generator.
+        :yields: A 3-tuple containing (upload response, part number, total part count). The part
+                 number starts at 1, and if the upload is successfull, the final tuple will have
+                 part number 0 and the response will contain the finalized file data.
+        """
+        is_path = isinstance(file_or_path, (str, Path))
+        file_handle = open(file_or_path, 'rb') if is_path else file_or_path
+        try:
+            data = FileRange(file_handle, file_handle.tell(), file_size)
+            attempt = 0
+            while True:
+                try:
+                    with self._upload_urls.checkout(bucket_id) as upload_data:
+                        result = self.upload_file(data, upload_data['uploadUrl'],
+                                                  upload_data['authorizationToken'], file_name,
+                                                  **kwargs)
+                    break
+                except (InternetError, RequestError) as error:
+                    delay = self._http.retry.next_delay(error, attempt, 'POST',
+                                                        Endpoints.upload_file.value,
+                                                        fresh_url=True)
+                    if delay is None:
+                        raise
+                self._http.retry.wait(delay)
+                data.seek(0)
+                attempt += 1
+        finally:
+            if is_path:
+                file_handle.close()
+        yield (result, 0, 1)
+    # endregion
+
+    # region Configuration methods
+    def set_download_workers(self, workers:int):
+        """
+        Sets the default number of byte ranges downloaded concurrently by file downloads. When
+        using more than one worker, the Http instance's pool_maxsize should be at least as large.
+
+        :raises ValueError: If the number of workers is less than 1.
+        """
+        if workers < 1:
+            raise ValueError("The number of download workers must be at least 1")
+        self._download_workers = workers
+
+    def set_retry_policy(self, policy:RetryPolicy):
+        """
+        Sets the policy that retries failed requests, and the uploads and large file parts that
+        failed, which are retried with a new upload URL. It replaces the policy of the Http
+        instance, so it applies to every BackBlazeB2 instance sharing it.
+
+        :param policy: The retry policy. Use RetryPolicy(max_retries=0) to never retry.
+        """
+        self._http.retry = policy
+
+    def set_auth_refresh(self, interval:float):
+        """
+        Sets the time, in seconds, after which the authorization token is refreshed in the
+        background. Tokens are valid for 24 hours, the default is 20 hours. Expired tokens are
+        always renewed when a request fails because of them, but that delays the request.
+
+        :param interval: The refresh interval, or 0 to only renew tokens after they expire.
+        :raises ValueError: If the interval is negative.
+        """
+        if interval < 0:
+            raise ValueError('The refresh interval must not be negative')
+        self._auth_refresh = interval
+        self._schedule_auth_refresh()
+
+    def set_auth_cache(self, cache:Optional[AuthCache]):
+        """
+        Sets the cache of authorizations used by BackBlazeB2.authenticate(). Valid authorizations
+        found in the cache are used instead of authenticating, and new ones are stored in it.
+
+        :param cache: The authorization cache, or None to always authenticate with the service.
+        """
+        self._auth_cache = cache
+
+    def set_download_auth_cache(self, cache:Optional[DownloadAuthCache]):
+        """
+        Sets the cache of download authorization tokens used by BackBlazeB2.get_download_auth().
+        By default, tokens are not cached.
+
+        :param cache: The token cache, or None to request a new token every time.
+        """
+        self._download_auth_cache = cache
+
+    def set_list_cache(self, cache:Optional[ListingCache]):
+        """
+        Sets the cache used by BackBlazeB2.list_files(). Files uploaded, hidden or deleted through
+        this instance invalidate the cached listings that could contain them.
+
+        :param cache: The listing cache, or None to stop caching listings.
+        """
+        if self._list_cache is not None:
+            self.remove_file_listener(self._list_cache.file_changed)
+        self._list_cache = cache
+        if cache is not None:
+            self.add_file_listener(cache.file_changed)
 
     def set_bucket(self, bucket_name:str) -> str:
         """
@@ -288,11 +773,40 @@ class BackBlazeB2():
     # endregion
 
     # region B2 Api methods
+    def _request_authorization(self) -> Json:
+        """ Requests an authorization of the account from the B2 service. """
+        response = self._http.get(self.BASE_URL + Endpoints.auth.value,
+                                  auth=HTTPBasicAuth(self.account_id, self.app_key))
+        return self._decode(response, f'Failed to authenticate with BackBlaze '
+                                      f'(account_id={self.account_id})')
+
+    def _authorize_account(self, stale_token:Optional[str]) -> Tuple[Json, float]:
+        """
+        Gets an authorization of the account from the authorization cache, if it has one with a
+        token other than the stale one, or from the B2 service, caching it.
+
+        :param stale_token: The token being replaced, which must not be reused.
+        :returns: A 2-tuple containing (json-encoded authorization, timestamp of when it was
+                  obtained).
+        """
+        if self._auth_cache is None:
+            return (self._request_authorization(), time())
+        with self._auth_cache.locked(self.account_id, self.app_key):
+            cached = self._auth_cache.get(self.account_id, self.app_key)
+            if cached is not None and cached[0].get('authorizationToken') != stale_token:
+                return cached
+            data, created = self._request_authorization(), time()
+            self._auth_cache.put(self.account_id, self.app_key, data, created)
+            return (data, created)
+
     def authenticate(self, account_id:Optional[str]=None, app_key:Optional[str]=None) -> Json:
         """
         Authenticates (or re-authenticates, if already authenticated) an account.
         If the "account_id" and "app_key" attributes were already set in the constructor, it's not
         necessary to specify them again. Specifying them will re-authenticate the account.
+        The authorization token is renewed automatically, in the background before it expires
+        (see BackBlazeB2.set_auth_refresh()) and right away if a request finds it expired.
+        If an authorization cache is set, a valid authorization found in it is used instead.
 
         IMPORTANT: When authenticating with a non-master application key, use the key id as the
         account id, otherwise the response will produce a 401 Unauthorized error.
@@ -306,27 +820,23 @@ class BackBlazeB2():
         """
         self.account_id = account_id or self.account_id
         self.app_key = app_key or self.app_key
-        response = self._http.get(self.BASE_URL + Endpoints.auth.value,
-                                  auth=HTTPBasicAuth(self.account_id, self.app_key))
-        data = json_loads(response.text)
-        check_b2_errors(
-            data, 'Failed to authenticate with BackBlaze (account_id={}, app_key={}) ({})'.format(
-                self.account_id, self.app_key, data))
-        self.api_url = data['apiUrl']
-        self.auth_token = data['authorizationToken']
-        self.download_url = data['downloadUrl']
-        allowed = data.get('allowed', {})
-        self._capabilities = allowed.get('capabilities', [])
-        allowed_bucket_id = allowed.get('bucketId', '')
-        allowed_bucket_name = allowed.get('bucketName', '')
-        if allowed_bucket_id:
-            self._bucket_id = allowed_bucket_id
-            self._limited_account = True
-        if allowed_bucket_name:
-            self._bucket_name = allowed_bucket_name
-            self._limited_account = True
-        if self.limited_account:
-            self.set_prefix(allowed.get('namePrefix', ''))
+        data = self._renew_auth()
+        self._use_restrictions(data)
+        return data
+
+    def _renew_auth(self) -> Json:
+        """
+        Replaces the authorization token, the URLs and the part sizes with those of a new
+        authorization of the account. Unlike BackBlazeB2.authenticate(), the selected bucket and
+        prefix are kept, so it is safe to call while the instance is in use.
+
+        :returns: A dict with the json-encoded authorization.
+        :raises BlazeError: If failed to make the request to the server.
+        :raises ResponseError: If the server returned an error.
+        """
+        data, authorized_at = self._authorize_account(self.auth_token)
+        self._use_authorization(data)
+        self._schedule_auth_refresh(max(self._auth_refresh - (time() - authorized_at), 1.0))
         return data
 
     def create_bucket(self, bucket_name:str, private:bool, bucket_info:Optional[Json]=None,
@@ -351,22 +861,11 @@ class BackBlazeB2():
         .. seealso:: `Lifecycle Rules <https://www.backblaze.com/b2/docs/lifecycle_rules.html>`_.
         """
         self._ensure_auth()
-        if not valid_bucket_name(bucket_name):
-            raise RequestError(f'Invalid bucket name "{bucket_name}".')
-        params = self._base_params()
-        params.update({
-            'bucketName': bucket_name,
-            'bucketType': self.BUCKET_TYPE_PRIVATE if private else self.BUCKET_TYPE_PUBLIC,
-            'bucketInfo': bucket_info,
-            'corsRules': cors_rules,
-            'lifecycleRules': lifecycle_rules,
-        })
+        params = self._create_bucket_params(bucket_name, private, bucket_info, cors_rules,
+                                            lifecycle_rules)
         # Endpoint /b2_create_bucket can take a long time to respond, a larger timeout is required
-        response = self._http.post(self._make_url(Endpoints.create_bucket.value), json=params,
-                                   headers=self._headers(), timeout=90.0)
-        data = json_loads(response.text)
-        check_b2_errors(data, f'Failed to create bucket "{bucket_name}" ({data}).')
-        return data
+        return self._call(Endpoints.create_bucket, f'Failed to create bucket "{bucket_name}"',
+                          json=params, timeout=90.0)
 
     def delete_bucket(self, bucket_id:str) -> Json:
         """
@@ -380,11 +879,8 @@ class BackBlazeB2():
         params = self._base_params()
         params.update({'bucketId': bucket_id})
         # Endpoint /b2_delete_bucket takes a long time to respond, so a larger timeout is warranted
-        response = self._http.post(self._make_url(Endpoints.delete_bucket.value), json=params,
-                                   headers=self._headers(), timeout=90.0)
-        data = json_loads(response.text)
-        check_b2_errors(data, f'Failed to delete bucket with id "{bucket_id}" ({data}).')
-        return data
+        return self._call(Endpoints.delete_bucket, f'Failed to delete bucket with id "{bucket_id}"',
+                          json=params, timeout=90.0)
 
     def list_buckets(self, bucket_id:Optional[str]=None, bucket_name:Optional[str]=None,
                      bucket_types:Optional[str]=None) -> Json:
@@ -409,45 +905,58 @@ class BackBlazeB2():
             'bucketName': bucket_name,
             'bucketTypes': bucket_types,
         })
-        response = self._http.post(self._make_url(Endpoints.list_buckets.value), json=params,
-                                   headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(data, f'Failed to list buckets ({data}).')
-        return data
+        return self._call(Endpoints.list_buckets, 'Failed to list buckets', json=params)
 
-    def get_upload_url(self, bucket_id:str) -> Json:
+    def request_upload_url(self, bucket_id:str) -> Json:
         """
-        Gets the URL to upload to a bucket.
+        Gets a new URL to upload to a bucket, without changing the state of the instance, so it
+        is safe to call from many threads (e.g.: by the UploadUrlPool).
 
         :param bucket_id: The ID of the bucket to which files will be uploaded to.
         :returns: A json-like 3-dict containing the keys: bucketId, uploadUrl, authorizationToken.
         :raises ResponseError: If failed to obtain the upload information.
         """
         self._ensure_auth()
-        response = self._http.post(self._make_url(Endpoints.get_upload_url.value),
-                                   json={'bucketId': bucket_id}, headers=self._headers())
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to get uploading authorization: {result}.')
+        return self._call(Endpoints.get_upload_url, 'Failed to get uploading authorization',
+                          json={'bucketId': bucket_id})
+
+    def get_upload_url(self, bucket_id:str) -> Json:
+        """
+        Gets the URL to upload to a bucket, storing it in the "upload_url" and "upload_token"
+        attributes and selecting the bucket. Uploads use BackBlazeB2.request_upload_url() instead,
+        through the pool of upload URLs, which leaves the selected bucket unchanged.
+
+        :param bucket_id: The ID of the bucket to which files will be uploaded to.
+        :returns: A json-like 3-dict containing the keys: bucketId, uploadUrl, authorizationToken.
+        :raises ResponseError: If failed to obtain the upload information.
+        """
+        result = self.request_upload_url(bucket_id)
         self.upload_url = result['uploadUrl']
         self.upload_token = result['authorizationToken']
         self._bucket_id = bucket_id
         return result
 
     # pylint: disable = too-many-locals  # The request takes this many parameters
-    def upload_file(self, data:bytes, upload_url:str, auth_token:str, file_name:str,
-                    content_type:str='', last_modified_ms:Optional[int]=None,
+    def upload_file(self, data:Union[bytes, FileRange], upload_url:str, auth_token:str,
+                    file_name:str, content_type:str='', last_modified_ms:Optional[int]=None,
                     content_disposition:Optional[str]=None, language:Optional[str]=None,
                     expires:Optional[str]=None, cache_control:Optional[str]=None,
                     encoding:Optional[str]=None, content_type_header:Optional[str]=None,
                     info:Optional[Dict[str, str]]=None) -> Json:
+        """
+        Uploads a file in a single request.
+
+        :param data: The file data, either as bytes or as a FileRange. A FileRange is hashed in a
+                     streaming pre-pass and then streamed to the server, so memory usage does not
+                     depend on the size of the file.
+        :param upload_url: The URL returned by BackBlazeB2.get_upload_url().
+        :param auth_token: The authorization token returned by BackBlazeB2.get_upload_url().
+        :param file_name: The name to give to the file in the backblaze server.
+        :returns: A dict with the json-encoded response data.
+        .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_upload_file.html>`_.
+        """
         self._ensure_auth()
         headers = {
-            'Authorization': auth_token,
-            'X-Bz-File-Name': quote(file_name),
-            'Content-Type': content_type if content_type else 'b2/x-auto',
-            'Content-Length': str(len(data)),
-            'X-Bz-Content-Sha1': sha1(data).hexdigest(),
-            'X-Bz-Info-src_last_modified_millis': last_modified_ms,
             'X-Bz-Info-b2-content-disposition': content_disposition,
             'X-Bz-Info-b2-content-language': language,
             'X-Bz-Info-b2-expires': expires,
@@ -455,11 +964,11 @@ class BackBlazeB2():
             'X-Bz-Info-b2-content-encoding': encoding,
             'X-Bz-Info-b2-content-type': content_type_header,
         }
-        if info:
-            headers.update({f'X-Bz-Info-{key}':quote(value) for key, value in info.items()})
+        headers.update(self._upload_file_headers(auth_token, file_name, content_type, len(data),
+                                                 content_sha1(data), last_modified_ms, info))
         response = self._http.post(upload_url, data=data, headers=headers, timeout=None)
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to upload file "{file_name}": {result}')
+        result = self._decode(response, f'Failed to upload file "{file_name}"')
+        self._notify_file_change(result)
         return result
     # pylint: enable = too-many-locals
 
@@ -472,17 +981,9 @@ class BackBlazeB2():
         .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_start_large_file.html>`_.
         """
         self._ensure_auth()
-        params = {
-            'bucketId': bucket_id,
-            'fileName': quote(file_name),
-            'contentType': content_type,
-            'fileInfo': file_info,
-        }
-        response = self._http.post(self._make_url(Endpoints.start_large_file.value), json=params,
-                                   headers=self._headers())
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to start large file upload: {result}')
-        return result
+        params = self._start_large_file_params(bucket_id, file_name, content_type, file_info)
+        return self._call(Endpoints.start_large_file,
+                          f'Failed to start large file upload of "{file_name}"', json=params)
 
     def get_upload_part_url(self, file_id:str) -> Json:
         """
@@ -490,17 +991,18 @@ class BackBlazeB2():
         .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_get_upload_part_url.html>`_.
         """
         self._ensure_auth()
-        response = self._http.post(self._make_url(Endpoints.get_upload_part_url.value),
-                                   json={'fileId': file_id}, headers=self._headers())
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to get upload part url for file "{file_id}": {result}')
-        return result
+        return self._call(Endpoints.get_upload_part_url,
+                          f'Failed to get upload part url for file "{file_id}"',
+                          json={'fileId': file_id})
 
-    def upload_part(self, data:bytes, upload_url:str, part_number:int, auth_token:str) -> Json:
+    def upload_part(self, data:Union[bytes, FileRange], upload_url:str, part_number:int,
+                    auth_token:str) -> Json:
         """
         Uploads part of a large file.
 
-        :param data: The partial file data being uploaded.
+        :param data: The partial file data being uploaded, either as bytes or as a FileRange. A
+                     FileRange is hashed in a streaming pre-pass and then streamed to the server,
+                     so memory usage does not depend on the part size.
         :param upload_url: The URL used to upload the partial file data.
         :param part_number: The number of the part. Be aware that part numbers start at 1, not 0!
         :param auth_token: The authorization token returned by BackBlazeB2.get_upload_part_url().
@@ -509,16 +1011,9 @@ class BackBlazeB2():
         .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_upload_part.html>`_.
         """
         self._ensure_auth()
-        headers = {
-            'Authorization': auth_token,
-            'X-Bz-Part-Number': str(part_number),
-            'Content-Length': str(len(data)),
-            'X-Bz-Content-Sha1': sha1(data).hexdigest(),
-        }
+        headers = self._upload_part_headers(auth_token, part_number, len(data), content_sha1(data))
         response = self._http.post(upload_url, data=data, headers=headers, timeout=None)
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to upload file part number #{part_number}: {result}')
-        return result
+        return self._decode(response, f'Failed to upload file part number #{part_number}')
 
     def finish_large_file(self, file_id:str, parts_sha1:List[str]) -> Json:
         """
@@ -534,10 +1029,9 @@ class BackBlazeB2():
             'fileId': file_id,
             'partSha1Array': parts_sha1,
         }
-        response = self._http.post(self._make_url(Endpoints.finish_large_file.value), json=params,
-                                   headers=self._headers())
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to finish large file with id "{file_id}": {result}')
+        result = self._call(Endpoints.finish_large_file,
+                            f'Failed to finish large file with id "{file_id}"', json=params)
+        self._notify_file_change(result)
         return result
 
     def cancel_large_file(self, file_id:str) -> Json:
@@ -549,11 +1043,60 @@ class BackBlazeB2():
         .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_cancel_large_file.html>`_.
         """
         self._ensure_auth()
-        response = self._http.post(self._make_url(Endpoints.cancel_large_file.value),
-                                   json={'fileId': file_id}, headers=self._headers())
-        result = json_loads(response.text)
-        check_b2_errors(result, f'Failed to cancel large file with id "{file_id}": {result}')
-        return result
+        return self._call(Endpoints.cancel_large_file,
+                          f'Failed to cancel large file with id "{file_id}"',
+                          json={'fileId': file_id})
+
+    def list_unfinished_large_files(self, bucket_id:str='', name_prefix:str='',
+                                    start_file_id:str='', max_files:int=0) -> Json:
+        """
+        Lists the large files that were started but neither finished nor cancelled, in the order
+        they were started.
+
+        :param bucket_id: The id of the bucket of the files. If empty, will try to use the bucket
+                          set with BackBlazeB2.set_bucket().
+        :param name_prefix: Returns only files which names start with the specified prefix.
+        :param start_file_id: The id of the first file listed. Use the "nextFileId" of the
+                              previous response.
+        :param max_files: Number of files to return in the response. Maximum is 100, default 100.
+        :returns: A dict with the json-encoded response data, with the keys: files, nextFileId.
+        :raises RequestError: If the user is not authenticated.
+        .. seealso:: `Reference
+                     <https://www.backblaze.com/b2/docs/b2_list_unfinished_large_files.html>`_.
+        """
+        self._ensure_auth()
+        params = {'bucketId': bucket_id if bucket_id else self.bucket_id}
+        if name_prefix:
+            params['namePrefix'] = name_prefix
+        if start_file_id:
+            params['startFileId'] = start_file_id
+        if max_files:
+            params['maxFileCount'] = max_files
+        return self._call(Endpoints.list_unfinished_large_files,
+                          'Failed to list unfinished large files', json=params)
+
+    def list_parts(self, file_id:str, start_part:int=0, max_parts:int=0) -> Json:
+        """
+        Lists the parts uploaded to a large file that has not been finished yet.
+
+        :param file_id: The file id returned by BackBlazeB2.start_large_file().
+        :param start_part: The number of the first part listed. Use the "nextPartNumber" of the
+                           previous response.
+        :param max_parts: Number of parts to return in the response. Maximum is 1000, default 100.
+        :returns: A dict with the json-encoded response data, with the keys: parts, nextPartNumber.
+                  Each part has the keys: fileId, partNumber, contentLength, contentSha1,
+                  contentMd5, uploadTimestamp.
+        :raises RequestError: If the user is not authenticated.
+        .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_list_parts.html>`_.
+        """
+        self._ensure_auth()
+        params = {'fileId': file_id}
+        if start_part:
+            params['startPartNumber'] = start_part
+        if max_parts:
+            params['maxPartCount'] = max_parts
+        return self._call(Endpoints.list_parts,
+                          f'Failed to list parts of large file with id "{file_id}"', json=params)
 
     def list_files(self, prefix:Optional[str]=None, delimiter:Optional[str]=None, max_files:int=0,
                    start_name:str='', bucket_id:Optional[str]=None) -> Json:
@@ -563,12 +1106,15 @@ class BackBlazeB2():
         See `b2_list_file_names <https://www.backblaze.com/b2/docs/b2_list_file_names.html>`_.
 
         :param prefix: Returns only files which names start with the specified prefix.
-        :param delimiter: Used to list only files in a directory.
+        :param delimiter: Used to list only files in a directory. If None, the configured
+                          delimiter is used. If empty, all files are listed recursively.
         :param max_files: Number of files to return in the response. Maximum is 10000, default 100.
         :param start_name: If a file matches this path, it will be the first file returned.
         :param bucket_id: The id of the bucket to have its files listed. If empty, will try to use
                           the bucket set with BackBlazeB2.set_bucket().
-        :returns: A dict with the json-encoded response data.
+        :returns: A dict with the json-encoded response data. If a listing cache is set (see
+                  BackBlazeB2.set_list_cache()), it may be a cached listing shared with other
+                  callers, which must not be modified.
         :raises RequestError: If the user is not authenticated.
 
         :example:
@@ -580,24 +1126,73 @@ class BackBlazeB2():
 
         """
         self._ensure_auth()
-        if not prefix or self.limited_account:
-            prefix = self.prefix()
-        params = {
-            'bucketId': bucket_id if bucket_id else self.bucket_id,
-            'prefix': prefix,
-            'delimiter': delimiter if delimiter is not None else self.delimiter,
-            'maxFileCount': max_files,
-            'startFileName': start_name,
-        }
-        response = self._http.post(self._make_url(Endpoints.list_files.value), json=params,
-                                   headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(
-            data, 'Failed to get list files <prefix={}, delimiter={}, start_name={}, max_files={}, '
-            'bucket_id={}> ({}).'.format(prefix, delimiter, start_name, max_files, bucket_id,
-                                         data.get('message', '')))
+        params = self._list_files_params(prefix, delimiter, max_files, start_name, bucket_id)
+        prefix = params['prefix']
+        cache_key = (params['bucketId'], prefix, params.get('delimiter', ''), max_files, start_name)
+        if self._list_cache is not None:
+            data = self._list_cache.get(cache_key)
+            if data is not None:
+                return data
+        data = self._call(Endpoints.list_files,
+                          f'Failed to get list files <prefix={prefix}, delimiter={delimiter}, '
+                          f'start_name={start_name}, max_files={max_files}, bucket_id={bucket_id}>',
+                          json=params)
+        if self._list_cache is not None:
+            self._list_cache.put(cache_key, data)
         return data
 
+    # pylint: disable = too-many-arguments
+    def list_file_versions(self, prefix:Optional[str]=None, delimiter:Optional[str]=None,
+                           max_files:int=0, start_name:str='', start_id:str='',
+                           bucket_id:Optional[str]=None) -> Json:
+        """
+        Lists all versions of the files contained on a bucket, including hide markers and
+        unfinished large files, in alphabetical order of name and, for each name, from the newest
+        version to the oldest. Parameters are the same as :func:`BackBlazeB2.list_files()`.
+
+        :param start_id: The id of the first version listed of the file named start_name. Use the
+                         "nextFileId" of the previous response, along with its "nextFileName".
+        :returns: A dict with the json-encoded response data, with the keys: files,
+                  nextFileName, nextFileId.
+        :raises RequestError: If the user is not authenticated.
+        .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_list_file_versions.html>`_.
+        """
+        self._ensure_auth()
+        params = self._list_files_params(prefix, delimiter, max_files, start_name, bucket_id)
+        if start_id:
+            params['startFileId'] = start_id
+        return self._call(Endpoints.list_file_versions,
+                          f'Failed to list file versions <prefix={params["prefix"]}, '
+                          f'start_name={start_name}, start_id={start_id}>', json=params)
+    # pylint: enable = too-many-arguments
+
+    def iter_list_files(self, prefix:Optional[str]=None, delimiter:Optional[str]=None,
+                        max_files:int=0, start_name:str='', bucket_id:Optional[str]=None,
+                        chunk_size:int=65536) -> JsonArrayStream:
+        """
+        Same as :func:`BackBlazeB2.list_files()`, but the files are parsed and yielded while the
+        response is still being received, so processing large pages overlaps with their download
+        and the whole response is never held in memory. Streamed listings are not cached.
+
+        :param chunk_size: The maximum size (in bytes) of each chunk of the response parsed.
+        :returns: A stream that yields the json-encoded data of each file when iterated. After
+                  the iteration, its "fields" attribute has the other fields of the response,
+                  such as "nextFileName".
+        :raises RequestError: If the user is not authenticated.
+        :raises InternetError: If the connection is lost while receiving the response.
+        """
+        self._ensure_auth()
+        params = self._list_files_params(prefix, delimiter, max_files, start_name, bucket_id)
+
+        def chunks():
+            with self._post(Endpoints.list_files, json=params, stream=True) as response:
+                try:
+                    yield from response.iter_content(chunk_size)
+                except RequestException as error:
+                    raise InternetError('Connection lost while listing files') from error
+
+        return JsonArrayStream(chunks(), 'files')
+
     def get_file_info(self, file_id:str) -> Json:
         """
         Gets the information for a file on the server.
@@ -609,13 +1204,8 @@ class BackBlazeB2():
         :raises ResponseError: If the server returned an error (e.g.: file does not exist).
         """
         self._ensure_auth()
-        response = self._http.post(self._make_url(Endpoints.file_info.value),
-                                   json={'fileId': quote(file_id)}, headers=self._headers())
-
-        data = json_loads(response.text)
-        check_b2_errors(data, 'Failed to get files info  <file_id={}> ({}).'.format(
-            file_id, data.get('message', '')))
-        return data
+        return self._call(Endpoints.file_info, f'Failed to get files info <file_id={file_id}>',
+                          json={'fileId': quote(file_id)})
 
     def download_url_id(self, file_id:Optional[str]=None,
                         auth_token:str='') -> Tuple[str, Dict[str, str]]:
@@ -638,24 +1228,40 @@ class BackBlazeB2():
         return (url, {'Authorization': auth_token} if auth_token else {})
 
     def get_download_auth(self, file_path_or_prefix:str, auth_duration:int,
-                          bucket_id:str='') -> str:
+                          bucket_id:str='', allow_broader:bool=False) -> str:
         """
-        Gets an authorization token for downloading specified files.
-
-        :param file_path:
+        Gets an authorization token for downloading the files of a private bucket which names start
+        with a prefix. If a download authorization cache is set (see
+        BackBlazeB2.set_download_auth_cache()), a cached token of the same prefix is returned when
+        it is valid for long enough.
+
+        :param file_path_or_prefix: The name of the file, or the prefix of the files, authorized.
+        :param auth_duration: The validity of the token, in seconds (from 1 to 604800, one week).
+        :param bucket_id: The id of the bucket of the files. If empty, the currently-set bucket.
+        :param allow_broader: True to also reuse a cached token of a broader prefix, which grants
+                              access to more files than requested.
+        :returns: The download authorization token.
+        :raises RequestError: If the user is not authenticated.
         """
-        # duration = Min duration is 1 second, max is 604800 (one week).
         self._ensure_auth()
+        bucket_id = bucket_id if bucket_id else self.bucket_id
+        cache = self._download_auth_cache
+        token = cache.get(bucket_id, file_path_or_prefix, auth_duration, allow_broader) \
+            if cache else None
+        if token is not None:
+            return token
         data = {
-            'bucketId': bucket_id if bucket_id else self.bucket_id,
+            'bucketId': bucket_id,
             'fileNamePrefix': file_path_or_prefix,
             'validDurationInSeconds': auth_duration,
         }
-        response = self._http.post(self._make_url(Endpoints.download_auth.value), json=data,
-                                   headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(data, 'Failed to get download auth for prefix "{}" on bucket "{}": {}.'
-                        .format(file_path_or_prefix, data['bucketId'], data.get('message', '')))
+        started = monotonic()
+        data = self._call(Endpoints.download_auth,
+                          f'Failed to get download auth for prefix "{file_path_or_prefix}" '
+                          f'on bucket "{bucket_id}"', json=data)
+        if cache is not None:
+            cache.put(bucket_id, file_path_or_prefix, data['authorizationToken'],
+                      auth_duration - (monotonic() - started))
         return data['authorizationToken']
 
     def delete_file(self, file_id:str, file_path:str):
@@ -668,13 +1274,88 @@ class BackBlazeB2():
         """
         self._ensure_auth()
         data = {'fileName': file_path, 'fileId': file_id}
-        response = self._http.post(self._make_url(Endpoints.delete_file.value), json=data,
-                                   headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(data, 'Failed to delete file with id "{}" and path "{}" ({}).'.format(
-            file_id, file_path, data.get('message', '')))
+        data = self._call(Endpoints.delete_file,
+                          f'Failed to delete file with id "{file_id}" and path "{file_path}"',
+                          json=data)
+        self._notify_file_change(data, deleted=True)
+        return data
+
+    def hide_file(self, file_name:str, bucket_id:str='') -> Json:
+        """
+        Hides a file, so it is no longer listed nor downloadable by name. Its previous versions are
+        kept, until deleted or removed by the bucket's lifecycle rules.
+
+        :param file_name: The name of the file in the backblaze service.
+        :param bucket_id: The id of the bucket where the file is. If empty, will try to use the
+                          currently-set bucket.
+        :returns: A dict with the json-encoded data of the hide marker.
+        .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_hide_file.html>`_.
+        """
+        self._ensure_auth()
+        data = {'bucketId': bucket_id if bucket_id else self.bucket_id, 'fileName': file_name}
+        data = self._call(Endpoints.hide_file, f'Failed to hide file "{file_name}"', json=data)
+        self._notify_file_change(data)
         return data
 
+    # pylint: disable = too-many-arguments
+    def copy_file(self, source_file_id:str, file_name:str, bucket_id:str='',
+                  byte_range:Optional[Tuple[int, int]]=None, content_type:Optional[str]=None,
+                  file_info:Optional[Json]=None) -> Json:
+        """
+        Copies a file (or a range of its bytes, up to 5GB) to a new file, on the server side.
+        The metadata of the source file is kept, unless a content type is given to replace it.
+
+        :param source_file_id: The id of the file to be copied.
+        :param file_name: The name of the new file.
+        :param bucket_id: The id of the bucket of the new file. If empty, the source's bucket.
+        :param byte_range: A 2-tuple containing (first, last) positions (inclusive) of the range of
+                           bytes to be copied. If None, the whole file is copied.
+        :param content_type: The content type of the new file. If None, the source's metadata
+                             (content type and file info) is copied.
+        :param file_info: The file info of the new file, when replacing the metadata.
+        :returns: A dict with the json-encoded data of the new file.
+        :raises RequestError: If the user is not authenticated.
+        .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_copy_file.html>`_.
+        """
+        self._ensure_auth()
+        params = {'sourceFileId': source_file_id, 'fileName': file_name}
+        if bucket_id:
+            params['destinationBucketId'] = bucket_id
+        if byte_range is not None:
+            params['range'] = f'bytes={byte_range[0]}-{byte_range[1]}'
+        if content_type is not None:
+            params.update({'metadataDirective': 'REPLACE', 'contentType': content_type,
+                           'fileInfo': file_info if file_info else {}})
+        data = self._call(Endpoints.copy_file,
+                          f'Failed to copy file with id "{source_file_id}" to "{file_name}"',
+                          json=params)
+        self._notify_file_change(data)
+        return data
+    # pylint: enable = too-many-arguments
+
+    def copy_part(self, source_file_id:str, large_file_id:str, part_number:int,
+                  byte_range:Optional[Tuple[int, int]]=None) -> Json:
+        """
+        Copies a range of bytes of a file as a part of a large file, on the server side.
+
+        :param source_file_id: The id of the file to be copied.
+        :param large_file_id: The id of the large file, as returned by start_large_file().
+        :param part_number: The number of the part, from 1 to 10000.
+        :param byte_range: A 2-tuple containing (first, last) positions (inclusive) of the range of
+                           bytes to be copied. If None, the whole file is copied.
+        :returns: A json-like dict containing the keys: fileId, partNumber, contentLength,
+                  contentSha1, contentMd5, uploadTimestamp.
+        :raises RequestError: If the user is not authenticated.
+        .. seealso:: `Reference <https://www.backblaze.com/b2/docs/b2_copy_part.html>`_.
+        """
+        self._ensure_auth()
+        params = {'sourceFileId': source_file_id, 'largeFileId': large_file_id,
+                  'partNumber': part_number}
+        if byte_range is not None:
+            params['range'] = f'bytes={byte_range[0]}-{byte_range[1]}'
+        return self._call(Endpoints.copy_part, f'Failed to copy part number #{part_number}',
+                          json=params)
+
     def create_key(self, account_id:str, capabilities:List[KeyCapabilities], key_name:str,
                    bucket_id:str='', prefix:str='', duration:int=0) -> Json:
         self._ensure_auth()
@@ -689,12 +1370,7 @@ class BackBlazeB2():
             params['bucketId'] = bucket_id
         if prefix:
             params['namePrefix'] = prefix
-        response = self._http.post(self._make_url(Endpoints.create_key.value), json=params,
-                                   headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(data, 'Failed to create key "{}": {}.'.format(key_name,
-                                                                      data.get('message', '')))
-        return data
+        return self._call(Endpoints.create_key, f'Failed to create key "{key_name}"', json=params)
 
     def list_keys(self, account_id:str, max_key_count:int=0, start_app_key_id:str=''):
         self._ensure_auth()
@@ -703,54 +1379,261 @@ class BackBlazeB2():
             params['maxKeyCount'] = max_key_count
         if start_app_key_id:
             params['startApplicationKeyId'] = start_app_key_id
-        response = self._http.post(self._make_url(Endpoints.list_keys.value),
-                                   json=params, headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(data, 'Failed to list keys: {}.'.format(data.get('message', '')))
-        return data
+        return self._call(Endpoints.list_keys, 'Failed to list keys', json=params)
 
     def delete_key(self, key_id:str) -> Json:
         self._ensure_auth()
-        response = self._http.post(self._make_url(Endpoints.delete_key.value),
-                                   json={'applicationKeyId': key_id}, headers=self._headers())
-        data = json_loads(response.text)
-        check_b2_errors(data, 'Failed to delete key "{}": {}.'.format(key_id,
-                                                                      data.get('message', '')))
-        return data
+        return self._call(Endpoints.delete_key, f'Failed to delete key "{key_id}"',
+                          json={'applicationKeyId': key_id})
     # endregion
 
     # region Shortcut methods
-    def download_file(self, url:str, save_path:Union[str, Path],):
+    # pylint: disable = too-many-arguments
+    def download_file(self, url:str, save_path:Union[str, Path], chunk_size:int=ONE_MB,
+                      workers:int=0, range_size:int=HUNDRED_MB, range_attempts:int=3,
+                      resume:bool=False):
         """
         Downloads a file from the server to the file system. This is a blocking operation.
         The file can be downloaded using either its ID or by specifying bucket_name + file_name.
+        The content is streamed to the file in chunks, so memory usage does not depend on the
+        size of the file.
+        When using multiple workers, files larger than the range size are split into byte ranges
+        downloaded concurrently, each one written directly at its offset of a (preallocated)
+        temporary file next to the destination, which is renamed into place once every range is
+        written, or removed if any fails. Ranges that fail are retried individually, following
+        the retry policy (see BackBlazeB2.set_retry_policy()).
+
+        Resumable downloads are written to a temporary file next to the destination (named after
+        it, with the ".download" suffix) along with a checkpoint of the byte ranges already
+        written (see :class:`~blaziken.checkpoint.DownloadCheckpoint`). Downloading the same file
+        again after an interruption only requests the missing ranges. Once complete, the file is
+        verified with the SHA1 sent by the server, if any, and atomically renamed into place.
 
         :param save_path: The path where the file will be written (must include the file name).
         :param url: The URL of the file to be downloaded.
                     Use download_url_path() or download_url_id() to get the file url.
+        :param chunk_size: The maximum size (in bytes) of each chunk written to the file.
+        :param workers: The number of ranges downloaded concurrently. If 0, the value set with
+                        BackBlazeB2.set_download_workers() is used.
+        :param range_size: The size (in bytes) of each range downloaded by the workers.
+        :param range_attempts: The number of times the download of a range is attempted.
+        :param resume: True to make the download resumable, continuing an interrupted one if any.
+        :raises ResponseError: If the SHA1 of a resumable download does not match the server's.
         """
         self._ensure_auth()
         dir_path = Path(save_path).parent
         if not dir_path.exists():
             dir_path.mkdir(parents=True, exist_ok=True)
-        with open(save_path, 'wb') as file_handle:
-            response = self._http.get(url, allow_redirects=True, headers=self._headers(),
-                                      timeout=None)
-            file_handle.write(response.content)
+        workers = workers if workers else self.download_workers
+        if resume:
+            self._download_resumable(url, Path(save_path), chunk_size, workers, range_size,
+                                     range_attempts)
+            return
+        size = self.download_size(url) if workers > 1 else 0
+        if size <= range_size:
+            with open(save_path, 'wb') as file_handle:
+                for chunk in self.iter_download(url, chunk_size):
+                    file_handle.write(chunk)
+            return
+        with NamedTemporaryFile('wb', dir=dir_path, prefix=f'{Path(save_path).name}.',
+                                suffix='.tmp', delete=False) as file_handle:
+            file_handle.truncate(size)
+        ranges = [(start, min(start + range_size, size) - 1)
+                  for start in range(0, size, range_size)]
+        try:
+            self._download_ranges(url, file_handle.name, ranges, chunk_size, workers,
+                                  range_attempts)
+        except BaseException:
+            Path(file_handle.name).unlink()
+            raise
+        replace(file_handle.name, save_path)
+
+    def _download_resumable(self, url:str, save_path:Path, chunk_size:int, workers:int,
+                            range_size:int, range_attempts:int):
+        """
+        Downloads a file to a temporary file with a checkpoint, resuming a previous download of
+        the same file, and renames it into place once verified. See BackBlazeB2.download_file().
+        """
+        headers = self._download_headers(url)
+        size = int(headers['Content-Length'])
+        file_sha1_hex = headers.get('X-Bz-Content-Sha1', 'none')
+        if file_sha1_hex == 'none':  # Large files only have the SHA1 their uploader provided
+            file_sha1_hex = headers.get('X-Bz-Info-large_file_sha1', 'none')
+        file_sha1_hex = file_sha1_hex.replace('unverified:', '')
+        identity = {'fileId': headers.get('X-Bz-File-Id', ''), 'size': size,
+                    'sha1': file_sha1_hex}
+        temp_path = save_path.with_name(f'{save_path.name}.download')
+        checkpoint = DownloadCheckpoint.load(
+            save_path.with_name(f'{save_path.name}.download.json'), identity)
+        if not checkpoint.ranges or not temp_path.exists() or temp_path.stat().st_size != size:
+            checkpoint = DownloadCheckpoint(checkpoint.path, identity)
+            with open(temp_path, 'wb') as file_handle:
+                file_handle.truncate(size)
+        ranges = [(position, min(position + range_size - 1, end))
+                  for start, end in checkpoint.missing(size)
+                  for position in range(start, end + 1, range_size)]
+        try:
+            self._download_ranges(url, temp_path, ranges, chunk_size, workers, range_attempts,
+                                  checkpoint)
+        finally:
+            checkpoint.save()
+        if file_sha1_hex != 'none':
+            with open(temp_path, 'rb') as file_handle:
+                downloaded_sha1 = file_sha1(file_handle)
+            if downloaded_sha1 != file_sha1_hex:
+                temp_path.unlink()
+                checkpoint.remove()
+                raise ResponseError(f'The SHA1 of the file downloaded from {url} is '
+                                    f'{downloaded_sha1} instead of {file_sha1_hex}')
+        replace(temp_path, save_path)
+        checkpoint.remove()
+
+    def _download_ranges(self, url:str, save_path:Union[str, Path], ranges:List[Tuple[int, int]],
+                         chunk_size:int, workers:int, attempts:int,
+                         checkpoint:Optional[DownloadCheckpoint]=None):
+        """
+        Downloads byte ranges of a file concurrently, writing each one at its offset of the
+        destination file, which must already exist. The first failure is raised.
+
+        :param ranges: A list of 2-tuples containing (first, last) positions (inclusive).
+        :param checkpoint: The checkpoint where the written ranges are recorded, if any.
+        """
+        if not ranges:
+            return
+        with ThreadPoolExecutor(min(workers, len(ranges))) as executor:
+            futures = [executor.submit(self._download_range, url, save_path, start, end,
+                                       chunk_size, attempts, checkpoint) for start, end in ranges]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                future.result()
+
+    def _download_range(self, url:str, save_path:Union[str, Path], start:int, end:int,
+                        chunk_size:int, attempts:int,
+                        checkpoint:Optional[DownloadCheckpoint]=None):
+        """
+        Downloads a range of bytes of a file, writing it at its offset of the destination file.
+        If the download fails, it is resumed from the last written byte up to attempts times, if
+        the retry policy allows it and after the delay it sets. The requests themselves are not
+        retried by the Http instance, so each failure is only retried here.
+
+        :param start: The position of the first byte of the range.
+        :param end: The position of the last byte of the range (inclusive).
+        :param checkpoint: The checkpoint where the chunks are recorded once flushed, if any.
+        """
+        with open(save_path, 'r+b') as file_handle:
+            file_handle.seek(start)
+            position = start
+            for attempt in range(attempts):
+                try:
+                    for chunk in self.iter_download(url, chunk_size, position, end, retry=False):
+                        file_handle.write(chunk)
+                        if checkpoint is not None:
+                            file_handle.flush()
+                            checkpoint.add(position, position + len(chunk) - 1)
+                        position += len(chunk)
+                    if position > end:
+                        return
+                    raise InternetError(f'Connection closed at byte {position} of range '
+                                        f'{start}-{end}')
+                except (InternetError, RequestError) as error:
+                    delay = self._http.retry.next_delay(error, attempt, 'GET', url) \
+                        if attempt + 1 < attempts else None
+                    if delay is None:
+                        raise
+                self._http.retry.wait(delay)
+    # pylint: enable = too-many-arguments
+
+    def _download_headers(self, url:str) -> Mapping[str, str]:
+        """ Gets the headers of a file (e.g.: its size and SHA1) without downloading it. """
+        self._ensure_auth()
+        response = self._authorized(
+            lambda headers: self._http.head(url, allow_redirects=True, headers=headers))
+        return response.headers
 
+    def download_size(self, url:str) -> int:
+        """
+        Gets the size of a file without downloading it.
+
+        :param url: The URL of the file. Use download_url_path() or download_url_id() to get it.
+        :returns: The size of the file, in bytes.
+        """
+        return int(self._download_headers(url)['Content-Length'])
+
+    def iter_download(self, url:str, chunk_size:int=ONE_MB, start:int=0, end:Optional[int]=None,
+                      retry:bool=True) -> Generator[bytes, None, None]:
+        """
+        Downloads a file from the server, yielding its content in chunks as it arrives, so that
+        the whole file is never held in memory.
+
+        :param url: The URL of the file to be downloaded.
+                    Use download_url_path() or download_url_id() to get the file url.
+        :param chunk_size: The maximum size (in bytes) of each yielded chunk.
+        :param start: The position of the first byte to be downloaded.
+        :param end: The position of the last byte to be downloaded (inclusive). If None, the file
+                    is downloaded until its end.
+        :param retry: False to request the file once, without retrying failed requests (e.g.: when
+                      the caller resumes the download from the last received byte instead).
+        :yields: The chunks of the file content, in order.
+        :raises InternetError: If the connection is lost during the download.
+        :raises RequestError: If a range was requested but the server sent the whole file.
+        """
+        self._ensure_auth()
+        byte_range = f'bytes={start}-{"" if end is None else end}' \
+            if start or end is not None else ''
+
+        def request(headers:Dict[str, str]) -> Response:
+            if byte_range:
+                headers['Range'] = byte_range
+            return self._http.get(url, allow_redirects=True, headers=headers, timeout=None,
+                                  stream=True, retry=retry)
+
+        with self._authorized(request) as response:
+            if byte_range and response.status_code != 206:
+                raise RequestError(f'Server did not honor the range {byte_range} of {url}',
+                                   response.status_code)
+            try:
+                yield from response.iter_content(chunk_size)
+            except RequestException as error:
+                raise InternetError(f'Connection lost while downloading {url}') from error
+
+    # pylint: disable = too-many-arguments, too-many-locals, too-many-branches
     def upload_large_file(self, file_or_path:Union[BinaryIO, Path], file_name:str, file_size:int=0,
-                          bucket_id:str='') -> UploadGenerator:
+                          bucket_id:str='', workers:int=0, last_modified_ms:Optional[int]=None,
+                          resume:bool=False) -> UploadGenerator:
         """
         Uploads a large file from the file system over multiple requests.
-        A large file is any file larger than the current BackBlazeB2.part_size value.
+        A large file is any file that BackBlazeB2.plan_parts() splits in more than one part.
+        Parts are streamed from the file, so memory usage does not depend on the part size.
+        When using multiple workers, each one uploads parts with its own upload part URL, reading
+        them from the file independently.
+
+        Failed parts are retried on their own, as allowed by the retry policy (see
+        BackBlazeB2.set_retry_policy()), and the large file is only cancelled once a part has
+        exhausted its retries.
+
+        When resuming, the most recently started unfinished large file with the same name, size and
+        modification time (stored in the "src_content_length" and "src_last_modified_millis" file
+        info) is continued: its parts keep the size they were started with, the parts already
+        stored which size and SHA1 match the local data are kept, and only the other parts are
+        uploaded. An unfinished file which parts do not fit the local file is cancelled and the
+        upload starts over. A resumable upload that fails is not cancelled, so it can be resumed
+        later (see BackBlazeB2.cancel_unfinished_large_files() to clean up the ones that never are).
 
         :param file_path: The path to the file on the file system.
         :param bucket_id: The id of the bucket where to upload the file.
         :param file_name: The name to give to the file in the backblaze server.
+        :param workers: The number of parts uploaded concurrently. If 0, the value set with
+                        BackBlazeB2.set_upload_workers() is used.
+        :param last_modified_ms: The modification time of the original file, in milliseconds.
+        :param resume: True to resume an unfinished upload of the file, if there is one.
         :returns: The file-uploading generator.
         :yields: A 3-tuple containing (upload response, part number, total part count). The part
                  number starts at 1, and if the upload is successfull, the final tuple will have
-                 part number 0 and the response will contain the finalized file data.
+                 part number 0 and the response will contain the finalized file data. When using
+                 multiple workers, parts are yielded in the order their uploads finish. Parts kept
+                 from a resumed upload are yielded first, with the data listed by the service.
         """
         self._ensure_auth()
         is_path = isinstance(file_or_path, (str, Path))
@@ -760,61 +1643,196 @@ class BackBlazeB2():
             raise ValueError("You must specify the file size when uploading an opened file")
         else:
             path_or_size = file_size
-        _, parts_count, parts_size = upload_parts_count(path_or_size, self.part_size)
-        file_id = self.start_large_file(bucket_id if bucket_id else self.bucket_id,
-                                        file_name)['fileId']
+        size, parts_count, parts_size = self.plan_parts(path_or_size, workers)
+        file_info = {'src_last_modified_millis': str(last_modified_ms)} \
+            if last_modified_ms is not None else {}
+        if resume:  # The size identifies the file even when its modification time is unknown
+            file_info['src_content_length'] = str(size)
+        bucket_id = bucket_id if bucket_id else self.bucket_id
+        unfinished, stored = self._find_resumable_large_file(
+            file_name, bucket_id, file_info, size) if resume else (None, {})
+        if stored:
+            parts_size = self._stored_parts_size(stored, size)
+            parts_count = -(-size // parts_size)
+        file_id = unfinished['fileId'] if unfinished is not None \
+            else self.start_large_file(bucket_id, file_name, file_info=file_info or None)['fileId']
         file_handle = open(file_or_path, 'rb') if isinstance(file_or_path, (str, Path)) \
             else file_or_path
         try:
-            parts_sha1 = []
-            for i in range(parts_count):
-                upload_url_data = self.get_upload_part_url(file_id)
-                upload_result = self.upload_part(file_handle.read(parts_size),
-                                                 upload_url_data['uploadUrl'], i + 1,
-                                                 upload_url_data['authorizationToken'])
-                parts_sha1.append(upload_result['contentSha1'])
-                yield (upload_result, i + 1, parts_count)
+            start = file_handle.tell()
+            parts = [(i + 1, start + i * parts_size, min(parts_size, size - i * parts_size))
+                     for i in range(parts_count)]
+            reader = partial(FileRange, file_handle, lock=Lock())
+            parts_sha1 = [''] * parts_count
+            missing = []
+            for part_number, offset, part_size in parts:
+                part = stored.get(part_number)
+                if part is not None and part.get('contentLength') == part_size \
+                        and part.get('contentSha1') == content_sha1(reader(offset, part_size)):
+                    parts_sha1[part_number - 1] = part['contentSha1']
+                    yield (part, part_number, parts_count)
+                else:
+                    missing.append((part_number, offset, part_size))
+            for upload_result, part_number in self._upload_parts(
+                    file_id, missing, reader, workers if workers else self.upload_workers):
+                parts_sha1[part_number - 1] = upload_result['contentSha1']
+                yield (upload_result, part_number, parts_count)
             yield (self.finish_large_file(file_id, parts_sha1), 0, parts_count)
         except (BlazeError, RequestError) as error:
-            self.cancel_large_file(file_id)
+            if not resume:
+                self.cancel_large_file(file_id)
             raise error
         finally:
             if is_path:
                 file_handle.close()
+    # pylint: enable = too-many-arguments, too-many-locals, too-many-branches
+
+    def _find_resumable_large_file(self, file_name:str, bucket_id:str, file_info:Json,
+                                   size:int) -> Tuple[Optional[Json], Dict[int, Json]]:
+        """
+        Finds the unfinished large file continued by a resumed upload and its stored parts (see
+        BackBlazeB2.find_unfinished_large_file()). A file which stored parts do not fit the local
+        file is cancelled instead, as it could not be finished.
+
+        :returns: A 2-tuple containing (unfinished large file or None, dict mapping the number of
+                  each stored part to its json-encoded data).
+        """
+        unfinished = self.find_unfinished_large_file(file_name, bucket_id, file_info)
+        stored = self.uploaded_parts(unfinished['fileId']) if unfinished is not None else {}
+        if stored and not self._stored_parts_size(stored, size):
+            self.cancel_large_file(unfinished['fileId'])
+            return (None, {})
+        return (unfinished, stored)
+
+    @staticmethod
+    def _stored_parts_size(stored:Dict[int, Json], size:int) -> int:
+        """
+        Gets the part size of the parts stored for an unfinished large file, which is the size of
+        its first part, so they are kept when resuming its upload.
+
+        :param stored: A dict mapping the number of each stored part to its json-encoded data.
+        :param size: The size of the file, in bytes.
+        :returns: The part size, in bytes, or 0 if the file cannot be finished with the stored
+                  parts (e.g.: they are numbered beyond the parts of the file).
+        """
+        parts_size = stored.get(1, {}).get('contentLength') or 0
+        if not parts_size or parts_size >= size or parts_size > FIVE_GB:
+            return 0
+        parts_count = -(-size // parts_size)
+        if parts_count > MAX_LARGE_FILE_PARTS or max(stored) > parts_count:
+            return 0
+        return parts_size
+
+    def _upload_parts(self, file_id:str, parts:List[Tuple[int, int, int]],
+                      reader:Callable[[int, int], FileRange],
+                      workers:int) -> Generator[Tuple[Json, int], None, None]:
+        """
+        Uploads the parts of a large file, using a pool of workers if more than one is requested.
+
+        :param file_id: The id of the large file, as returned by BackBlazeB2.start_large_file().
+        :param parts: A list of 3-tuples containing (part number, offset, size) of each part.
+        :param reader: A function that gets the data of the part given its offset and size.
+        :param workers: The number of parts to be uploaded concurrently.
+        :yields: A 2-tuple containing (upload response, part number) for each uploaded part.
+        """
+        parts_queue = Queue()
+        for part in parts:
+            parts_queue.put(part)
+        if workers <= 1 or len(parts) <= 1:
+            yield from self._part_worker(file_id, parts_queue, reader, Event())
+            return
+        results = Queue()
+        stop = Event()
+
+        def work():
+            try:
+                for result in self._part_worker(file_id, parts_queue, reader, stop):
+                    results.put(result)
+            except Exception as error:  # pylint: disable = broad-except  # Re-raised by the caller
+                results.put((error, 0))
+
+        with ThreadPoolExecutor(min(workers, len(parts))) as executor:
+            for _ in range(min(workers, len(parts))):
+                executor.submit(work)
+            try:
+                for _ in parts:
+                    upload_result, part_number = results.get()
+                    if isinstance(upload_result, Exception):
+                        raise upload_result
+                    yield (upload_result, part_number)
+            finally:
+                stop.set()
+
+    def _part_worker(self, file_id:str, parts:Queue, reader:Callable[[int, int], FileRange],
+                     stop:Event) -> Generator[Tuple[Json, int], None, None]:
+        """
+        Uploads parts taken from the queue until it is empty or the stop event is set, using the
+        same upload part URL for all of them. A failed part is retried on its own, reading its
+        range again and with a new upload part URL, as allowed by the retry policy (see
+        BackBlazeB2.set_retry_policy()), so only a part that exhausts its retries fails the upload.
+
+        :yields: A 2-tuple containing (upload response, part number) for each uploaded part.
+        """
+        upload_url_data = None
+        while not stop.is_set():
+            try:
+                part_number, offset, size = parts.get_nowait()
+            except Empty:
+                break
+            attempt = 0
+            while True:
+                if upload_url_data is None:
+                    upload_url_data = self.get_upload_part_url(file_id)
+                try:
+                    result = self.upload_part(reader(offset, size), upload_url_data['uploadUrl'],
+                                              part_number, upload_url_data['authorizationToken'])
+                    break
+                except (InternetError, RequestError) as error:
+                    delay = self._http.retry.next_delay(error, attempt, 'POST',
+                                                        Endpoints.upload_part.value,
+                                                        fresh_url=True)
+                    if delay is None or stop.is_set():
+                        raise
+                upload_url_data = None
+                self._http.retry.wait(delay)
+                attempt += 1
+            yield (result, part_number)
 
     def upload_path(self, file_path:Path, file_name:str='', append_filename:bool=False,
-                    bucket_id:str='') -> UploadGenerator:
+                    bucket_id:str='', resume:bool=False) -> UploadGenerator:
         """
         Uploads an arbitrarily-sized file from the file system, automatically choosing either a
-        single or multi-part upload.
+        single or multi-part upload. The file's modification time is stored in the
+        "src_last_modified_millis" file info, so it can be compared later (e.g.: when syncing).
 
         :param file_path: The path to the file to be uploaded.
         :param file_name: The name to be given to the file in the backblaze server.
         :param append_filename: True to append the local file name to the server file name.
         :param bucket_id: The id of the bucket to which upload the file. If empty, will use the
                           currently-set bucket.
+        :param resume: True to resume an unfinished upload of a large file, if there is one (see
+                       BackBlazeB2.upload_large_file()).
         :returns: The file-uploading generator.
         :yields: A 3-tuple containing (upload response, part number, total part count). The part
                  number starts at 1, and if the upload is successfull, the final tuple will have
                  part number 0 and the response will contain the finalized file data.
         """
         self._ensure_auth()
-        parts_count = upload_parts_count(file_path, self.part_size)[1]
+        size, parts_count, _ = self.plan_parts(file_path)
         if not file_name:
             file_name = file_path.name
         elif append_filename:
             file_name = self.append_filename(file_name, file_path.name)
         bucket_id = bucket_id if bucket_id else self.bucket_id
+        last_modified_ms = int(Path(file_path).stat().st_mtime * 1000)
         if parts_count == 1:
-            upload_data = self.get_upload_url(bucket_id)
-            with open(file_path, 'rb') as file_handle:
-                data = file_handle.read()
-            return self._upload_file_gen(
-                data, upload_data['uploadUrl'], upload_data['authorizationToken'], file_name)
-        return self.upload_large_file(file_path, file_name, bucket_id=bucket_id)
+            return self._upload_file_gen(bucket_id, file_path, size, file_name,
+                                         last_modified_ms=last_modified_ms)
+        return self.upload_large_file(file_path, file_name, bucket_id=bucket_id,
+                                      last_modified_ms=last_modified_ms, resume=resume)
 
     def upload_io(self, file:BinaryIO, file_size:int, file_name:str,
-                  bucket_id:str='') -> UploadGenerator:
+                  bucket_id:str='', resume:bool=False) -> UploadGenerator:
         """
         Uploads an arbitrarily-sized file-like object, automatically choosing either a single or
         multi-part upload given its size.
@@ -824,6 +1842,8 @@ class BackBlazeB2():
         :param file_name: The name to be given to the file in the backblaze server.
         :param bucket_id: The id of the bucket to which upload the file. If empty, will use the
                           currently-set bucket.
+        :param resume: True to resume an unfinished upload of a large file, if there is one (see
+                       BackBlazeB2.upload_large_file()).
         :returns: The file-uploading generator.
         :yields: A 3-tuple containing (upload response, part number, total part count). The part
                  number starts at 1, and if the upload is successfull, the final tuple will have
@@ -831,20 +1851,20 @@ class BackBlazeB2():
         """
         self._ensure_auth()
         file.seek(0)
-        parts_count = upload_parts_count(file_size, self.part_size)[1]
+        parts_count = self.plan_parts(file_size)[1]
         bucket_id = bucket_id if bucket_id else self.bucket_id
         if parts_count == 1:
-            upload_data = self.get_upload_url(bucket_id)
-            return self._upload_file_gen(
-                file.read(), upload_data['uploadUrl'], upload_data['authorizationToken'], file_name)
-        return self.upload_large_file(file, file_name, file_size, bucket_id)
+            return self._upload_file_gen(bucket_id, file, file_size, file_name)
+        return self.upload_large_file(file, file_name, file_size, bucket_id, resume=resume)
 
+    # pylint: disable = too-many-arguments
     def upload(self, file_or_path:Union[str, Path, BinaryIO], file_name:str='',
-               append_filename:bool=False, file_size:int=0, bucket_id:str='') -> UploadGenerator:
+               append_filename:bool=False, file_size:int=0, bucket_id:str='',
+               resume:bool=False) -> UploadGenerator:
         """
         Uploads a file using an opened file or the path to the file in the file system.
-        This method will automatically upload using multiple parts if the file is larger than the
-        configured part_size.
+        This method will automatically upload using multiple parts if BackBlazeB2.plan_parts()
+        splits the file.
 
         :param file_or_path: The opened file or path to the file to be uploaded.
         :param file_name: The name to be given to the file in the backblaze server.
@@ -854,14 +1874,138 @@ class BackBlazeB2():
                           Required when uploading from an opened file.
         :param bucket_id: The id of the bucket to which the file will be uploaded. If empty, will
                           try to use the currently-set bucket's id.
+        :param resume: True to resume an unfinished upload of a large file, if there is one (see
+                       BackBlazeB2.upload_large_file()).
         :returns: The file-uploading generator.
         :yields: A 3-tuple containing (upload response, part number, total part count). The part
                  number starts at 1, and if the upload is successfull, the final tuple will have
                  part number 0 and the response will contain the finalized file data.
         """
         if isinstance(file_or_path, (str, Path)):
-            return self.upload_path(file_or_path, file_name, append_filename, bucket_id)
+            return self.upload_path(file_or_path, file_name, append_filename, bucket_id, resume)
         if not file_size:
             raise ValueError('File size must be specified when uploading an opened file')
-        return self.upload_io(file_or_path, file_size, file_name, bucket_id)
+        return self.upload_io(file_or_path, file_size, file_name, bucket_id, resume)
+    # pylint: enable = too-many-arguments
+
+    def unfinished_large_files(self, bucket_id:str='',
+                               name_prefix:str='') -> Generator[Json, None, None]:
+        """
+        Lists all the unfinished large files of a bucket, requesting them page by page.
+        Parameters are the same as :func:`BackBlazeB2.list_unfinished_large_files()`.
+
+        :yields: The json-encoded data of each unfinished large file.
+        """
+        start_file_id = ''
+        while True:
+            data = self.list_unfinished_large_files(bucket_id, name_prefix, start_file_id, 100)
+            yield from data.get('files', [])
+            start_file_id = data.get('nextFileId')
+            if not start_file_id:
+                break
+
+    def uploaded_parts(self, file_id:str) -> Dict[int, Json]:
+        """
+        Lists all the parts uploaded to an unfinished large file.
+
+        :param file_id: The file id returned by BackBlazeB2.start_large_file().
+        :returns: A dict mapping the number of each part to its json-encoded data.
+        """
+        parts = {}
+        start_part = 0
+        while True:
+            data = self.list_parts(file_id, start_part, 1000)
+            parts.update((part['partNumber'], part) for part in data.get('parts', []))
+            start_part = data.get('nextPartNumber')
+            if not start_part:
+                break
+        return parts
+
+    def find_unfinished_large_file(self, file_name:str, bucket_id:str='',
+                                   file_info:Optional[Json]=None) -> Optional[Json]:
+        """
+        Finds the most recently started unfinished large file with a name and file info. The file
+        info must identify the local file (e.g.: with its size and modification time, as set by
+        BackBlazeB2.upload_large_file()), otherwise an unrelated upload would be resumed.
+
+        :param file_name: The name of the file in the backblaze server.
+        :param bucket_id: The id of the bucket of the file. If empty, will try to use the bucket
+                          set with BackBlazeB2.set_bucket().
+        :param file_info: The file info the file was started with.
+        :returns: The json-encoded data of the unfinished large file, None if there is none or if
+                  no file info is given.
+        """
+        if not file_info:
+            return None
+        name = quote(file_name)  # As started by BackBlazeB2.start_large_file()
+        found = None
+        for data in self.unfinished_large_files(bucket_id, name):
+            if data.get('fileName') == name and data.get('fileInfo') == file_info \
+                    and (found is None or data.get('uploadTimestamp', 0)
+                         >= found.get('uploadTimestamp', 0)):
+                found = data
+        return found
+
+    def cancel_unfinished_large_files(self, older_than:float, bucket_id:str='',
+                                      name_prefix:str='') -> List[Json]:
+        """
+        Cancels the unfinished large files started before a time, deleting their uploaded parts,
+        to clean up the uploads abandoned by failures or crashes (which are stored and billed
+        until they are finished or cancelled).
+
+        :param older_than: The minimum age, in seconds, of the unfinished large files cancelled.
+        :param bucket_id: The id of the bucket of the files. If empty, will try to use the bucket
+                          set with BackBlazeB2.set_bucket().
+        :param name_prefix: Cancels only files which names start with the specified prefix.
+        :returns: A list with the json-encoded response of each cancelled file.
+        """
+        started_before = (time() - older_than) * 1000
+        stale = [data['fileId'] for data in self.unfinished_large_files(bucket_id, name_prefix)
+                 if data.get('uploadTimestamp', 0) < started_before]
+        return [self.cancel_large_file(file_id) for file_id in stale]
+
+    # pylint: disable = too-many-arguments
+    def copy(self, source:Json, file_name:str, bucket_id:str='', content_type:Optional[str]=None,
+             file_info:Optional[Json]=None, workers:int=0) -> Json:
+        """
+        Copies a file on the server side, without downloading it. Files are copied with a single
+        request unless BackBlazeB2.plan_parts() splits them, in which case they are copied as a
+        large file which parts (ranges of the source file) are copied concurrently.
+
+        :param source: The json-encoded data of the file to be copied, with at least its "fileId"
+                       and "contentLength". Its "contentType" and "fileInfo" are also needed to
+                       keep the metadata of large files.
+        :param file_name: The name of the new file.
+        :param bucket_id: The id of the bucket of the new file. If empty, the source's bucket.
+        :param content_type: The content type of the new file. If None, the source's metadata
+                             (content type and file info) is kept.
+        :param file_info: The file info of the new file, when replacing the metadata.
+        :param workers: The number of parts copied concurrently. If 0, the value set with
+                        BackBlazeB2.set_upload_workers() is used.
+        :returns: A dict with the json-encoded data of the new file.
+        """
+        workers = workers if workers else self.upload_workers
+        size, parts_count, parts_size = self.plan_parts(source.get('contentLength', 0), workers)
+        if parts_count == 1:
+            return self.copy_file(source['fileId'], file_name, bucket_id, None, content_type,
+                                  file_info)
+        if content_type is None:
+            content_type = source.get('contentType', 'b2/x-auto')
+            file_info = dict(source.get('fileInfo', {}))
+            if source.get('contentSha1', 'none') != 'none':
+                file_info.setdefault('large_file_sha1', source['contentSha1'])
+        bucket_id = bucket_id or source.get('bucketId') or self.bucket_id
+        file_id = self.start_large_file(bucket_id, file_name, content_type, file_info)['fileId']
+        ranges = [(start, min(start + parts_size, size) - 1)
+                  for start in range(0, size, parts_size)]
+        try:
+            with ThreadPoolExecutor(min(workers, len(ranges))) as executor:
+                parts = list(executor.map(
+                    lambda part: self.copy_part(source['fileId'], file_id, part[0] + 1, part[1]),
+                    enumerate(ranges)))
+            return self.finish_large_file(file_id, [part['contentSha1'] for part in parts])
+        except BlazeError:
+            self.cancel_large_file(file_id)
+            raise
+    # pylint: enable = too-many-arguments
     # endregion
@@ -0,0 +1,396 @@
+""" Module with the concurrent batch operations over many files, such as bulk uploads. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from typing import TypeVar
+# Built-in imports
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from time import sleep
+# Project imports
+from blaziken.exceptions import BlazeError
+from blaziken.exceptions import RequestError
+from blaziken.listing import Paginator
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.api import BackBlazeB2
+    from blaziken.meta import Json
+    from typing import Callable
+    from typing import Generator
+    from typing import Iterable
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+
+T = TypeVar('T')
+
+
+def imap_unordered(function:Callable[..., T], items:Iterable[Tuple], workers:int
+                   ) -> Generator[T, None, None]:
+    """
+    Calls a function with the arguments of each item using a pool of threads, yielding its
+    results in completion order. Only a bounded number of calls is submitted at a time, so the
+    items are consumed lazily and can come from an arbitrarily large generator.
+
+    :param function: The function to be called.
+    :param items: An iterable of tuples with the positional arguments of each call.
+    :param workers: The number of concurrent calls.
+    :yields: The result of each call, as soon as it finishes.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(workers) as executor:
+        pending = set()
+        try:
+            while True:
+                for args in items:
+                    pending.add(executor.submit(function, *args))
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class UploadResult:
+    """
+    Result of the upload of a single file of a batch.
+
+    :ivar path: The path of the uploaded file in the file system.
+    :ivar name: The name given to the file in the backblaze server.
+    :ivar size: The size of the file, in bytes.
+    :ivar data: The json-encoded data of the uploaded file, None if the upload failed.
+    :ivar error: The error that made the upload fail, None if it succeeded.
+    :ivar elapsed: The time taken to upload the file, in seconds.
+    """
+
+    def __init__(self, path:Path, name:str, size:int=0, data:Optional[Json]=None,
+                 error:Optional[Exception]=None, elapsed:float=0.0):
+        self.path = path
+        self.name = name
+        self.size = size
+        self.data = data
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}:{"ok" if self.ok else "failed"}> {self.name}'
+
+    @property
+    def ok(self) -> bool:  # pylint: disable = invalid-name
+        """ Checks if the file was uploaded successfully. """
+        return self.error is None
+
+
+class BatchStats:
+    """
+    Aggregate statistics of a batch operation, updated as its results are yielded.
+
+    :ivar files: The number of files successfully processed.
+    :ivar failed: The number of files that failed.
+    :ivar bytes: The number of bytes successfully processed.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.failed = 0
+        self.bytes = 0
+        self._start:Optional[float] = None
+        self._end:Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (f'<{self.__class__.__name__}> {self.files} files ({self.failed} failed), '
+                f'{self.bytes_per_second / 1024 ** 2:.2f} MB/s')
+
+    @property
+    def elapsed(self) -> float:
+        """ Gets the time, in seconds, since the batch started (until it ended, if it did). """
+        if self._start is None:
+            return 0.0
+        return (self._end if self._end is not None else monotonic()) - self._start
+
+    @property
+    def bytes_per_second(self) -> float:
+        """ Gets the aggregate throughput of the batch, in bytes per second. """
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """ Gets the number of files processed per second. """
+        return (self.files + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    def start(self):
+        """ Marks the start of the batch. """
+        self._start = monotonic()
+        self._end = None
+
+    def stop(self):
+        """ Marks the end of the batch. """
+        self._end = monotonic()
+
+    def add(self, size:int, ok:bool):  # pylint: disable = invalid-name
+        """ Accounts a processed file of the given size. """
+        if ok:
+            self.files += 1
+            self.bytes += size
+        else:
+            self.failed += 1
+
+
+class UploadBatch:
+    """
+    Uploads many files concurrently using a pool of workers. Iterating over the batch starts the
+    uploads and yields an UploadResult for each file as soon as its upload finishes, in completion
+    order. A failed upload does not abort the batch, its error is reported in its result.
+    Small files reuse the pooled upload URLs (see :class:`~blaziken.pool.UploadUrlPool`) and files
+    larger than the part size are uploaded as large files. The files to be uploaded are listed
+    lazily, so directories with millions of files are never held in memory.
+
+    :ivar stats: The aggregate statistics of the batch, updated as results are yielded.
+
+    :example:
+
+    >>> batch = bucket.upload_many(Path('photos'), prefix='backup/photos', workers=16)
+    >>> for result in batch:
+    >>>     if not result.ok:
+    >>>         print(f'Failed to upload {result.path}: {result.error}')
+    >>> print(f'{batch.stats.bytes_per_second / 1024 ** 2:.2f} MB/s')
+
+    """
+
+    def __init__(self, api:BackBlazeB2, bucket_id:str,
+                 paths_or_dir:Union[str, Path, Iterable[Union[str, Path]]], prefix:str='',
+                 workers:int=8):
+        """
+        :param api: The BackBlazeB2 instance used to upload the files.
+        :param bucket_id: The id of the bucket where the files will be uploaded.
+        :param paths_or_dir: A directory, whose files are uploaded recursively keeping their
+                             relative paths as names, or an iterable of file paths, uploaded
+                             using their base names.
+        :param prefix: The virtual folder where the files will be uploaded.
+        :param workers: The number of files uploaded concurrently.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        self.stats = BatchStats()
+        self._api = api
+        self._bucket_id = bucket_id
+        self._paths_or_dir = paths_or_dir
+        self._prefix = prefix
+        self._workers = workers
+
+    def __iter__(self) -> Generator[UploadResult, None, None]:
+        self.stats.start()
+        try:
+            for result in imap_unordered(self._upload, self._sources(), self._workers):
+                self.stats.add(result.size, result.ok)
+                yield result
+        finally:
+            self.stats.stop()
+
+    def _name(self, name:str) -> str:
+        """ Prefixes a file name with the batch prefix. """
+        return self._api.append_filename(self._prefix, name) if self._prefix else name
+
+    def _sources(self) -> Generator[Tuple[Path, str], None, None]:
+        """ Lazily lists the files to be uploaded and the names to give them. """
+        if isinstance(self._paths_or_dir, (str, Path)) and Path(self._paths_or_dir).is_dir():
+            directory = Path(self._paths_or_dir)
+            for path in directory.rglob('*'):
+                if path.is_file():
+                    yield (path, self._name(path.relative_to(directory).as_posix()))
+            return
+        paths = [self._paths_or_dir] if isinstance(self._paths_or_dir, (str, Path)) \
+            else self._paths_or_dir
+        for path in paths:
+            yield (Path(path), self._name(Path(path).name))
+
+    def _upload(self, path:Path, name:str) -> UploadResult:
+        """ Uploads a single file, capturing its error instead of raising it. """
+        started = monotonic()
+        result = UploadResult(path, name)
+        try:
+            result.size = path.stat().st_size
+            for data, _, _ in self._api.upload_path(path, name, bucket_id=self._bucket_id):
+                result.data = data
+        except (BlazeError, OSError, ValueError) as error:
+            result.data = None
+            result.error = error
+        result.elapsed = monotonic() - started
+        return result
+
+
+class DeleteResult:
+    """
+    Result of the deletion (or hiding) of a single file version of a batch.
+
+    :ivar name: The name of the file in the backblaze server.
+    :ivar file_id: The id of the deleted version, empty when hiding files by name.
+    :ivar size: The size of the deleted version, in bytes, 0 when hiding files.
+    :ivar data: The json-encoded response of the deletion, None if it failed or the version no
+                longer existed.
+    :ivar error: The error that made the deletion fail, None if it succeeded.
+    :ivar elapsed: The time taken to delete the version, in seconds.
+    """
+
+    # pylint: disable = too-many-arguments
+    def __init__(self, name:str, file_id:str='', size:int=0, data:Optional[Json]=None,
+                 error:Optional[Exception]=None, elapsed:float=0.0):
+        self.name = name
+        self.file_id = file_id
+        self.size = size
+        self.data = data
+        self.error = error
+        self.elapsed = elapsed
+    # pylint: enable = too-many-arguments
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}:{"ok" if self.ok else "failed"}> {self.name}'
+
+    @property
+    def ok(self) -> bool:  # pylint: disable = invalid-name
+        """ Checks if the version was deleted (or hidden) successfully. """
+        return self.error is None
+
+
+class DeleteBatch:
+    """
+    Deletes (or hides) many file versions concurrently using a pool of workers. Iterating over the
+    batch starts the deletions and yields a DeleteResult for each version as soon as it finishes,
+    in completion order. A failed deletion does not abort the batch, its error is reported in its
+    result, and versions that no longer exist count as deleted. Unfinished large files are
+    cancelled. The versions come from an iterable or from the listing of a prefix, which is
+    streamed page by page into the pool, so it is never held in memory. Requests rejected by rate
+    limits are retried with backoff by the retry policy of the api (see
+    :class:`~blaziken.retry.RetryPolicy`), which also limits the retries made by a large batch.
+    When a deletion is still rejected (e.g.: the retry budget ran out in a storm of 503s), the
+    whole batch pauses, with a delay doubled on every rejection of the same version, and the
+    version is deleted again instead of being reported as failed, up to "max_throttles" times.
+
+    :cvar GONE_CODES: The B2 error codes of deletions of versions that no longer exist.
+    :cvar THROTTLE_STATUSES: The HTTP status codes of rejections that pause the batch.
+    :cvar MAX_THROTTLE_DELAY: The maximum pause of the batch, in seconds.
+    :ivar stats: The aggregate statistics of the batch, where "bytes" counts the deleted bytes.
+    :ivar throttled: The number of times the batch was paused by rejected deletions.
+
+    :example:
+
+    >>> batch = bucket.delete_prefix('logs/2019/', workers=32)
+    >>> for result in batch:
+    >>>     if not result.ok:
+    >>>         print(f'Failed to delete {result.name}: {result.error}')
+    >>> print(f'{batch.stats.files} versions deleted, {batch.stats.failed} failed')
+
+    """
+
+    GONE_CODES = ('file_not_present', 'no_such_file', 'not_found')
+    THROTTLE_STATUSES = frozenset((429, 503))
+    MAX_THROTTLE_DELAY = 64.0
+
+    # pylint: disable = too-many-arguments
+    def __init__(self, api:BackBlazeB2, bucket_id:str, files:Iterable[Json], hide:bool=False,
+                 workers:int=8, throttle_delay:float=1.0, max_throttles:int=8):
+        """
+        :param api: The BackBlazeB2 instance used to delete the files.
+        :param bucket_id: The id of the bucket of the files.
+        :param files: The json-encoded data of the file versions, with their "fileName",
+                      "fileId" and, optionally, "contentLength" and "action".
+        :param hide: True to hide the files by name instead of deleting the versions.
+        :param workers: The number of versions deleted concurrently.
+        :param throttle_delay: The pause, in seconds, after the first rejection of a version.
+        :param max_throttles: The number of times a rejected version is deleted again.
+        :raises ValueError: If the number of workers is less than 1.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        self.stats = BatchStats()
+        self.throttled = 0
+        self._api = api
+        self._bucket_id = bucket_id
+        self._files = files
+        self._hide = hide
+        self._workers = workers
+        self._throttle_delay = throttle_delay
+        self._max_throttles = max_throttles
+        self._resume_at = 0.0
+        self._lock = Lock()
+
+    @classmethod
+    def prefix(cls, api:BackBlazeB2, bucket_id:str, prefix:str='', hide:bool=False,
+               workers:int=8, page_size:int=1000, throttle_delay:float=1.0,
+               max_throttles:int=8) -> DeleteBatch:
+        """
+        Creates a batch that deletes every version of the files which names start with a prefix
+        or, when hiding, hides every visible file with the prefix.
+
+        :param prefix: The prefix of the names of the files. If empty, the whole bucket.
+        :param page_size: The number of versions listed per request (at most 10000).
+        """
+        if hide:
+            files = (data for data in Paginator.files(api, bucket_id, prefix, '', page_size)
+                     if data.get('action') == 'upload')
+        else:
+            files = Paginator.versions(api, bucket_id, prefix, '', page_size).items()
+        return cls(api, bucket_id, files, hide, workers, throttle_delay, max_throttles)
+    # pylint: enable = too-many-arguments
+
+    def __iter__(self) -> Generator[DeleteResult, None, None]:
+        self.stats.start()
+        try:
+            items = ((data,) for data in self._files)
+            for result in imap_unordered(self._delete, items, self._workers):
+                self.stats.add(result.size, result.ok)
+                yield result
+        finally:
+            self.stats.stop()
+
+    def _delete(self, data:Json) -> DeleteResult:
+        """ Deletes (or hides) a single version, capturing its error instead of raising it. """
+        started = monotonic()
+        result = DeleteResult(data.get('fileName', ''), data.get('fileId', ''),
+                              max(data.get('contentLength', 0), 0))
+        if self._hide:
+            result.file_id, result.size = '', 0
+        for attempt in range(self._max_throttles + 1):
+            self._wait_throttle()
+            try:
+                if self._hide:
+                    result.data = self._api.hide_file(result.name, self._bucket_id)
+                elif data.get('action') == 'start':
+                    result.data = self._api.cancel_large_file(result.file_id)
+                else:
+                    result.data = self._api.delete_file(result.file_id, result.name)
+            except RequestError as error:
+                if error.status in self.THROTTLE_STATUSES and attempt < self._max_throttles:
+                    self._throttle(attempt)
+                    continue
+                if self._hide or error.code not in self.GONE_CODES:
+                    result.error = error
+            except (BlazeError, ValueError) as error:
+                result.error = error
+            break
+        result.elapsed = monotonic() - started
+        return result
+
+    def _throttle(self, attempt:int):
+        """ Pauses the whole batch after a rejected deletion, for longer on every attempt. """
+        delay = min(self._throttle_delay * 2 ** attempt, self.MAX_THROTTLE_DELAY)
+        with self._lock:
+            self.throttled += 1
+            self._resume_at = max(self._resume_at, monotonic() + delay)
+
+    def _wait_throttle(self):
+        """ Waits until the pause of the batch, if any, is over. """
+        with self._lock:
+            delay = self._resume_at - monotonic()
+        if delay > 0:
+            sleep(delay)
@@ -0,0 +1,314 @@
+""" Module with caches of the B2 service responses, used to avoid repeated requests. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import sha256
+from json import dumps as json_dumps
+from os import replace
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import monotonic
+from time import time
+try:
+    from fcntl import LOCK_EX
+    from fcntl import LOCK_UN
+    from fcntl import flock
+except ImportError:  # pragma: no cover  # File locks are not available on Windows
+    flock = None
+# Project imports
+from blaziken.utils import json_decode
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.meta import Json
+    from typing import Generator
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+
+    ListingKey = Tuple[str, str, str, int, str]
+
+
+class ListingCache:
+    """
+    Thread-safe cache of file listings, with a time-to-live and a least-recently-used eviction
+    when full. Listings are keyed by (bucket id, prefix, delimiter, page size, start name).
+    When used by a BackBlazeB2 instance (see :func:`~blaziken.api.BackBlazeB2.set_list_cache`),
+    the listings that could contain a file uploaded, hidden or deleted through that instance are
+    invalidated automatically. Changes made by other clients are only seen after the TTL expires.
+
+    Cached listings are shared by all callers and must not be modified.
+
+    :ivar ttl: The time, in seconds, a listing is kept in the cache.
+    :ivar max_entries: The maximum number of listings kept in the cache.
+    :ivar hits: The number of lookups that found a valid listing.
+    :ivar misses: The number of lookups that did not find a listing or found an expired one.
+    """
+
+    def __init__(self, ttl:float=60.0, max_entries:int=1024):
+        """
+        :raises ValueError: If the TTL is not positive or the cache can't hold any entries.
+        """
+        if ttl <= 0 or max_entries < 1:
+            raise ValueError('The TTL must be positive and the cache must hold at least 1 entry')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries:OrderedDict[ListingKey, Tuple[float, Json]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (f'<{self.__class__.__name__}> {len(self)}/{self.max_entries} entries, '
+                f'{self.hits} hits, {self.misses} misses')
+
+    @property
+    def hit_ratio(self) -> float:
+        """ Gets the ratio of lookups that were served from the cache. """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key:ListingKey) -> Optional[Json]:
+        """
+        Gets a cached listing, if it exists and has not expired.
+
+        :param key: The (bucket id, prefix, delimiter, page size, start name) of the listing.
+        :returns: The json-encoded listing or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key:ListingKey, listing:Json):
+        """ Caches a listing, evicting the least-recently-used listing if the cache is full. """
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl, listing)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, file_name:str, bucket_id:str=''):
+        """
+        Removes the listings that could contain a file, that is, those which prefix matches it.
+
+        :param file_name: The full name of the file that changed.
+        :param bucket_id: The id of the bucket of the file. If empty, listings of all buckets
+                          are checked.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if file_name.startswith(key[1])
+                        and (not bucket_id or key[0] == bucket_id)]:
+                del self._entries[key]
+
+    def clear(self):
+        """ Removes all cached listings, keeping the counters. """
+        with self._lock:
+            self._entries.clear()
+
+    def file_changed(self, data:Json, deleted:bool):  # pylint: disable = unused-argument
+        """
+        File listener (see :func:`~blaziken.api.BackBlazeB2.add_file_listener`) that invalidates
+        the listings affected by a change made to a file.
+        """
+        self.invalidate(data.get('fileName', ''), data.get('bucketId', ''))
+
+
+class DownloadAuthCache:
+    """
+    Thread-safe cache of the download authorization tokens of private buckets, keyed by (bucket id,
+    file name prefix). A token is requested for a file (or a prefix) only if no cached token of
+    the same prefix is valid for long enough. Used by
+    :func:`~blaziken.api.BackBlazeB2.get_download_auth`, when set with
+    :func:`~blaziken.api.BackBlazeB2.set_download_auth_cache`.
+
+    A token authorizes every file which name starts with its prefix, so tokens of broader prefixes
+    are only reused when the caller allows it, as they also authorize the other files of the
+    prefix (e.g.: a token of the "" prefix authorizes the whole bucket).
+
+    :ivar min_remaining: The fraction of the requested duration a cached token must still be valid
+                         for to be reused (e.g.: with 0.5, a request for an 8 hours token is served
+                         by any token valid for at least 4 more hours).
+    :ivar max_entries: The maximum number of tokens kept in the cache.
+    :ivar hits: The number of lookups that found a token.
+    :ivar misses: The number of lookups that did not find a token.
+    """
+
+    def __init__(self, min_remaining:float=0.5, max_entries:int=1024):
+        """
+        :raises ValueError: If the minimum remaining fraction is not between 0 and 1 or the cache
+                            can't hold any entries.
+        """
+        if not 0 <= min_remaining <= 1 or max_entries < 1:
+            raise ValueError('The minimum remaining fraction must be between 0 and 1 and the '
+                             'cache must hold at least 1 entry')
+        self.min_remaining = min_remaining
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries:OrderedDict[Tuple[str, str], Tuple[float, str]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (f'<{self.__class__.__name__}> {len(self)}/{self.max_entries} tokens, '
+                f'{self.hits} hits, {self.misses} misses')
+
+    def get(self, bucket_id:str, file_name_or_prefix:str, duration:float,
+            broader:bool=False) -> Optional[str]:
+        """
+        Gets the cached token of a file name or prefix that is valid for long enough.
+
+        :param bucket_id: The id of the bucket of the files.
+        :param file_name_or_prefix: The name of the file, or the prefix of the files.
+        :param duration: The requested validity of the token, in seconds.
+        :param broader: True to also use the tokens of broader prefixes that cover the name, in
+                        which case the narrowest one is used.
+        :returns: The authorization token, or None if no cached token can be used.
+        """
+        valid_until = monotonic() + duration * self.min_remaining
+        shortest = 0 if broader else len(file_name_or_prefix)
+        with self._lock:
+            for end in range(len(file_name_or_prefix), shortest - 1, -1):
+                key = (bucket_id, file_name_or_prefix[:end])
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] >= valid_until:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, bucket_id:str, prefix:str, token:str, duration:float):
+        """
+        Caches a token, evicting the least-recently-used token if the cache is full.
+
+        :param bucket_id: The id of the bucket of the files authorized by the token.
+        :param prefix: The file name prefix authorized by the token.
+        :param token: The download authorization token.
+        :param duration: The validity of the token, in seconds, counted from when it was requested.
+        """
+        with self._lock:
+            self._entries[(bucket_id, prefix)] = (monotonic() + duration, token)
+            self._entries.move_to_end((bucket_id, prefix))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """ Removes all cached tokens, keeping the counters. """
+        with self._lock:
+            self._entries.clear()
+
+
+class AuthCache:
+    """
+    Cache of account authorizations (the responses of b2_authorize_account) stored as files in a
+    local directory, so short-lived processes using the same application key reuse a valid
+    authorization instead of authenticating at startup. When used by a BackBlazeB2 instance (see
+    :func:`~blaziken.api.BackBlazeB2.set_auth_cache`), a lock file makes the processes that find
+    no valid authorization wait while one of them authenticates, and then use its authorization.
+
+    Entries are keyed by a hash of the key id and its secret, so a changed secret is never served
+    an authorization of the old one. Files are written atomically and are only readable by their
+    owner, as they contain authorization tokens. Failures to read or write the cache are ignored,
+    the authorization is then requested from the service. Locks are only shared between processes
+    on systems with fcntl (i.e.: not on Windows).
+
+    :ivar directory: The directory where the authorizations are stored.
+    :ivar ttl: The time, in seconds, an authorization is kept. Tokens are valid for 24 hours.
+    """
+
+    def __init__(self, directory:Optional[Union[str, Path]]=None, ttl:float=22 * 3600):
+        """
+        :param directory: The directory of the cache. If None, "~/.cache/blaziken" is used.
+        :raises ValueError: If the TTL is not positive.
+        """
+        if ttl <= 0:
+            raise ValueError('The TTL must be positive')
+        self.directory = Path(directory) if directory else Path.home() / '.cache' / 'blaziken'
+        self.ttl = ttl
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}> {self.directory}'
+
+    def _path(self, account_id:str, app_key:str) -> Path:
+        """ Gets the path of the file with the authorization of a key. """
+        digest = sha256(f'{account_id}:{app_key}'.encode('utf8')).hexdigest()
+        return self.directory / f'auth-{digest}.json'
+
+    @contextmanager
+    def locked(self, account_id:str, app_key:str) -> Generator[None, None, None]:
+        """ Holds the lock of the authorization of a key, across threads and processes. """
+        with self._lock:
+            try:
+                self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+                lock_file = open(self._path(account_id, app_key).with_suffix('.lock'), 'ab')
+            except OSError:
+                yield
+                return
+            with lock_file:
+                if flock is not None:
+                    flock(lock_file.fileno(), LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if flock is not None:
+                        flock(lock_file.fileno(), LOCK_UN)
+
+    def get(self, account_id:str, app_key:str) -> Optional[Tuple[Json, float]]:
+        """
+        Gets the cached authorization of a key, if it exists and has not expired.
+
+        :returns: A 2-tuple containing (json-encoded authorization, timestamp of when it was
+                  obtained), or None if it is not cached.
+        """
+        try:
+            with open(self._path(account_id, app_key), 'rb') as file_handle:
+                entry = json_decode(file_handle.read())
+            created = float(entry['created'])
+            data = entry['data']
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+        if not 0 <= time() - created < self.ttl:
+            return None
+        return (data, created)
+
+    def put(self, account_id:str, app_key:str, data:Json, created:Optional[float]=None):
+        """
+        Caches the authorization of a key.
+
+        :param data: The json-encoded response of b2_authorize_account.
+        :param created: The timestamp of when the authorization was obtained. If None, now.
+        """
+        entry = {'created': time() if created is None else created, 'data': data}
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            with NamedTemporaryFile('w', dir=self.directory, suffix='.tmp', delete=False,
+                                    encoding='utf8') as file_handle:  # Created with mode 0o600
+                file_handle.write(json_dumps(entry))
+            replace(file_handle.name, self._path(account_id, app_key))
+        except OSError:
+            pass
+
+    def remove(self, account_id:str, app_key:str):
+        """ Removes the cached authorization of a key, if any. """
+        try:
+            self._path(account_id, app_key).unlink()
+        except OSError:
+            pass
@@ -0,0 +1,140 @@
+""" Module with the checkpoints that allow interrupted downloads to be resumed. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from json import dumps as json_dumps
+from os import fsync
+from os import replace
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import monotonic
+# Project imports
+from blaziken.utils import json_decode
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.meta import Json
+    from typing import List
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+
+
+class DownloadCheckpoint:
+    """
+    Record of the byte ranges of a download already written to its temporary file, stored as a
+    small json file, so an interrupted download is resumed from where it stopped instead of from
+    the start (see :func:`~blaziken.api.BackBlazeB2.download_file`). The record is bound to the
+    identity of the downloaded file (e.g.: its id, size and SHA1), so a file that changed on the
+    server since the checkpoint was saved is downloaded again from the start.
+
+    Ranges must only be added after their bytes are flushed to the temporary file. The record is
+    saved atomically at most every "interval" seconds, so a crash loses, at most, the progress of
+    the last interval. It is safe to use from many threads.
+
+    :ivar path: The path of the checkpoint file.
+    :ivar identity: The json-encoded identity of the downloaded file.
+    :ivar interval: The minimum time, in seconds, between saves of the checkpoint file.
+    """
+
+    def __init__(self, path:Union[str, Path], identity:Json,
+                 ranges:Optional[List[Tuple[int, int]]]=None, interval:float=1.0):
+        """
+        :param ranges: The (first, last) positions (inclusive) of the byte ranges already written.
+        """
+        self.path = Path(path)
+        self.identity = identity
+        self.interval = interval
+        self._ranges = self._merge(ranges or [])
+        self._saved = monotonic()
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}> {self.completed} bytes in {self.path}'
+
+    @classmethod
+    def load(cls, path:Union[str, Path], identity:Json, interval:float=1.0) -> DownloadCheckpoint:
+        """
+        Loads the checkpoint of a download. If the checkpoint file does not exist, can't be read
+        or belongs to another file, an empty checkpoint is returned.
+        """
+        try:
+            with open(path, 'rb') as file_handle:
+                entry = json_decode(file_handle.read())
+            if entry['identity'] == identity:
+                return cls(path, identity, list(entry['ranges']), interval)
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        return cls(path, identity, interval=interval)
+
+    @staticmethod
+    def _merge(ranges:List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """ Sorts the ranges, joining those that overlap or are adjacent. """
+        merged:List[Tuple[int, int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @property
+    def ranges(self) -> List[Tuple[int, int]]:
+        """ Gets the (first, last) positions (inclusive) of the byte ranges already written. """
+        return list(self._ranges)
+
+    @property
+    def completed(self) -> int:
+        """ Gets the number of bytes already written. """
+        return sum(end - start + 1 for start, end in self._ranges)
+
+    def missing(self, size:int) -> List[Tuple[int, int]]:
+        """ Gets the (first, last) positions (inclusive) of the byte ranges not written yet. """
+        missing = []
+        position = 0
+        for start, end in self._ranges:
+            if start > position:
+                missing.append((position, min(start, size) - 1))
+            position = max(position, end + 1)
+        if position < size:
+            missing.append((position, size - 1))
+        return [(start, end) for start, end in missing if start <= end]
+
+    def add(self, start:int, end:int):
+        """
+        Records a byte range as written, saving the checkpoint file if the interval has elapsed.
+
+        :param start: The position of the first byte of the range.
+        :param end: The position of the last byte of the range (inclusive).
+        """
+        if end < start:
+            return
+        with self._lock:
+            self._ranges = self._merge(self._ranges + [(start, end)])
+            if monotonic() - self._saved < self.interval:
+                return
+        self.save()
+
+    def save(self):
+        """
+        Writes the checkpoint file atomically. The new file is synced to the disk before it
+        replaces the previous one, so a crash never leaves an empty or partial checkpoint.
+        """
+        with self._lock:
+            entry = {'identity': self.identity, 'ranges': self._ranges}
+            with NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete=False,
+                                    encoding='utf8') as file_handle:
+                file_handle.write(json_dumps(entry))
+                file_handle.flush()
+                fsync(file_handle.fileno())
+            replace(file_handle.name, self.path)
+            self._saved = monotonic()
+
+    def remove(self):
+        """ Removes the checkpoint file, if it exists. """
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
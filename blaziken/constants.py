@@ -6,3 +6,5 @@ FIVE_MB = 5 * ONE_MB
 TEN_MB = 10 * ONE_MB
 HUNDRED_MB = 100 * ONE_MB
 FIVE_GB = 5 * ONE_GB
+# Limits of the B2 service
+MAX_LARGE_FILE_PARTS = 10000
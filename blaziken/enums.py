@@ -10,6 +10,8 @@ class Endpoints(Enum):
 
     auth = '/b2_authorize_account'
     cancel_large_file = '/b2_cancel_large_file'
+    copy_file = '/b2_copy_file'
+    copy_part = '/b2_copy_part'
     create_bucket = '/b2_create_bucket'
     create_key = '/b2_create_key'
     delete_bucket = '/b2_delete_bucket'
@@ -21,10 +23,15 @@ class Endpoints(Enum):
     finish_large_file = '/b2_finish_large_file'
     get_upload_part_url = '/b2_get_upload_part_url'
     get_upload_url = '/b2_get_upload_url'
+    hide_file = '/b2_hide_file'
     list_buckets = '/b2_list_buckets'
     list_files = '/b2_list_file_names'
+    list_file_versions = '/b2_list_file_versions'
     list_keys = '/b2_list_keys'
+    list_parts = '/b2_list_parts'
+    list_unfinished_large_files = '/b2_list_unfinished_large_files'
     start_large_file = '/b2_start_large_file'
+    upload_file = '/b2_upload_file'
     upload_part ='/b2_upload_part'
 
 
@@ -51,15 +58,33 @@ class FileAction(Enum):
     :cvar start: A file that started upload but has not finished it or was cancelled.
     :cvar hide: Means the file is hidden and will not show when listing files of the bucket.
     :cvar folder: Means the file is a virtual folder.
+    :cvar copy: A file that was just created by copying another file on the server side.
     """
 
     upload = 'upload'
     start = 'start'
     hide = 'hide'
     folder = 'folder'
+    copy = 'copy'
     null = ''
 
 
+class SyncAction(Enum):
+    """
+    Enum with the actions taken by a sync for each file.
+
+    :cvar ~.upload: The local file is new or changed and is uploaded to the bucket.
+    :cvar skip: The remote file is up to date, nothing is done.
+    :cvar hide: The remote file no longer exists locally and is hidden.
+    :cvar delete: The remote file no longer exists locally and is deleted.
+    """
+
+    upload = 'upload'
+    skip = 'skip'
+    hide = 'hide'
+    delete = 'delete'
+
+
 class KeyCapabilities(Enum):
     """ Enum with the possible values for the permissions of a key. """
 
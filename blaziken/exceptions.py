@@ -6,7 +6,18 @@ class BlazeError(Exception):
 
 
 class RequestError(BlazeError):
-    """ Exception raised when an error is found in the request before it is sent. """
+    """
+    Exception raised when an error is found in the request before it is sent, or when the server
+    responds with an error status code.
+
+    :ivar status: The HTTP status code of the response, or 0 if the request was not sent.
+    :ivar code: The B2 error code of the response (e.g.: "expired_auth_token"), if any.
+    """
+
+    def __init__(self, message:str='', status:int=0, code:str=''):
+        super().__init__(message)
+        self.status = status
+        self.code = code
 
 
 class ResponseError(BlazeError):
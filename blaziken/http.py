@@ -3,43 +3,126 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 # Third-party imports
-from requests import get as _http_get
-from requests import post as _http_post
+from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 # Project imports
 from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.retry import RetryPolicy
 from blaziken.utils import check_response_error
 
 if TYPE_CHECKING:
     # pylint: disable = ungrouped-imports
     from requests.models import Response
-    from typing import Callable
+    from typing import Any
+    from typing import Dict
+    from typing import Optional
 
 
 class Http:
     """
     Class for making HTTP requests using default configuration settings, such as timeout.
+    Requests are made through a persistent session that keeps a pool of keep-alive connections
+    for each host (e.g.: the api, upload and download hosts of the B2 service), so successive
+    requests to the same host reuse the already-opened TCP+TLS connection instead of doing a new
+    handshake for every request. Requests that fail with transient errors are retried according
+    to a RetryPolicy (see :class:`~blaziken.retry.RetryPolicy`).
 
     :ivar timeout: The default timeout, in seconds, for the HTTP requests.
+    :ivar pool_connections: The number of hosts that have their connection pools cached.
+    :ivar pool_maxsize: The maximum number of connections kept alive in each host's pool. When
+                        making concurrent requests, it should be at least the number of workers.
+    :ivar pool_block: True to make pool_maxsize a hard limit of connections per host (requests
+                      wait for a free connection), False to open extra, non-reusable connections
+                      when all pooled connections are busy.
+    :ivar keep_alive: True to keep connections open after a request, False to close them.
+    :ivar retry: The RetryPolicy of the requests. Use RetryPolicy(max_retries=0) to never retry.
     """
 
-    def __init__(self, timeout:float=8.0):
+    # pylint: disable = too-many-arguments
+    def __init__(self, timeout:float=8.0, pool_connections:int=10, pool_maxsize:int=10,
+                 pool_block:bool=False, keep_alive:bool=True, retry:Optional[RetryPolicy]=None):
         self.timeout = timeout  # in seconds
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.retry = retry if retry is not None else RetryPolicy()
+        self._session:Optional[Session] = None
 
-    def _do_request(self, method:Callable, *args, **kwargs) -> Response:
+    def __enter__(self) -> Http:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def session(self) -> Session:
+        """ Gets the session used to make the requests, creating it on first use. """
+        if self._session is None:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> Session:
+        """ Creates a session with the configured connection pools mounted for http and https. """
+        session = Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize, pool_block=self.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self):
+        """ Closes all pooled connections. A new session will be created if a request is made. """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    # pylint: enable = too-many-arguments
+
+    @staticmethod
+    def _rewind(kwargs:Dict[str, Any]) -> bool:
+        """ Rewinds the body of a request to be retried, returning False if it can't be resent. """
+        data = kwargs.get('data')
+        if data is None or isinstance(data, (bytes, str, dict)):
+            return True
+        if not hasattr(data, 'seek'):  # Streamed from an iterator, which was consumed
+            return False
+        data.seek(0)
+        return True
+
+    def _do_request(self, method:str, url:str, *args, retry:bool=True, **kwargs) -> Response:
         """
-        Makes an arbitrary HTTP request and checks for errors.
+        Makes an arbitrary HTTP request and checks for errors, retrying it while the retry policy
+        allows it.
 
+        :param retry: False to make the request once, for callers that retry it themselves.
         :raises InternetError: If there is no internet connection available.
         :raises RequestError: If the request contains errors.
         """
         kwargs.setdefault('timeout', self.timeout)
-        try:
-            response = method(*args, **kwargs)
-            check_response_error(response)
-            return response
-        except RequestException:
-            raise InternetError('No internet connection available')
+        self.retry.record_request()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, *args, **kwargs)
+                check_response_error(response)
+                return response
+            except RequestException as error:
+                delay = self.retry.next_delay(error, attempt, method, url) \
+                    if retry and self._rewind(kwargs) else None
+                if delay is None:
+                    raise InternetError('No internet connection available') from error
+            except RequestError as error:
+                delay = self.retry.next_delay(error, attempt, method, url, response.headers) \
+                    if retry and self._rewind(kwargs) else None
+                if delay is None:
+                    raise
+            self.retry.wait(delay)
+            attempt += 1
 
     def get(self, *args, **kwargs) -> Response:
         """
@@ -48,7 +131,7 @@ class Http:
         :raises InternetError: If there is no internet connection available.
         :raises RequestError: If the request contains errors.
         """
-        return self._do_request(_http_get, *args, **kwargs)
+        return self._do_request('GET', *args, **kwargs)
 
     def post(self, *args, **kwargs) -> Response:
         """
@@ -57,4 +140,13 @@ class Http:
         :raises InternetError: If there is no internet connection available.
         :raises RequestError: If the request contains errors.
         """
-        return self._do_request(_http_post, *args, **kwargs)
+        return self._do_request('POST', *args, **kwargs)
+
+    def head(self, *args, **kwargs) -> Response:
+        """
+        Makes a HTTP HEAD request and checks for errors.
+
+        :raises InternetError: If there is no internet connection available.
+        :raises RequestError: If the request contains errors.
+        """
+        return self._do_request('HEAD', *args, **kwargs)
@@ -0,0 +1,224 @@
+""" Module with a persistent local index of the files of a bucket. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from json import dumps as json_dumps
+from json import loads as json_loads
+from sqlite3 import connect
+from threading import Lock
+from time import time
+# Project imports
+from blaziken.listing import Paginator
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.api import BackBlazeB2
+    from blaziken.meta import Json
+    from pathlib import Path
+    from sqlite3 import Row
+    from typing import Generator
+    from typing import Iterable
+    from typing import List
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+
+
+class BucketIndex:
+    """
+    Index of the files of a bucket stored in a SQLite database, so lookups by name, id or prefix
+    and aggregates (e.g.: the total size of a folder) are answered locally, without requests.
+    The index is populated by refreshing chosen prefixes from the B2 service and, when attached
+    to a BackBlazeB2 instance, is updated in place by the uploads, hides and deletes made through
+    it. Changes made by other clients are only seen after a refresh.
+
+    Files are stored with the same json-encoded data returned by the B2 service, so they can be
+    used to create :class:`~blaziken.models.File` instances. It is safe to use from many threads.
+
+    :cvar SCHEMA: The statements that create the tables of the index.
+    :cvar BATCH_SIZE: The number of files read at a time when iterating over the index.
+
+    :example:
+
+    >>> with BucketIndex('bucket.db', bucket.id, api) as index:
+    >>>     index.refresh('photos/')
+    >>>     if not index.exists('photos/cat.jpg'):
+    >>>         bucket.upload(Path('cat.jpg'), 'photos/cat.jpg')
+    >>>     count, size = index.summary('photos/')
+
+    """
+
+    BATCH_SIZE = 1000
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS files (bucket_id TEXT NOT NULL, name TEXT NOT NULL, '
+        'id TEXT NOT NULL, size INTEGER NOT NULL, sha1 TEXT, upload_timestamp INTEGER, '
+        'data TEXT NOT NULL, PRIMARY KEY (bucket_id, name))',
+        'CREATE INDEX IF NOT EXISTS files_id ON files (id)',
+        'CREATE TABLE IF NOT EXISTS prefixes (bucket_id TEXT NOT NULL, prefix TEXT NOT NULL, '
+        'refreshed REAL NOT NULL, PRIMARY KEY (bucket_id, prefix))',
+    )
+
+    def __init__(self, path:Union[str, Path], bucket_id:str, api:Optional[BackBlazeB2]=None):
+        """
+        :param path: The path of the database file, or ":memory:" for an in-memory index.
+        :param bucket_id: The id of the indexed bucket. A database can hold many buckets.
+        :param api: The BackBlazeB2 instance used to refresh the index. Its changes to the files
+                    of the bucket update the index until BucketIndex.close() is called.
+        """
+        self.bucket_id = bucket_id
+        self._api = api
+        self._lock = Lock()
+        self._connection = connect(str(path), check_same_thread=False)
+        with self._lock, self._connection:
+            for statement in self.SCHEMA:
+                self._connection.execute(statement)
+        if api is not None:
+            api.add_file_listener(self.file_changed)
+
+    def __enter__(self) -> BucketIndex:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.summary()[0]
+
+    def __contains__(self, file_name:str) -> bool:
+        return self.exists(file_name)
+
+    def close(self):
+        """ Detaches the index from its BackBlazeB2 instance and closes the database. """
+        if self._api is not None:
+            self._api.remove_file_listener(self.file_changed)
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _prefix_range(prefix:str) -> Tuple[str, str]:
+        """ Gets the range of names (inclusive, exclusive) that start with a prefix. """
+        return (prefix, f'{prefix}\U0010ffff')
+
+    @staticmethod
+    def _row(data:Json, bucket_id:str) -> Tuple[str, str, str, int, str, int, str]:
+        """ Converts the json-encoded data of a file to a row of the files table. """
+        return (bucket_id, data['fileName'], data.get('fileId', ''),
+                data.get('contentLength', 0), data.get('contentSha1', ''),
+                data.get('uploadTimestamp', 0), json_dumps(data))
+
+    def _query(self, sql:str, params:Iterable) -> List[Row]:
+        """ Runs a query, returning all its rows. """
+        with self._lock:
+            return self._connection.execute(sql, tuple(params)).fetchall()
+
+    def refresh(self, prefix:str='', page_size:int=1000) -> int:
+        """
+        Replaces the indexed files starting with a prefix with the files listed by the service.
+        Each page is written in its own transaction, replacing the range of names it covers, so
+        lookups are not blocked during long refreshes and never see a partially written page.
+
+        :param prefix: The prefix of the names to be refreshed. If empty, the whole bucket.
+        :param page_size: The number of files listed per request (at most 10000).
+        :returns: The number of files indexed with the prefix.
+        :raises ValueError: If the index has no BackBlazeB2 instance to list the files.
+        """
+        if self._api is None:
+            raise ValueError('An api instance is required to refresh the index')
+        count = 0
+        start, end = self._prefix_range(prefix)
+        for files, cursor in Paginator.files(self._api, self.bucket_id, prefix, '',
+                                             page_size).pages():
+            rows = [self._row(data, self.bucket_id) for data in files
+                    if data.get('action', 'upload') == 'upload']
+            with self._lock, self._connection:
+                self._connection.execute(
+                    'DELETE FROM files WHERE bucket_id = ? AND name >= ? AND name < ?',
+                    (self.bucket_id, start, cursor if cursor else end))
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            count += len(rows)
+            start = cursor
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO prefixes VALUES (?, ?, ?)',
+                                     (self.bucket_id, prefix, time()))
+        return count
+
+    def refreshed_at(self, prefix:str='') -> Optional[float]:
+        """ Gets the timestamp of the last refresh of a prefix, None if it was never refreshed. """
+        rows = self._query('SELECT refreshed FROM prefixes WHERE bucket_id = ? AND prefix = ?',
+                           (self.bucket_id, prefix))
+        return rows[0][0] if rows else None
+
+    def get(self, file_name:str) -> Optional[Json]:
+        """ Gets the json-encoded data of a file by its name, None if it is not indexed. """
+        rows = self._query('SELECT data FROM files WHERE bucket_id = ? AND name = ?',
+                           (self.bucket_id, file_name))
+        return json_loads(rows[0][0]) if rows else None
+
+    def get_by_id(self, file_id:str) -> Optional[Json]:
+        """ Gets the json-encoded data of a file by its id, None if it is not indexed. """
+        rows = self._query('SELECT data FROM files WHERE bucket_id = ? AND id = ?',
+                           (self.bucket_id, file_id))
+        return json_loads(rows[0][0]) if rows else None
+
+    def exists(self, file_name:str) -> bool:
+        """ Checks if a file is indexed. """
+        return bool(self._query('SELECT 1 FROM files WHERE bucket_id = ? AND name = ?',
+                                (self.bucket_id, file_name)))
+
+    def files(self, prefix:str='', limit:int=0) -> Generator[Json, None, None]:
+        """
+        Gets the indexed files which names start with a prefix, in name order. The files are read
+        in batches, so large prefixes are not loaded at once.
+
+        :param prefix: The prefix of the names. If empty, all files.
+        :param limit: The maximum number of files. If 0, no limit.
+        :yields: The json-encoded data of each file.
+        """
+        start, end = self._prefix_range(prefix)
+        count = 0
+        while True:
+            size = min(self.BATCH_SIZE, limit - count) if limit else self.BATCH_SIZE
+            rows = self._query(
+                'SELECT name, data FROM files WHERE bucket_id = ? AND name >= ? AND name < ? '
+                'ORDER BY name LIMIT ?', (self.bucket_id, start, end, size))
+            for _, data in rows:
+                yield json_loads(data)
+            count += len(rows)
+            if len(rows) < size or count == limit:
+                break
+            start = f'{rows[-1][0]}\x00'  # The first name after the last one read
+
+    def summary(self, prefix:str='') -> Tuple[int, int]:
+        """
+        Aggregates the indexed files which names start with a prefix.
+
+        :returns: A 2-tuple containing (number of files, total size in bytes).
+        """
+        count, size = self._query(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files '
+            'WHERE bucket_id = ? AND name >= ? AND name < ?',
+            (self.bucket_id, *self._prefix_range(prefix)))[0]
+        return (count, size)
+
+    def file_changed(self, data:Json, deleted:bool):
+        """
+        File listener (see :func:`~blaziken.api.BackBlazeB2.add_file_listener`) that updates the
+        index with a file changed through the api. Uploaded and copied files are added, deleted and
+        hidden files are removed and other changes (such as unfinished large files) are ignored.
+        """
+        if data.get('bucketId', self.bucket_id) != self.bucket_id or 'fileName' not in data:
+            return
+        action = data.get('action', 'upload')
+        with self._lock, self._connection:
+            if deleted:
+                self._connection.execute('DELETE FROM files WHERE bucket_id = ? AND id = ?',
+                                         (self.bucket_id, data.get('fileId', '')))
+            elif action == 'hide':
+                self._connection.execute('DELETE FROM files WHERE bucket_id = ? AND name = ?',
+                                         (self.bucket_id, data['fileName']))
+            elif action in ('upload', 'copy'):
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    self._row(data, self.bucket_id))
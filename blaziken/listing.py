@@ -0,0 +1,419 @@
+""" Module with strategies for listing the files of buckets and other paginated listings. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full
+from queue import Queue
+from threading import Event
+from threading import Lock
+# Project imports
+from blaziken.api import BackBlazeB2
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.meta import Json
+    from typing import Callable
+    from typing import Generator
+    from typing import List
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+
+    PageFetcher = Callable[[str], Tuple[List[Json], Optional[str]]]
+
+
+# Names are assumed to be mostly ASCII when a range has no upper bound, so it is split there
+ASCII_END = 0x80
+UNICODE_END = 0x110000
+SURROGATES = range(0xD800, 0xE000)
+
+
+def name_midpoint(low:str, high:Optional[str]) -> Optional[str]:
+    """
+    Gets a file name roughly halfway between two names, used to split a range of names in two.
+    Only the first differing character is bisected, so the halves have about the same size when
+    names are evenly distributed.
+
+    :param low: The lower bound of the range (inclusive).
+    :param high: The upper bound of the range (exclusive), or None if unbounded.
+    :returns: A name greater than low and less than high, or None if there is no such name.
+    """
+    index = 0
+    while high is not None and index < min(len(low), len(high)) and low[index] == high[index]:
+        index += 1
+    low_code = ord(low[index]) if index < len(low) else 0x1F  # Control characters are invalid
+    if high is not None and index < len(high):
+        high_code = ord(high[index])
+    else:
+        high_code = ASCII_END if low_code < ASCII_END - 1 else UNICODE_END
+    middle = (low_code + high_code) // 2
+    if middle in SURROGATES:
+        middle = SURROGATES.stop if SURROGATES.stop < high_code else SURROGATES.start - 1
+    if low_code < middle < high_code:
+        return f'{low[:index]}{chr(middle)}'
+    if index >= len(low):
+        return None
+    # The differing characters are adjacent: keep low's character and split what follows it
+    tail = name_midpoint(low[index + 1:], None)
+    return f'{low[:index + 1]}{tail}' if tail is not None else None
+
+
+class Paginator:
+    """
+    Pages through a listing of the B2 service using explicit cursors (the name or id where each
+    page starts), so no pagination state is stored: the same paginator can be iterated by many
+    threads at once, and a listing can be resumed from any cursor. While a page is consumed, the
+    next page is requested in the background, so the latency of the requests overlaps with the
+    processing of the results.
+
+    :example:
+
+    >>> paginator = Paginator.files(api, 'bucket_id', 'photos/', page_size=1000)
+    >>> files, cursor = paginator.page()
+    >>> for file_data in paginator.items(cursor):  # Resumes after the first page
+    >>>     print(file_data['fileName'])
+
+    """
+
+    def __init__(self, fetch:PageFetcher, prefetch:bool=True):
+        """
+        :param fetch: A function that gets the page starting at a cursor, returning a 2-tuple
+                      containing (list of items, cursor of the next page or None if last page).
+                      It is called from a background thread when prefetching.
+        :param prefetch: True to request the next page in the background, False to request each
+                         page only when the previous one has been consumed.
+        """
+        self._fetch = fetch
+        self._prefetch = prefetch
+
+    def __iter__(self) -> Generator[Json, None, None]:
+        return self.items()
+
+    @classmethod
+    def files(cls, api:BackBlazeB2, bucket_id:str, prefix:str='',
+              delimiter:Optional[str]=None, page_size:int=BackBlazeB2.DEFAULT_FILE_COUNT,
+              prefetch:bool=True) -> Paginator:
+        """
+        Creates a paginator of :func:`~blaziken.api.BackBlazeB2.list_files`, which cursors are
+        file names. Parameters are the same as those of list_files.
+        """
+        def fetch(cursor:str) -> Tuple[List[Json], Optional[str]]:
+            data = api.list_files(prefix, delimiter, page_size, cursor, bucket_id)
+            return (data.get('files', []), data.get('nextFileName'))
+        return cls(fetch, prefetch)
+
+    @classmethod
+    def versions(cls, api:BackBlazeB2, bucket_id:str, prefix:str='',
+                 delimiter:Optional[str]='', page_size:int=BackBlazeB2.DEFAULT_FILE_COUNT,
+                 prefetch:bool=True) -> Paginator:
+        """
+        Creates a paginator of :func:`~blaziken.api.BackBlazeB2.list_file_versions`, which cursors
+        are 2-tuples containing (file name, file id). Parameters are the same as those of
+        list_file_versions, but all versions are listed recursively by default.
+        """
+        def fetch(cursor:Union[str, Tuple[str, str]]) -> Tuple[List[Json], Optional[Tuple]]:
+            name, file_id = cursor if cursor else ('', '')
+            data = api.list_file_versions(prefix, delimiter, page_size, name, file_id, bucket_id)
+            next_name = data.get('nextFileName')
+            return (data.get('files', []), (next_name, data.get('nextFileId') or '')
+                    if next_name else None)
+        return cls(fetch, prefetch)
+
+    @classmethod
+    def keys(cls, api:BackBlazeB2, account_id:str, page_size:int=0,
+             prefetch:bool=True) -> Paginator:
+        """
+        Creates a paginator of :func:`~blaziken.api.BackBlazeB2.list_keys`, which cursors are
+        application key ids. Parameters are the same as those of list_keys.
+        """
+        def fetch(cursor:str) -> Tuple[List[Json], Optional[str]]:
+            data = api.list_keys(account_id, page_size, cursor)
+            return (data.get('keys', []), data.get('nextApplicationKeyId'))
+        return cls(fetch, prefetch)
+
+    def page(self, cursor:str='') -> Tuple[List[Json], Optional[str]]:
+        """
+        Gets a single page of the listing.
+
+        :param cursor: The cursor where the page starts. If empty, gets the first page.
+        :returns: A 2-tuple containing (list of items, cursor of the next page or None).
+        """
+        return self._fetch(cursor)
+
+    def pages(self, cursor:str='') -> Generator[Tuple[List[Json], Optional[str]], None, None]:
+        """
+        Gets the pages of the listing, requesting each following page in the background.
+
+        :param cursor: The cursor where the listing starts. If empty, starts at the first page.
+        :yields: A 2-tuple containing (list of items, cursor of the next page or None) of each
+                 page. The cursor can be saved to resume the listing later.
+        """
+        if not self._prefetch:
+            while True:
+                items, cursor = self._fetch(cursor)
+                yield (items, cursor)
+                if not cursor:
+                    return
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(self._fetch, cursor)
+            try:
+                while future is not None:
+                    items, cursor = future.result()
+                    future = executor.submit(self._fetch, cursor) if cursor else None
+                    yield (items, cursor)
+            finally:
+                if future is not None:
+                    future.cancel()
+
+    def items(self, cursor:str='') -> Generator[Json, None, None]:
+        """
+        Gets all items of the listing, requesting each following page in the background.
+
+        :param cursor: The cursor where the listing starts. If empty, starts at the first page.
+        :yields: Each item of the listing.
+        """
+        for items, _ in self.pages(cursor):
+            yield from items
+
+
+class _Shard:
+    """
+    A range of file names listed by a single worker. Shards are chained in name order, so an
+    ordered listing is obtained by following the chain from the first shard.
+
+    :ivar start: The first name of the range (inclusive).
+    :ivar end: The last name of the range (exclusive), None if unbounded. It is reduced when the
+               shard is split, which is only done by the thread listing it.
+    :ivar pages: The listed pages, followed by None when the shard is finished (ordered mode).
+    :ivar next: The shard with the names following this shard's names.
+    :ivar claimed: True if a worker (or the consumer) is already listing the shard.
+    """
+
+    def __init__(self, start:str, end:Optional[str], queue_size:int):
+        self.start = start
+        self.end = end
+        self.pages:Queue[Union[List[Json], Exception, None]] = Queue(queue_size)
+        self.next:Optional[_Shard] = None
+        self.claimed = False
+
+
+class ParallelListing:
+    """
+    Lists the files of a bucket concurrently, splitting the names into disjoint ranges (shards)
+    that are listed by a pool of workers with the "startFileName" of
+    :func:`~blaziken.api.BackBlazeB2.list_files`.
+
+    The initial shards are delimited by the first-level virtual folders of the prefix. Then,
+    whenever a worker is idle, the shard of a busy worker is split in two at a name halfway
+    between its current position and its end, so huge folders and flat buckets are also listed
+    concurrently. Splitting costs, at most, one extra request per split.
+
+    Iterating over the listing yields the json-encoded data of each file. When unordered, files
+    are yielded as soon as their pages are listed; when ordered, files are yielded in global name
+    order, with each shard buffering at most "queue_size" pages ahead of the consumer.
+
+    :example:
+
+    >>> for file_data in ParallelListing(api, 'bucket_id', 'photos/', workers=16):
+    >>>     print(file_data['fileName'])
+
+    """
+
+    # pylint: disable = too-many-arguments
+    def __init__(self, api:BackBlazeB2, bucket_id:str, prefix:str='', workers:int=8,
+                 ordered:bool=False, page_size:int=1000, queue_size:int=4,
+                 delimiter:Optional[str]=BackBlazeB2.FOLDER_DELIMITER):
+        """
+        :param api: The BackBlazeB2 instance used to list the files.
+        :param bucket_id: The id of the bucket to be listed.
+        :param prefix: Lists only the files which names start with the prefix.
+        :param workers: The number of shards listed concurrently.
+        :param ordered: True to yield the files in name order, False to yield them as they are
+                        listed.
+        :param page_size: The number of files listed per request (at most 10000).
+        :param queue_size: The number of pages buffered for each shard (or for each worker, when
+                           unordered) before its listing is paused.
+        :param delimiter: The delimiter of the virtual folders used to create the initial shards,
+                          None to start with a single shard split adaptively.
+        :raises ValueError: If the number of workers or the queue size are less than 1.
+        """
+        if workers < 1 or queue_size < 1:
+            raise ValueError("The number of workers and the queue size must be at least 1")
+        self._api = api
+        self._bucket_id = bucket_id
+        self._prefix = prefix
+        self._workers = workers
+        self._ordered = ordered
+        self._page_size = page_size
+        self._queue_size = queue_size
+        self._delimiter = delimiter
+        self._shards:Queue[Optional[_Shard]] = Queue()
+        self._results:Queue[Union[List[Json], Exception, None]] = Queue()
+        self._lock = Lock()
+        self._stop = Event()
+        self._pending = 0
+        self._active = 0
+    # pylint: enable = too-many-arguments
+
+    def __iter__(self) -> Generator[Json, None, None]:
+        first = self._create_shards()
+        self._stop.clear()
+        with ThreadPoolExecutor(self._workers) as executor:
+            for _ in range(self._workers):
+                executor.submit(self._work)
+            try:
+                yield from self._iter_ordered(first) if self._ordered else self._iter_unordered()
+            finally:
+                self._stop.set()
+                for _ in range(self._workers):
+                    self._shards.put(None)
+
+    @property
+    def _prefix_end(self) -> Optional[str]:
+        """ Gets the first name after all names starting with the prefix, None if unbounded. """
+        if not self._prefix or ord(self._prefix[-1]) + 1 >= UNICODE_END:
+            return None
+        return f'{self._prefix[:-1]}{chr(ord(self._prefix[-1]) + 1)}'
+
+    def _create_shards(self) -> _Shard:
+        """
+        Creates the initial shards, delimited by the first-level folders of the prefix, and
+        queues them to be listed.
+
+        :returns: The first shard of the chain.
+        """
+        boundaries = ['']
+        if self._delimiter:
+            page = self._api.list_files(self._prefix, self._delimiter, self._page_size, '',
+                                        self._bucket_id)
+            boundaries.extend(data['fileName'] for data in page.get('files', [])
+                              if data.get('action') == 'folder')
+        boundaries.append(self._prefix_end)
+        self._shards = Queue()
+        self._results = Queue(self._workers * self._queue_size)
+        shards = [_Shard(start, end, self._queue_size)
+                  for start, end in zip(boundaries[:-1], boundaries[1:])]
+        for shard, next_shard in zip(shards[:-1], shards[1:]):
+            shard.next = next_shard
+        self._pending = len(shards)
+        self._active = 0
+        for shard in shards:
+            self._shards.put(shard)
+        return shards[0]
+
+    def _iter_unordered(self) -> Generator[Json, None, None]:
+        """ Yields the files of the pages as soon as any worker lists them. """
+        while True:
+            files = self._results.get()
+            if files is None:
+                break
+            if isinstance(files, Exception):
+                raise files
+            yield from files
+
+    def _iter_ordered(self, shard:Optional[_Shard]) -> Generator[Json, None, None]:
+        """
+        Yields the files of each shard following the chain. A shard not yet claimed by a worker
+        is listed by the consumer itself, so the listing never waits for a shard stuck behind
+        workers paused by full queues.
+        """
+        while shard is not None:
+            if self._claim(shard):
+                try:
+                    for files in self._list_shard(shard):
+                        yield from files
+                finally:
+                    self._finish(shard)
+            else:
+                while True:
+                    files = shard.pages.get()
+                    if files is None:
+                        break
+                    if isinstance(files, Exception):
+                        raise files
+                    yield from files
+            shard = shard.next
+
+    def _claim(self, shard:_Shard) -> bool:
+        """ Claims a shard to be listed, returning False if it was already claimed. """
+        with self._lock:
+            if shard.claimed:
+                return False
+            shard.claimed = True
+            self._active += 1
+            return True
+
+    def _finish(self, shard:_Shard):
+        """ Marks a shard as listed, signalling the end of the listing after the last shard. """
+        with self._lock:
+            self._active -= 1
+            self._pending -= 1
+            finished = self._pending == 0
+        if self._ordered:
+            self._put(shard.pages, None)
+        elif finished:
+            self._put(self._results, None)
+
+    def _put(self, queue:Queue, item:Union[List[Json], Exception, None]):
+        """ Puts an item in a queue, waiting for free space unless the listing is stopped. """
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                pass
+
+    def _work(self):
+        """ Lists the queued shards until the listing is stopped. """
+        while not self._stop.is_set():
+            shard = self._shards.get()
+            if shard is None:
+                break
+            if not self._claim(shard):
+                continue
+            queue = shard.pages if self._ordered else self._results
+            try:
+                for files in self._list_shard(shard):
+                    self._put(queue, files)
+            except Exception as error:  # pylint: disable = broad-except  # Re-raised by consumer
+                self._put(queue, error)
+            finally:
+                self._finish(shard)
+
+    def _list_shard(self, shard:_Shard) -> Generator[List[Json], None, None]:
+        """
+        Lists the files of a shard page by page, splitting off the rest of its range to a new
+        shard whenever a worker is idle.
+
+        :yields: The list of files of each page.
+        """
+        start_name = shard.start
+        while not self._stop.is_set():
+            page = self._api.list_files(self._prefix, '', self._page_size, start_name,
+                                        self._bucket_id)
+            files = page.get('files', [])
+            if shard.end is not None:
+                files = [data for data in files if data['fileName'] < shard.end]
+            if files:
+                yield files
+            start_name = page.get('nextFileName')
+            if not start_name or (shard.end is not None and start_name >= shard.end):
+                break
+            self._split(shard, start_name)
+
+    def _split(self, shard:_Shard, position:str):
+        """ Splits the names after the position of a shard to a new shard if a worker is idle. """
+        with self._lock:
+            if self._active + self._shards.qsize() >= self._workers:
+                return
+            middle = name_midpoint(position, shard.end)
+            if middle is None or middle <= position:
+                return
+            new_shard = _Shard(middle, shard.end, self._queue_size)
+            new_shard.next = shard.next
+            shard.next = new_shard
+            shard.end = middle
+            self._pending += 1
+        self._shards.put(new_shard)
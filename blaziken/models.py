@@ -3,36 +3,58 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 # Built-in imports
+from array import array
 from datetime import datetime
 from pathlib import Path
+from sys import intern
 # Project imports
 from blaziken import BackBlazeB2
+from blaziken.batch import DeleteBatch
+from blaziken.batch import UploadBatch
+from blaziken.constants import HUNDRED_MB
+from blaziken.constants import ONE_MB
 from blaziken.enums import BucketType
 from blaziken.enums import FileAction
 from blaziken.enums import KeyCapabilities
+from blaziken.enums import SyncAction
 from blaziken.exceptions import BucketError
 from blaziken.exceptions import FileError
 from blaziken.exceptions import ResponseError
+from blaziken.index import BucketIndex
+from blaziken.listing import Paginator
+from blaziken.listing import ParallelListing
+from blaziken.sync import Sync
 
 if TYPE_CHECKING:
     # pylint: disable = ungrouped-imports
+    from blaziken.cache import AuthCache
     from blaziken.http import Http
     from blaziken.meta import UploadGenerator
     from typing import Any
     from typing import BinaryIO
     from typing import Dict
     from typing import Generator
+    from typing import Iterable
+    from typing import Iterator
     from typing import List
     from typing import Optional
     from typing import Union
 
 
+# Decoding the action of a file with a lookup is much faster than calling the enum
+FILE_ACTIONS = {action.value: action for action in FileAction}
+
+
 class B2Objects:
     """ Root class for using the object-oriented API of the library. """
 
     def __init__(self, account_id:str, app_key:str, auth:bool=False,
-                 http:Optional[Http]=None):
-        self._api = BackBlazeB2(account_id, app_key, auth, http)
+                 http:Optional[Http]=None, auth_cache:Optional[AuthCache]=None):
+        """
+        :param auth_cache: A cache of authorizations, to reuse a valid authorization of another
+                           process instead of authenticating at startup.
+        """
+        self._api = BackBlazeB2(account_id, app_key, auth, http, auth_cache)
 
     @property
     def account_id(self) -> str:
@@ -72,6 +94,15 @@ class B2Objects:
         return [Key(self._api, key_info)
                 for key_info in self._api.list_keys(self._api.account_id).get('keys', [])]
 
+    def all_keys(self, page_size:int=0) -> Generator[Key, None, None]:
+        """
+        Lists all non-expired application keys, requesting each following page in the background.
+
+        :param page_size: The number of keys listed per request. If 0, the service's default.
+        """
+        for key_info in Paginator.keys(self._api, self._api.account_id, page_size):
+            yield Key(self._api, key_info)
+
     def buckets(self) -> List[Bucket]:
         """ Lists all existing buckets in the authenticated account. """
         return [Bucket(self._api, bucket_info)
@@ -172,6 +203,7 @@ class Bucket:
         self.life_cycle = data.get('lifecycleRules', [])
         self.options = data.get('options', [])
         self.revision = data.get('revision', -1)
+        self.index:Optional[BucketIndex] = None
         self._next_files = None
         self._next_params = tuple()
 
@@ -204,7 +236,8 @@ class Bucket:
         number of returned files was greater than max_files. If files() is called again before
         more_files(), it will not be possible to retrieve the remaining files of the first call.
         The parameters prefix, delimiter, max_files passed to the files() call will be repeated
-        when calling more_files().
+        when calling more_files(). The pagination state is stored in the bucket, so concurrent
+        listings must use :func:`Bucket.pages()` instead.
 
         :yields: A list of File objects representing the next set of results.
 
@@ -226,20 +259,47 @@ class Bucket:
                 break
             yield more_files
 
+    def pages(self, prefix:str='', delimiter:Optional[str]=None,
+              max_files:int=BackBlazeB2.DEFAULT_FILE_COUNT, prefetch:bool=True) -> Paginator:
+        """
+        Creates a paginator of the files of the bucket, which stores no state in the bucket, so
+        many listings can run at once (e.g.: from different threads). See
+        :class:`~blaziken.listing.Paginator`.
+        Parameters are the same as :func:`Bucket.files()`.
+        """
+        return Paginator.files(self._api, self.id, prefix, delimiter, max_files, prefetch)
+
     def all_files(self, prefix:str='', delimiter:Optional[str]=None,
                   max_files:int=BackBlazeB2.DEFAULT_FILE_COUNT, start_name:str=''
                   ) -> Generator[File, None, None]:
         """
-        Combines :func:`Bucket.files()` and :func:`Bucket.more_files()` into a single generator
-        that yields all files matching the given parameters.
+        Yields all files matching the given parameters, requesting each following page in the
+        background while the current one is consumed. It is safe to use concurrently.
         Parameters are the same as :func:`Bucket.files()` (max_files will be the maximum number of
         files per request, not in total).
         """
-        for bucket_file in self.files(prefix, delimiter, max_files, start_name):
-            yield bucket_file
-        for more_files in self.more_files():
-            for bucket_file in more_files:
-                yield bucket_file
+        for file_info in self.pages(prefix, delimiter, max_files).items(start_name):
+            yield File(self._api, self, file_info)
+
+    def file_pages(self, prefix:str='', delimiter:Optional[str]=None,
+                   max_files:int=BackBlazeB2.MAX_LIST_FILES,
+                   start_name:str='') -> Generator[FilePage, None, None]:
+        """
+        Same as :func:`Bucket.all_files()`, but yields each page as a compact
+        :class:`FilePage` instead of a File per file, using much less memory for large listings.
+        """
+        for files, next_file_name in self.pages(prefix, delimiter, max_files).pages(start_name):
+            yield FilePage(self._api, self, files, next_file_name)
+
+    def all_files_parallel(self, prefix:str='', workers:int=8, ordered:bool=False,
+                           page_size:int=1000) -> Generator[File, None, None]:
+        """
+        Same as :func:`Bucket.all_files()`, listing all files recursively, but listing disjoint
+        ranges of names concurrently. Parameters are the same as
+        :class:`~blaziken.listing.ParallelListing`.
+        """
+        for file_data in ParallelListing(self._api, self.id, prefix, workers, ordered, page_size):
+            yield File(self._api, self, file_data)
 
     def folder(self, name:str, delimiter:Optional[str]=BackBlazeB2.FOLDER_DELIMITER,
                max_files:int=BackBlazeB2.DEFAULT_FILE_COUNT) -> List[File]:
@@ -256,15 +316,38 @@ class Bucket:
         return self.files(name if name.endswith(delimiter) else f'{name}{delimiter}',
                           delimiter, max_files)
 
+    def use_index(self, path:Union[str, Path], refresh_prefix:Optional[str]=None) -> BucketIndex:
+        """
+        Creates a local index of the bucket's files (see :class:`~blaziken.index.BucketIndex`),
+        which is then used by :func:`Bucket.file()` to find files without making requests.
+
+        :param path: The path of the database file of the index.
+        :param refresh_prefix: The prefix to be refreshed when creating the index. If None, the
+                               index is not refreshed.
+        :returns: The index of the bucket.
+        """
+        if self.index is not None:
+            self.index.close()
+        self.index = BucketIndex(path, self.id, self._api)
+        if refresh_prefix is not None:
+            self.index.refresh(refresh_prefix)
+        return self.index
+
     def file(self, file_id:str='', file_name:str='') -> File:
         """
-        Gets a single file from the bucket using either its id or full file name.
+        Gets a single file from the bucket using either its id or full file name. If the bucket
+        has an index, it is looked up first and the service is only requested for files that are
+        not indexed.
 
         :param file_id: The id of the file to be retrieved.
         :param file_name: The full name of the file to be retrieved.
         :returns: A File instance representing the desired file.
         :raises FileError: If no file matches the specified id or name.
         """
+        if self.index is not None:
+            data = self.index.get(file_name) if file_name else self.index.get_by_id(file_id)
+            if data is not None:
+                return File(self._api, self, data)
         if file_name:
             try:
                 return self.files(max_files=1, start_name=file_name)[0]
@@ -275,23 +358,118 @@ class Bucket:
         except ResponseError as exc:
             raise FileError(f'No file exists with id "{file_id}" in bucket "{self.name}".') from exc
 
-    def delete(self):
-        """ Deletes the bucket. """
+    def delete(self, empty:bool=False, workers:int=8):
+        """
+        Deletes the bucket. Only empty buckets can be deleted.
+
+        :param empty: True to delete every file version of the bucket first (see Bucket.empty()).
+        :param workers: The number of versions deleted concurrently when emptying the bucket.
+        :raises BucketError: If emptying the bucket failed to delete some versions.
+        """
+        if empty:
+            batch = self.empty(workers)
+            for _ in batch:
+                pass
+            if batch.stats.failed:
+                raise BucketError(f'Failed to delete {batch.stats.failed} file versions of '
+                                  f'bucket "{self.name}", it was not deleted.')
         self._api.delete_bucket(self.id)
 
+    def empty(self, workers:int=8) -> DeleteBatch:
+        """
+        Deletes every file version of the bucket and cancels its unfinished large files.
+
+        :returns: The batch, which deletes the versions when iterated, yielding a DeleteResult for
+                  each of them. Its "stats" attribute has the progress of the batch.
+        """
+        return self.delete_prefix('', workers=workers)
+
+    def delete_prefix(self, prefix:str, hide:bool=False, workers:int=8) -> DeleteBatch:
+        """
+        Deletes every version of the files which names start with a prefix, or hides them.
+        Parameters are the same as :func:`~blaziken.batch.DeleteBatch.prefix`.
+
+        :returns: The batch, which deletes the versions when iterated, yielding a DeleteResult for
+                  each of them. Its "stats" attribute has the progress of the batch.
+        """
+        return DeleteBatch.prefix(self._api, self.id, prefix, hide, workers)
+
+    def delete_many(self, files:Iterable[Union[File, Dict[str, Any]]], hide:bool=False,
+                    workers:int=8) -> DeleteBatch:
+        """
+        Deletes (or hides) many file versions concurrently. Parameters are the same as
+        :class:`~blaziken.batch.DeleteBatch`, but File instances are also accepted.
+
+        :returns: The batch, which deletes the versions when iterated, yielding a DeleteResult for
+                  each of them. Its "stats" attribute has the progress of the batch.
+        """
+        files = (b2file.data if isinstance(b2file, File) else b2file for b2file in files)
+        return DeleteBatch(self._api, self.id, files, hide, workers)
+
+    def download_urls(self, files:Iterable[File], token_duration:int=0) -> List[str]:
+        """
+        Builds the download URLs of many files of the bucket. For private buckets, a single
+        authorization token is used for all the files of each folder (see
+        :func:`~blaziken.api.BackBlazeB2.download_urls`).
+
+        :param files: The files of the bucket.
+        :param token_duration: The validity of the tokens, in seconds. If 0, the default duration
+                               of File.download_url() is used.
+        :returns: The download URLs of the files, in the same order.
+        """
+        names = [b2file.name for b2file in files]
+        if self.type == BucketType.public:
+            return [self._api.download_url_path(name, bucket_name=self.name) for name in names]
+        return self._api.download_urls(names, token_duration or File.AUTH_TOKEN_DURATION,
+                                       self.name, self.id)
+
     def upload_iter(self, file_or_path:Union[str, Path, BinaryIO], file_name:str='',
-                    append_filename:bool=False, file_size:int=0) -> UploadGenerator:
+                    append_filename:bool=False, file_size:int=0,
+                    resume:bool=False) -> UploadGenerator:
         """
         Uploads a file to the bucket, yield the result of each part's upload.
         Parameters are the same as BackBlazeB2.upload.
         """
-        return self._api.upload(file_or_path, file_name, append_filename, file_size, self.id)
+        return self._api.upload(file_or_path, file_name, append_filename, file_size, self.id,
+                                resume)
 
     def upload(self, file_or_path:Union[str, Path, BinaryIO], file_name:str='',
-               append_filename:bool=False, file_size:int=0) -> File:
+               append_filename:bool=False, file_size:int=0, resume:bool=False) -> File:
         """ Uploads a file to the bucket. Parameters are the same as BackBlazeB2.upload. """
         return File(self.api, self, list(self._api.upload(
-            file_or_path, file_name, append_filename, file_size, self.id))[-1][0])
+            file_or_path, file_name, append_filename, file_size, self.id, resume))[-1][0])
+
+    def cancel_unfinished_uploads(self, older_than:float, prefix:str='') -> List[Dict[str, Any]]:
+        """
+        Cancels the unfinished large file uploads of the bucket started before a time.
+        Parameters are the same as :func:`~blaziken.api.BackBlazeB2.cancel_unfinished_large_files`.
+
+        :returns: A list with the json-encoded response of each cancelled file.
+        """
+        return self._api.cancel_unfinished_large_files(older_than, self.id, prefix)
+
+    def upload_many(self, paths_or_dir:Union[str, Path, Iterable[Union[str, Path]]],
+                    prefix:str='', workers:int=8) -> UploadBatch:
+        """
+        Uploads many files to the bucket concurrently. Parameters are the same as
+        :class:`~blaziken.batch.UploadBatch`.
+
+        :returns: The batch, which uploads the files when iterated, yielding an UploadResult for
+                  each file as its upload finishes. Its "stats" attribute has the aggregate
+                  throughput of the batch.
+        """
+        return UploadBatch(self._api, self.id, paths_or_dir, prefix, workers)
+
+    def sync(self, directory:Union[str, Path], prefix:str='', workers:int=8,
+             on_missing:SyncAction=SyncAction.skip, checksum:bool=True,
+             dry_run:bool=False) -> Sync:
+        """
+        Synchronizes a local directory to the bucket, uploading only new or changed files.
+        Parameters are the same as :class:`~blaziken.sync.Sync`.
+
+        :returns: The sync, which runs when iterated, yielding a SyncResult for each file.
+        """
+        return Sync(self._api, self.id, directory, prefix, workers, on_missing, checksum, dry_run)
 
 
 class File:
@@ -300,23 +478,126 @@ class File:
     To allow third-parties to download a file from a private bucket, an authorization token is
     required. Obtaining the auth token is handled automatically.
 
+    Files are created from listings of thousands of files, so they keep a reference to the
+    json-encoded data of the file instead of copying its fields, and decode each field (e.g.: the
+    action enum or the upload time) only when it is accessed. Instances have no __dict__. Fields
+    can still be assigned (e.g.: "b2file.name = 'new name'"), which replaces the data with a
+    modified copy, so the listing (or cache) the file came from is never modified.
+
     :cvar AUTH_TOKEN_DURATION: The time (in seconds) until an auth token expires. Default: 8 hours.
     """
 
+    __slots__ = ('_api', 'bucket', '_data')
     AUTH_TOKEN_DURATION = 8 * 60 * 60  # 8 hours
 
     def __init__(self, api, bucket:Bucket, data:Dict[str, Any]):
         self._api = api
         self.bucket = bucket
-        self.id = data.get('fileId', '')  # pylint: disable = invalid-name
-        self.name = data.get('fileName', '')
-        self.size = data.get('contentLength', -1)
-        self.md5 = data.get('contentMd5', '')
-        self.sha1 = data.get('contentSha1', '')
-        self.content_type = data.get('contentType', '')
-        self.timestamp = data.get('uploadTimestamp', -1)
-        self.extra = data.get('fileInfo', {})
-        self.action = FileAction(data.get('action', ''))
+        self._data = data
+
+    def _set(self, key:str, value:Any):
+        """ Sets a field of the json-encoded data on a copy of it, which may be shared. """
+        self._data = dict(self._data, **{key: value})
+
+    @property
+    def id(self) -> str:  # pylint: disable = invalid-name
+        """ Gets the id of the file. """
+        return self._data.get('fileId', '')
+
+    @id.setter
+    def id(self, value:str):  # pylint: disable = invalid-name
+        """ Sets the id of the file. """
+        self._set('fileId', value)
+
+    @property
+    def name(self) -> str:
+        """ Gets the name of the file, including its folders. """
+        return self._data.get('fileName', '')
+
+    @name.setter
+    def name(self, value:str):
+        """ Sets the name of the file. """
+        self._set('fileName', value)
+
+    @property
+    def size(self) -> int:
+        """ Gets the size of the file in bytes, -1 if unknown. """
+        return self._data.get('contentLength', -1)
+
+    @size.setter
+    def size(self, value:int):
+        """ Sets the size of the file in bytes. """
+        self._set('contentLength', value)
+
+    @property
+    def md5(self) -> str:
+        """ Gets the hex MD5 checksum of the file, if known. """
+        return self._data.get('contentMd5', '')
+
+    @md5.setter
+    def md5(self, value:str):
+        """ Sets the hex MD5 checksum of the file. """
+        self._set('contentMd5', value)
+
+    @property
+    def sha1(self) -> str:
+        """ Gets the hex SHA1 checksum of the file, if known. """
+        return self._data.get('contentSha1', '')
+
+    @sha1.setter
+    def sha1(self, value:str):
+        """ Sets the hex SHA1 checksum of the file. """
+        self._set('contentSha1', value)
+
+    @property
+    def content_type(self) -> str:
+        """ Gets the MIME type of the file. """
+        return self._data.get('contentType', '')
+
+    @content_type.setter
+    def content_type(self, value:str):
+        """ Sets the MIME type of the file. """
+        self._set('contentType', value)
+
+    @property
+    def timestamp(self) -> int:
+        """ Gets the upload time of the file, in milliseconds since the epoch. """
+        return self._data.get('uploadTimestamp', -1)
+
+    @timestamp.setter
+    def timestamp(self, value:int):
+        """ Sets the upload time of the file, in milliseconds since the epoch. """
+        self._set('uploadTimestamp', value)
+
+    @property
+    def upload_time(self) -> Optional[datetime]:
+        """ Gets the upload time of the file, None if unknown. """
+        return datetime.fromtimestamp(self.timestamp / 1000) if self.timestamp > 0 else None
+
+    @property
+    def extra(self) -> Dict[str, str]:
+        """ Gets the custom information (file info) stored with the file. """
+        return self._data.get('fileInfo', {})
+
+    @extra.setter
+    def extra(self, value:Dict[str, str]):
+        """ Sets the custom information (file info) of the file. """
+        self._set('fileInfo', value)
+
+    @property
+    def action(self) -> FileAction:
+        """ Gets the state of the file, FileAction.null if unknown to FileAction. """
+        return FILE_ACTIONS.get(self._data.get('action', ''), FileAction.null)
+
+    @action.setter
+    def action(self, value:FileAction):
+        """ Sets the state of the file. """
+        self._set('action', value.value)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """ Gets the json-encoded data of the file, which must not be modified. """
+        return self._data
 
     def __str__(self) -> str:
         return self.name
@@ -326,34 +607,175 @@ class File:
 
     @property
     def extension(self) -> str:
+        """ Gets the extension of the file name, including the dot. """
         return Path(self.name).suffix
 
     @property
     def base_name(self) -> str:
+        """ Gets the name of the file without its folders. """
         return Path(self.name).name
 
     @property
     def api(self) -> BackBlazeB2:
+        """ Gets the api used by the file. """
         return self._api
 
     @property
     def url(self) -> str:
+        """ Gets the download URL of the file, without authorization. """
         return f'{self.api.download_url}/file/{self.bucket.name}/{self.name}'
 
     @property
     def is_folder(self) -> bool:
-        return self.action == FileAction.folder if self.action else not bool(self.id)
+        """ Checks if the file is a virtual folder. """
+        action = self.action
+        return action == FileAction.folder if action != FileAction.null else not bool(self.id)
 
     def download_url(self, token_duration:int=AUTH_TOKEN_DURATION) -> str:
+        """ Gets the download URL of the file, authorized for a time if its bucket is private. """
         if self.bucket.type == BucketType.public:
             return self._api.download_url_path(self.name, bucket_name=self.bucket.name)
         auth_token = self._api.get_download_auth(self.name, token_duration, self.bucket.id)
         return self._api.download_url_path(self.name, auth_token, self.bucket.name)
 
-    def download(self, save_path:Path) -> Path:
+    def download(self, save_path:Path, chunk_size:int=ONE_MB, workers:int=0,
+                 range_size:int=HUNDRED_MB, resume:bool=False) -> Path:
+        """
+        Downloads the file, streaming its content to the file system in chunks.
+        Parameters are the same as :func:`~blaziken.api.BackBlazeB2.download_file`.
+
+        :param save_path: The path where the file will be written. If it is a directory, the
+                          file's base name is appended to it.
+        :returns: The path of the downloaded file.
+        """
         path = save_path / self.base_name if save_path.is_dir() else save_path
-        self._api.download_file(self.download_url(), path, )
+        self._api.download_file(self.download_url(), path, chunk_size, workers, range_size,
+                                resume=resume)
         return path
 
+    def iter_content(self, chunk_size:int=ONE_MB) -> Generator[bytes, None, None]:
+        """
+        Downloads the file yielding its content in chunks, without ever holding the whole file.
+
+        :param chunk_size: The maximum size (in bytes) of each yielded chunk.
+        :yields: The chunks of the file content, in order.
+        """
+        return self._api.iter_download(self.download_url(), chunk_size)
+
     def delete(self):
+        """ Deletes this version of the file. """
         self._api.delete_file(self.id, self.name)
+
+    def copy_to(self, bucket:Optional[Bucket]=None, name:str='', content_type:Optional[str]=None,
+                file_info:Optional[Dict[str, str]]=None, workers:int=0) -> File:
+        """
+        Copies the file on the server side, without downloading it. Parameters are the same as
+        :func:`~blaziken.api.BackBlazeB2.copy`.
+
+        :param bucket: The bucket of the copy. If None, the bucket of the file.
+        :param name: The name of the copy. If empty, the name of the file.
+        :returns: The new file.
+        """
+        bucket = bucket if bucket is not None else self.bucket
+        name = name if name else self.name
+        return File(self._api, bucket, self._api.copy(self.data, name, bucket.id, content_type,
+                                                      file_info, workers))
+
+
+class FilePage:
+    """
+    Compact, column-oriented container of a page of files, used instead of thousands of File
+    instances when processing large listings. Sizes, timestamps and actions are stored in typed
+    arrays and repeated strings (content types) are interned, so a page of 10000 files takes a
+    fraction of the memory of its json-encoded data. Indexing or iterating over the page creates
+    File instances on demand.
+
+    :ivar names: The names of the files.
+    :ivar ids: The ids of the files.
+    :ivar sizes: The sizes of the files, in bytes.
+    :ivar timestamps: The upload times of the files, in milliseconds since the epoch.
+    :ivar next_file_name: The name of the first file of the next page, None if last page.
+    :cvar UNKNOWN_ACTION_CODE: The code stored for actions unknown to FileAction (as null).
+    """
+
+    __slots__ = ('_api', 'bucket', 'names', 'ids', 'sizes', 'timestamps', 'next_file_name',
+                 '_sha1s', '_md5s', '_content_types', '_actions', '_infos')
+    ACTIONS = tuple(FileAction)
+    ACTION_CODES = {action.value: code for code, action in enumerate(ACTIONS)}
+    UNKNOWN_ACTION_CODE = ACTION_CODES[FileAction.null.value]
+
+    def __init__(self, api:BackBlazeB2, bucket:Bucket, files:Iterable[Dict[str, Any]],
+                 next_file_name:Optional[str]=None):
+        """
+        :param api: The BackBlazeB2 instance of the files.
+        :param bucket: The bucket of the files.
+        :param files: The json-encoded data of the files, as returned by the B2 service.
+        :param next_file_name: The name of the first file of the next page, if any.
+        """
+        self._api = api
+        self.bucket = bucket
+        self.next_file_name = next_file_name
+        self.names:List[str] = []
+        self.ids:List[str] = []
+        self.sizes = array('q')
+        self.timestamps = array('q')
+        self._sha1s:List[str] = []
+        self._md5s:List[Optional[str]] = []
+        self._content_types:List[str] = []
+        self._actions = bytearray()
+        self._infos:List[Optional[Dict[str, str]]] = []
+        for data in files:
+            self.names.append(data.get('fileName', ''))
+            self.ids.append(data.get('fileId', ''))
+            self.sizes.append(data.get('contentLength', -1))
+            self.timestamps.append(data.get('uploadTimestamp', -1))
+            self._sha1s.append(data.get('contentSha1', ''))
+            self._md5s.append(data.get('contentMd5'))
+            self._content_types.append(intern(data.get('contentType', '')))
+            self._actions.append(self.ACTION_CODES.get(data.get('action', ''),
+                                                       self.UNKNOWN_ACTION_CODE))
+            self._infos.append(data.get('fileInfo') or None)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index:int) -> File:
+        return File(self._api, self.bucket, self.data(index))
+
+    def __iter__(self) -> Iterator[File]:
+        return (self[index] for index in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}> {len(self)} files'
+
+    @classmethod
+    def from_response(cls, api:BackBlazeB2, bucket:Bucket, response:Dict[str, Any]) -> FilePage:
+        """ Creates a page from the response of :func:`~blaziken.api.BackBlazeB2.list_files`. """
+        return cls(api, bucket, response.get('files', []), response.get('nextFileName'))
+
+    @property
+    def total_size(self) -> int:
+        """ Gets the sum of the sizes of the files of the page, in bytes. """
+        return sum(size for size in self.sizes if size > 0)
+
+    def action(self, index:int) -> FileAction:
+        """ Gets the action of a file of the page. """
+        return self.ACTIONS[self._actions[index]]
+
+    def data(self, index:int) -> Dict[str, Any]:
+        """ Rebuilds the json-encoded data of a file of the page. """
+        data = {
+            'bucketId': self.bucket.id if self.bucket is not None else '',
+            'fileId': self.ids[index],
+            'fileName': self.names[index],
+            'contentLength': self.sizes[index],
+            'contentSha1': self._sha1s[index],
+            'contentMd5': self._md5s[index],
+            'contentType': self._content_types[index],
+            'uploadTimestamp': self.timestamps[index],
+            'action': self.action(index).value,
+            'fileInfo': self._infos[index] if self._infos[index] is not None else {},
+        }
+        if data['contentMd5'] is None:
+            del data['contentMd5']
+        return data
@@ -0,0 +1,103 @@
+""" Module with the pool of reusable upload URLs used for single-part uploads. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from contextlib import contextmanager
+from threading import Lock
+# Project imports
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.api import BackBlazeB2
+    from blaziken.meta import Json
+    from typing import Dict
+    from typing import Generator
+    from typing import List
+    from typing import Optional
+
+
+class UploadUrlPool:
+    """
+    Thread-safe pool of upload URLs (and their authorization tokens) of each bucket.
+    An upload URL can only be used by one upload at a time, so each URL is checked out to a
+    single uploader and returned to the pool after it is used. URLs that fail with an
+    authorization, timeout, busy or connection error are discarded instead, as required by the
+    `B2 integration checklist <https://www.backblaze.com/b2/docs/integration_checklist.html>`_.
+
+    :cvar DISCARD_STATUSES: HTTP status codes after which an upload URL must not be reused.
+    """
+
+    DISCARD_STATUSES = (401, 408, 429, 500, 503)
+
+    def __init__(self, api:BackBlazeB2):
+        """
+        :param api: The BackBlazeB2 instance used to obtain new upload URLs.
+        """
+        self._api = api
+        self._urls:Dict[str, List[Json]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(urls) for urls in self._urls.values())
+
+    def acquire(self, bucket_id:str) -> Json:
+        """
+        Checks out an upload URL of a bucket, requesting a new one if none is available.
+
+        :param bucket_id: The id of the bucket where files will be uploaded.
+        :returns: A json-like 3-dict containing the keys: bucketId, uploadUrl, authorizationToken.
+        """
+        upload_data = self.take(bucket_id)
+        return upload_data if upload_data is not None else self._api.request_upload_url(bucket_id)
+
+    def take(self, bucket_id:str) -> Optional[Json]:
+        """ Checks out a pooled upload URL of a bucket, None if none is available. """
+        with self._lock:
+            urls = self._urls.get(bucket_id)
+            return urls.pop() if urls else None
+
+    def release(self, bucket_id:str, upload_data:Json):
+        """ Returns a checked out upload URL to the pool, so it can be reused. """
+        with self._lock:
+            self._urls.setdefault(bucket_id, []).append(upload_data)
+
+    def clear(self, bucket_id:Optional[str]=None):
+        """ Discards all the pooled upload URLs of a bucket, or of all buckets if not specified. """
+        with self._lock:
+            if bucket_id is None:
+                self._urls.clear()
+            else:
+                self._urls.pop(bucket_id, None)
+
+    @classmethod
+    def must_discard(cls, error:Exception) -> bool:
+        """ Checks if an upload URL must be discarded after the upload failed with the error. """
+        if isinstance(error, RequestError):
+            return error.status in cls.DISCARD_STATUSES or error.status > 500
+        return isinstance(error, InternetError)
+
+    @contextmanager
+    def checkout(self, bucket_id:str) -> Generator[Json, None, None]:
+        """
+        Checks out an upload URL for the duration of the context. The URL is returned to the pool
+        if the context exits successfully (or the error does not invalidate the URL).
+
+        :example:
+
+        >>> with api.upload_urls.checkout(bucket_id) as upload_data:
+        >>>     api.upload_file(data, upload_data['uploadUrl'],
+        >>>                     upload_data['authorizationToken'], 'file_name')
+
+        """
+        upload_data = self.acquire(bucket_id)
+        try:
+            yield upload_data
+        except Exception as error:
+            if not self.must_discard(error):
+                self.release(bucket_id, upload_data)
+            raise
+        self.release(bucket_id, upload_data)
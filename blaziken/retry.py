@@ -0,0 +1,259 @@
+""" Module with the policy used to retry requests that failed with transient errors. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from email.utils import parsedate_to_datetime
+from random import uniform
+from re import search
+from threading import Lock
+from time import sleep
+from time import time
+# Third-party imports
+from requests.exceptions import ConnectTimeout
+# Project imports
+from blaziken.enums import Endpoints
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.pool import UploadUrlPool
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from typing import Callable
+    from typing import List
+    from typing import Mapping
+    from typing import Optional
+
+
+class RetryBudget:
+    """
+    Thread-safe token bucket that limits retries to a fraction of the requests made, so a service
+    that is failing is not flooded by retries of every client request. Each request deposits
+    "ratio" tokens (up to "reserve" tokens) and each retry withdraws one token.
+
+    :ivar ratio: The number of retries allowed per request made, in the long run.
+    :ivar reserve: The maximum number of retries allowed in a burst, also the initial tokens.
+    """
+
+    def __init__(self, ratio:float=0.2, reserve:int=10):
+        """
+        :raises ValueError: If the ratio or the reserve are negative.
+        """
+        if ratio < 0 or reserve < 0:
+            raise ValueError('The ratio and the reserve of a retry budget must not be negative')
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = float(reserve)
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}> {self.tokens:.1f}/{self.reserve} tokens'
+
+    @property
+    def tokens(self) -> float:
+        """ Gets the number of tokens available, the number of retries allowed right now. """
+        return self._tokens
+
+    def deposit(self):
+        """ Accounts a request made. """
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, float(self.reserve))
+
+    def withdraw(self) -> bool:
+        """ Takes a token for a retry, returning False if the budget is exhausted. """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryEvent:
+    """
+    Description of a retry, passed to the retry listeners (see RetryPolicy.add_retry_listener()).
+
+    :ivar method: The HTTP method of the retried request.
+    :ivar url: The URL of the retried request.
+    :ivar attempt: The number of the retry, starting at 1.
+    :ivar delay: The time, in seconds, waited before the retry.
+    :ivar error: The error of the failed attempt.
+    """
+
+    def __init__(self, method:str, url:str, attempt:int, delay:float, error:Exception):
+        self.method = method
+        self.url = url
+        self.attempt = attempt
+        self.delay = delay
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (f'<{self.__class__.__name__}:{self.attempt}> {self.method} {self.url} '
+                f'in {self.delay:.2f}s ({self.error.__class__.__name__})')
+
+
+class RetryPolicy:
+    """
+    Policy that decides if, and when, a failed request is retried, as required by the
+    `B2 integration checklist <https://www.backblaze.com/b2/docs/integration_checklist.html>`_.
+    Requests rejected with a transient status (408, 429 or 503) are always retried, while requests
+    that may have been processed (500 responses and connection errors after the request was sent)
+    are only retried if their endpoint is idempotent. Retries wait the time requested by the
+    "Retry-After" header or, without it, an exponential backoff with full jitter, and are limited
+    by a RetryBudget shared by all requests using the policy.
+
+    Uploads must be retried with a new upload URL instead of the one that failed, so they are only
+    retried by the callers that can get a new URL (the BackBlazeB2 uploading methods), which retry
+    them after any error that discards the upload URL (see UploadUrlPool.must_discard()).
+
+    :cvar RETRY_STATUSES: The HTTP status codes of responses that may be retried.
+    :cvar REJECTED_STATUSES: The HTTP status codes of requests that were not processed.
+    :cvar SAFE_METHODS: The HTTP methods that are always idempotent.
+    :cvar NON_IDEMPOTENT_ENDPOINTS: The endpoints that must not be repeated if they may have been
+                                    processed, as they would create duplicates or fail.
+    :cvar UPLOAD_ENDPOINTS: The endpoints that are retried with a new upload URL.
+    :ivar max_retries: The maximum number of retries of a request.
+    :ivar base_delay: The maximum delay, in seconds, of the first retry. It doubles every retry.
+    :ivar max_delay: The maximum delay, in seconds, of a retry. Requests asking for a longer wait
+                     with the "Retry-After" header are not retried.
+    :ivar budget: The RetryBudget shared by all requests. Set it to None for unlimited retries.
+    :ivar retries: The number of retries made.
+    :ivar exhausted: The number of failed requests not retried because of the limits.
+    """
+
+    RETRY_STATUSES = frozenset((408, 429, 500, 503))
+    REJECTED_STATUSES = frozenset((408, 429, 503))
+    SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+    NON_IDEMPOTENT_ENDPOINTS = frozenset(endpoint.value for endpoint in (
+        Endpoints.cancel_large_file, Endpoints.copy_file, Endpoints.create_bucket,
+        Endpoints.create_key, Endpoints.delete_bucket, Endpoints.delete_file,
+        Endpoints.delete_key, Endpoints.finish_large_file, Endpoints.hide_file,
+        Endpoints.start_large_file,
+    ))
+    UPLOAD_ENDPOINTS = frozenset((Endpoints.upload_file.value, Endpoints.upload_part.value))
+
+    def __init__(self, max_retries:int=5, base_delay:float=1.0, max_delay:float=64.0,
+                 budget:Optional[RetryBudget]=None):
+        """
+        :param budget: The RetryBudget limiting the retries. If None, a default budget is used.
+        :raises ValueError: If the number of retries or the delays are negative.
+        """
+        if max_retries < 0 or base_delay < 0 or max_delay < 0:
+            raise ValueError('The number of retries and the delays must not be negative')
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget if budget is not None else RetryBudget()
+        self.retries = 0
+        self.exhausted = 0
+        self._listeners:List[Callable[[RetryEvent], None]] = []
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return (f'<{self.__class__.__name__}> {self.retries} retries, '
+                f'{self.exhausted} exhausted')
+
+    def add_retry_listener(self, listener:Callable[[RetryEvent], None]):
+        """
+        Adds a function called with a RetryEvent before each retry (e.g.: to log or count them).
+        Listeners are called from the thread making the request, so they must be thread-safe.
+        """
+        self._listeners.append(listener)
+
+    def remove_retry_listener(self, listener:Callable[[RetryEvent], None]):
+        """ Removes a function added with RetryPolicy.add_retry_listener(), if it was added. """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @staticmethod
+    def endpoint(url:str) -> str:
+        """ Gets the B2 endpoint of an URL (e.g.: "/b2_list_file_names"), empty if it has none. """
+        found = search(r'/b2_[a-z_]+', url)
+        return found.group(0) if found else ''
+
+    @staticmethod
+    def parse_retry_after(value:Optional[str]) -> Optional[float]:
+        """
+        Parses the value of a "Retry-After" header, either a number of seconds or a date.
+
+        :returns: The time to wait, in seconds, or None if the value is missing or invalid.
+        """
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(date.timestamp() - time(), 0.0) if date is not None else None
+
+    def is_idempotent(self, method:str, url:str) -> bool:
+        """ Checks if repeating a request that may have been processed is harmless. """
+        return method.upper() in self.SAFE_METHODS \
+            or self.endpoint(url) not in self.NON_IDEMPOTENT_ENDPOINTS
+
+    def is_retryable(self, error:Exception, method:str, url:str, fresh_url:bool=False) -> bool:
+        """
+        Checks if a request that failed with the error may be retried, ignoring the limits.
+
+        :param fresh_url: True if the retry of an upload will use a new upload URL.
+        """
+        if self.endpoint(url) in self.UPLOAD_ENDPOINTS:
+            return fresh_url and UploadUrlPool.must_discard(error)
+        if isinstance(error, RequestError):
+            if error.status in self.REJECTED_STATUSES:
+                return True
+            return error.status in self.RETRY_STATUSES and self.is_idempotent(method, url)
+        if isinstance(error, ConnectTimeout):  # The request was never sent
+            return True
+        return isinstance(error, (InternetError, OSError)) and self.is_idempotent(method, url)
+
+    def backoff(self, attempt:int) -> float:
+        """ Gets a random delay, in seconds, before a retry ("full jitter" exponential backoff). """
+        return uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def record_request(self):
+        """ Accounts a request made (not a retry), refilling the retry budget. """
+        if self.budget is not None:
+            self.budget.deposit()
+
+    # pylint: disable = too-many-arguments
+    def next_delay(self, error:Exception, attempt:int, method:str='POST', url:str='',
+                   headers:Optional[Mapping[str, str]]=None,
+                   fresh_url:bool=False) -> Optional[float]:
+        """
+        Decides if a failed request is retried, notifying the listeners if it is.
+
+        :param error: The error of the failed attempt.
+        :param attempt: The number of retries already made for the request.
+        :param method: The HTTP method of the request.
+        :param url: The URL of the request.
+        :param headers: The headers of the error response, if any.
+        :param fresh_url: True if the retry of an upload will use a new upload URL.
+        :returns: The time to wait, in seconds, before retrying, or None to give up.
+        """
+        if not self.is_retryable(error, method, url, fresh_url):
+            return None
+        delay = self.parse_retry_after((headers or {}).get('Retry-After'))
+        if delay is None:
+            delay = self.backoff(attempt)
+        if attempt >= self.max_retries or delay > self.max_delay \
+                or (self.budget is not None and not self.budget.withdraw()):
+            with self._lock:
+                self.exhausted += 1
+            return None
+        with self._lock:
+            self.retries += 1
+        event = RetryEvent(method, url, attempt + 1, delay, error)
+        for listener in list(self._listeners):
+            listener(event)
+        return delay
+    # pylint: enable = too-many-arguments
+
+    @staticmethod
+    def wait(delay:float):
+        """ Waits before a retry. """
+        if delay > 0:
+            sleep(delay)
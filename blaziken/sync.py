@@ -0,0 +1,256 @@
+""" Module with the incremental synchronization of a local directory to a bucket. """
+# Meta imports
+from __future__ import annotations
+from typing import TYPE_CHECKING
+# Built-in imports
+from collections import Counter
+from os import scandir
+from pathlib import Path
+from time import monotonic
+# Project imports
+from blaziken.batch import BatchStats
+from blaziken.batch import imap_unordered
+from blaziken.enums import SyncAction
+from blaziken.exceptions import BlazeError
+from blaziken.listing import Paginator
+from blaziken.utils import file_sha1
+
+if TYPE_CHECKING:
+    # pylint: disable = ungrouped-imports
+    from blaziken.api import BackBlazeB2
+    from blaziken.meta import Json
+    from os import DirEntry
+    from typing import Generator
+    from typing import Optional
+    from typing import Tuple
+    from typing import Union
+
+
+def walk_sorted(directory:Union[str, Path],
+                base:str='') -> Generator[Tuple[str, DirEntry], None, None]:
+    """
+    Walks a directory recursively, yielding its files in the same order the B2 service lists file
+    names (by their UTF-8 bytes, with "/" separating folders). Only the entries of one directory
+    are held in memory at a time. Symbolic links to directories are not followed.
+
+    :param directory: The directory to be walked.
+    :param base: The relative name of the directory, prefixed to the names of its files.
+    :yields: A 2-tuple containing (relative name, directory entry) of each file.
+    """
+    with scandir(directory) as iterator:
+        entries = [(f'{entry.name}/' if entry.is_dir(follow_symlinks=False) else entry.name, entry)
+                   for entry in iterator]
+    entries.sort(key=lambda item: item[0])
+    for key, entry in entries:
+        if key.endswith('/'):
+            yield from walk_sorted(entry.path, f'{base}{key}')
+        elif entry.is_file():
+            yield (f'{base}{key}', entry)
+
+
+class SyncResult:
+    """
+    Result of the synchronization of a single file.
+
+    :ivar action: The SyncAction taken for the file.
+    :ivar name: The name of the file in the backblaze server.
+    :ivar path: The path of the file in the file system, None if it only exists in the bucket.
+    :ivar size: The number of bytes uploaded for the file.
+    :ivar data: The json-encoded response of the action, None if nothing was sent to the server.
+    :ivar error: The error that made the action fail, None if it succeeded.
+    :ivar elapsed: The time taken to synchronize the file, in seconds.
+    """
+
+    def __init__(self, action:SyncAction, name:str, path:Optional[Path]=None, size:int=0,
+                 data:Optional[Json]=None, error:Optional[Exception]=None, elapsed:float=0.0):
+        self.action = action
+        self.name = name
+        self.path = path
+        self.size = size
+        self.data = data
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        return (f'<{self.__class__.__name__}:{self.action.value}:'
+                f'{"ok" if self.ok else "failed"}> {self.name}')
+
+    @property
+    def ok(self) -> bool:  # pylint: disable = invalid-name
+        """ Checks if the file was synchronized successfully. """
+        return self.error is None
+
+
+class SyncStats(BatchStats):
+    """
+    Aggregate statistics of a sync, where "bytes" counts only the uploaded bytes.
+
+    :ivar actions: A Counter with the number of files successfully processed by each SyncAction.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.actions = Counter()
+
+    def add_result(self, result:SyncResult):
+        """ Accounts the result of a synchronized file. """
+        self.add(result.size, result.ok)
+        if result.ok:
+            self.actions[result.action] += 1
+
+
+class Sync:
+    """
+    Synchronizes a local directory to a prefix of a bucket, uploading only new or changed files.
+    Both the local tree and the bucket listing are streamed in name order and merged, so neither
+    side is ever held in memory. A file is up to date when its size matches and either its
+    modification time matches the remote "src_last_modified_millis" or, if it changed, its
+    SHA1 matches the remote "contentSha1". Iterating over the sync runs it with a pool of workers,
+    yielding a SyncResult for each file in completion order. A failure does not abort the sync.
+
+    :ivar stats: The aggregate statistics of the sync, updated as results are yielded.
+
+    :example:
+
+    >>> sync = bucket.sync(Path('photos'), 'backup/photos', on_missing=SyncAction.hide)
+    >>> for result in sync:
+    >>>     if not result.ok:
+    >>>         print(f'Failed to {result.action.value} {result.name}: {result.error}')
+    >>> print(sync.stats.actions)
+
+    """
+
+    MISSING_ACTIONS = (SyncAction.skip, SyncAction.hide, SyncAction.delete)
+
+    # pylint: disable = too-many-arguments
+    def __init__(self, api:BackBlazeB2, bucket_id:str, directory:Union[str, Path], prefix:str='',
+                 workers:int=8, on_missing:SyncAction=SyncAction.skip, checksum:bool=True,
+                 dry_run:bool=False, page_size:int=1000):
+        """
+        :param api: The BackBlazeB2 instance used to list and upload the files.
+        :param bucket_id: The id of the bucket to be synchronized.
+        :param directory: The local directory to be synchronized to the bucket.
+        :param prefix: The virtual folder of the bucket that mirrors the directory.
+        :param workers: The number of files synchronized concurrently.
+        :param on_missing: The action for remote files that no longer exist locally: skip to keep
+                           them, hide to hide them (keeping their versions) or delete to delete
+                           all of their versions.
+        :param checksum: True to compare the SHA1 of files which size matches but modification
+                         time does not, False to upload them right away.
+        :param dry_run: True to only report the actions, without making any changes.
+        :param page_size: The number of remote files listed per request (at most 10000).
+        :raises ValueError: If the number of workers or the missing files action are invalid.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        if on_missing not in self.MISSING_ACTIONS:
+            raise ValueError(f'Invalid action for missing files: {on_missing}')
+        self.stats = SyncStats()
+        self._api = api
+        self._bucket_id = bucket_id
+        self._directory = Path(directory)
+        self._prefix = api.append_filename(prefix, '') if prefix else ''
+        self._workers = workers
+        self._on_missing = on_missing
+        self._checksum = checksum
+        self._dry_run = dry_run
+        self._page_size = page_size
+    # pylint: enable = too-many-arguments
+
+    def __iter__(self) -> Generator[SyncResult, None, None]:
+        self.stats.start()
+        try:
+            for result in imap_unordered(self._sync_file, self._merge(), self._workers):
+                self.stats.add_result(result)
+                yield result
+        finally:
+            self.stats.stop()
+
+    def _remote_files(self) -> Generator[Tuple[str, Json], None, None]:
+        """ Lists the remote files page by page, yielding their names relative to the prefix. """
+        for data in Paginator.files(self._api, self._bucket_id, self._prefix, '', self._page_size):
+            if data.get('action') == 'upload' and data['fileName'].startswith(self._prefix):
+                yield (data['fileName'][len(self._prefix):], data)
+
+    def _merge(self) -> Generator[Tuple[str, Optional[DirEntry], Optional[Json]], None, None]:
+        """
+        Merges the sorted local and remote listings.
+
+        :yields: A 3-tuple containing (relative name, local entry, remote data) of each file, where
+                 the entry or the data is None if the file exists only on the other side.
+        """
+        local_files = walk_sorted(self._directory)
+        remote_files = self._remote_files()
+        local = next(local_files, None)
+        remote = next(remote_files, None)
+        while local is not None or remote is not None:
+            if remote is None or (local is not None and local[0] < remote[0]):
+                yield (local[0], local[1], None)
+                local = next(local_files, None)
+            elif local is None or remote[0] < local[0]:
+                yield (remote[0], None, remote[1])
+                remote = next(remote_files, None)
+            else:
+                yield (local[0], local[1], remote[1])
+                local = next(local_files, None)
+                remote = next(remote_files, None)
+
+    def _is_current(self, entry:DirEntry, data:Json) -> bool:
+        """ Checks if the remote file has the same content as the local file. """
+        stat = entry.stat()
+        if stat.st_size != data.get('contentLength'):
+            return False
+        remote_modified = data.get('fileInfo', {}).get('src_last_modified_millis')
+        if remote_modified is not None and int(remote_modified) == int(stat.st_mtime * 1000):
+            return True
+        remote_sha1 = data.get('contentSha1', 'none')
+        if remote_sha1 == 'none':  # Large files only have the SHA1 their uploader provided
+            remote_sha1 = data.get('fileInfo', {}).get('large_file_sha1', '')
+        if not self._checksum or not remote_sha1:
+            return False
+        with open(entry.path, 'rb') as file_handle:
+            return file_sha1(file_handle) == remote_sha1.replace('unverified:', '')
+
+    def _sync_file(self, name:str, entry:Optional[DirEntry], data:Optional[Json]) -> SyncResult:
+        """ Synchronizes a single file, capturing its error instead of raising it. """
+        started = monotonic()
+        action = self._on_missing if entry is None else SyncAction.upload
+        result = SyncResult(action, f'{self._prefix}{name}', Path(entry.path) if entry else None)
+        try:
+            if entry is not None and data is not None and self._is_current(entry, data):
+                result.action = SyncAction.skip
+            elif not self._dry_run and result.action == SyncAction.upload:
+                result.size = entry.stat().st_size
+                for upload_data, _, _ in self._api.upload_path(result.path, result.name,
+                                                               bucket_id=self._bucket_id):
+                    result.data = upload_data
+            elif not self._dry_run and result.action == SyncAction.hide:
+                result.data = self._api.hide_file(result.name, self._bucket_id)
+            elif not self._dry_run and result.action == SyncAction.delete:
+                result.data = self._delete_versions(data)
+        except (BlazeError, OSError, ValueError) as error:
+            result.data = None
+            result.error = error
+        result.elapsed = monotonic() - started
+        return result
+
+    def _delete_versions(self, data:Json) -> Json:
+        """
+        Deletes every version of the name of a file, including those behind hide markers and the
+        unfinished large files, which are cancelled, so the file does not reappear with previous
+        content.
+
+        :returns: The json-encoded response of the last deletion.
+        """
+        name = data['fileName']
+        # The listing may have other names: those starting with the name and, with a key
+        # restricted to a prefix, every file of the prefix (which replaces the name as prefix)
+        listing = Paginator.versions(self._api, self._bucket_id, name, '', self._page_size,
+                                     prefetch=False)
+        versions = [version for version in listing.items() if version['fileName'] == name]
+        for version in versions or [data]:
+            if version.get('action') == 'start':
+                result = self._api.cancel_large_file(version['fileId'])
+            else:
+                result = self._api.delete_file(version['fileId'], name)
+        return result
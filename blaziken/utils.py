@@ -3,25 +3,43 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 # Built-in imports
+from contextlib import nullcontext
+from codecs import getincrementaldecoder
 from hashlib import sha1
+from json import JSONDecodeError
+from json import JSONDecoder
 from json import loads as json_loads
 from math import ceil
 from pathlib import Path
 from re import match
 from sys import version_info as version
+try:
+    from os import pread
+except ImportError:  # pragma: no cover  # Positional reads are not available on Windows
+    pread = None
+# Third-party imports
+try:
+    from orjson import loads as fast_json_loads
+except ImportError:  # pragma: no cover  # orjson is an optional dependency
+    fast_json_loads = None
 # Project imports
 from blaziken.exceptions import ResponseError
 from blaziken.exceptions import RequestError
 from blaziken.constants import FIVE_GB
 from blaziken.constants import FIVE_MB
 from blaziken.constants import HUNDRED_MB
+from blaziken.constants import MAX_LARGE_FILE_PARTS
 
 if TYPE_CHECKING:
     # pylint: disable = ungrouped-imports
     from requests.models import Response
     from typing import Any
     from typing import BinaryIO
+    from threading import Lock
     from typing import Dict
+    from typing import Generator
+    from typing import Iterable
+    from typing import Optional
     from typing import Tuple
     from typing import Union
 
@@ -45,8 +63,23 @@ def check_response_error(response:Response):
     :param response: The Http response object to be checked for errors.
     :raises RequestError: If the response contains errors.
     """
-    if response.status_code >= 400:
-        raise RequestError(response.text)
+    check_status(response.status_code, response.text)
+
+
+def check_status(status_code:int, text:str):
+    """
+    Checks the status code and body of a Http response for errors.
+
+    :param status_code: The HTTP status code of the response.
+    :param text: The decoded body of the response.
+    :raises RequestError: If the status code indicates an error.
+    """
+    if status_code >= 400:
+        try:
+            code = json_loads(text).get('code', '')
+        except (AttributeError, TypeError, ValueError):  # Not a B2 json-encoded error
+            code = ''
+        raise RequestError(text, status_code, code)
 
 
 def check_b2_errors(data:Dict[str, Any], message:str):
@@ -61,6 +94,21 @@ def check_b2_errors(data:Dict[str, Any], message:str):
         raise ResponseError(message)
 
 
+def json_decode(data:Union[bytes, str]) -> Any:
+    """
+    Decodes a json-encoded response body straight from its bytes, without decoding it to a string
+    first. Uses `orjson <https://github.com/ijl/orjson>`_ when it is installed (with
+    ``pip install blaziken[json]``), which is several times faster than the standard library.
+
+    :param data: The json-encoded (UTF-8) body.
+    :returns: The decoded value.
+    :raises ValueError: If the data is not valid json.
+    """
+    if fast_json_loads is not None:
+        return fast_json_loads(data)
+    return json_loads(data)
+
+
 def python_version_string() -> str:
     """ Gets the python version in the format X.Y.Z. """
     return f'{version.major}.{version.minor}.{version.micro}'
@@ -100,3 +148,262 @@ def upload_parts_count(file_path_or_size:Union[str, Path, int],
         else Path(file_path_or_size).stat().st_size
     parts = ceil(size / part_size)
     return (size, parts, part_size,)
+
+
+def plan_upload_parts(file_path_or_size:Union[str, Path, int], recommended:int=HUNDRED_MB,
+                      minimum:int=FIVE_MB, workers:int=1) -> Tuple[int, int, int]:
+    """
+    Chooses the number and size of the upload parts of a file, trading the number of requests
+    for the parallelism of the upload:
+
+    - Files of at least one recommended part per worker are split in parts of the recommended
+      size, so the requests are as few as the service recommends while all workers are busy.
+    - Smaller files are split in one part per worker, to upload them in parallel, as long as each
+      part has at least a quarter of the recommended size (smaller parts are not worth their
+      extra requests). Files that can't be split are uploaded with a single request.
+    - Parts are made larger if needed to keep the number of parts within the limit (10000).
+
+    All parts have the same size except the last one, which is never much smaller (e.g.: a file
+    slightly larger than the recommended size is split in two halves, not in a part and a tail).
+
+    :param file_path_or_size: The file size, in bytes, or the path to the file in the file system.
+    :param recommended: The recommended part size, in bytes ("recommendedPartSize" of the account
+                        authorization).
+    :param minimum: The minimum part size, in bytes ("absoluteMinimumPartSize" of the account
+                    authorization).
+    :param workers: The number of parts uploaded concurrently.
+    :returns: A 3-tuple containing (total file size, number of parts, part size), sizes in bytes.
+              A file with a single part is uploaded with a single request.
+    :raises ValueError: If the file is too large to be uploaded in parts of at most 5GB.
+    """
+    size = file_path_or_size if isinstance(file_path_or_size, int) \
+        else Path(file_path_or_size).stat().st_size
+    workers = max(workers, 1)
+    if size >= recommended * workers:
+        target = recommended
+    else:
+        target = max(ceil(size / workers), minimum, recommended // 4)
+    parts = min(max(ceil(size / target), 1), max(size // minimum, 1), MAX_LARGE_FILE_PARTS)
+    part_size = max(ceil(size / parts), minimum)
+    if part_size > FIVE_GB:
+        raise ValueError(f'A file of {size} bytes is too large to be uploaded in '
+                         f'{MAX_LARGE_FILE_PARTS} parts of at most 5GB')
+    return (size, max(ceil(size / part_size), 1), part_size)
+
+
+def read_range(file_handle:BinaryIO, offset:int, size:int, lock:Optional[Lock]=None) -> bytes:
+    """
+    Reads a range of bytes from a file without depending on (or changing) its current position,
+    so multiple threads can read different ranges of the same file at the same time.
+    Positional reads are used when the file has a file descriptor and the platform supports them,
+    otherwise the file is seeked and read while holding the lock.
+
+    :param file_handle: A file opened with binary reading mode.
+    :param offset: The absolute position, in bytes, of the start of the range.
+    :param size: The number of bytes to be read. Less bytes are returned if the file ends before.
+    :param lock: A lock shared by all threads reading the file, used when seeking is needed.
+    :returns: The bytes read from the file.
+    """
+    try:
+        descriptor = file_handle.fileno() if pread is not None else None
+    except (AttributeError, OSError, ValueError):  # e.g.: BytesIO has no file descriptor
+        descriptor = None
+    if descriptor is None:
+        with lock if lock is not None else nullcontext():
+            file_handle.seek(offset)
+            return file_handle.read(size)
+    chunks = []
+    while size > 0:
+        data = pread(descriptor, size, offset)
+        if not data:
+            break
+        chunks.append(data)
+        offset += len(data)
+        size -= len(data)
+    return b''.join(chunks)
+
+
+class FileRange:
+    """
+    Read-only, file-like view of a range of bytes of a file.
+    It is used as the body of upload requests, so the data is streamed from the file to the socket
+    in small blocks instead of being loaded in memory. The file is read with positional reads (see
+    :func:`read_range`), thus many ranges of the same file can be read concurrently.
+
+    :ivar offset: The absolute position, in bytes, of the start of the range in the file.
+    :ivar size: The size of the range, in bytes.
+    """
+
+    def __init__(self, file_handle:BinaryIO, offset:int, size:int, lock:Optional[Lock]=None):
+        """
+        :param file_handle: A file opened with binary reading mode.
+        :param offset: The absolute position, in bytes, of the start of the range in the file.
+        :param size: The size of the range, in bytes.
+        :param lock: A lock shared by all threads reading the file, used when seeking is needed.
+        """
+        self.offset = offset
+        self.size = size
+        self._file = file_handle
+        self._lock = lock
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def tell(self) -> int:
+        """ Gets the current position, relative to the start of the range. """
+        return self._position
+
+    def seek(self, position:int, whence:int=0) -> int:
+        """ Moves the current position, relative to the start of the range. """
+        base = (0, self._position, self.size)[whence]
+        self._position = min(max(base + position, 0), self.size)
+        return self._position
+
+    def read(self, size:Optional[int]=-1) -> bytes:
+        """ Reads up to size bytes from the current position (all remaining bytes if negative). """
+        remaining = self.size - self._position
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        if size <= 0:
+            return b''
+        data = read_range(self._file, self.offset + self._position, size, self._lock)
+        self._position += len(data)
+        return data
+
+    def sha1(self, block_size:int=65536) -> str:
+        """
+        Gets the sha1 hash of the range reading block by block, without changing the position.
+
+        :param block_size: The maximum size (in bytes) of each block read from the file.
+        :returns: The sha1 hexdigest of the range.
+        """
+        sha1_hash = sha1()
+        for start in range(0, self.size, block_size):
+            sha1_hash.update(read_range(self._file, self.offset + start,
+                                        min(block_size, self.size - start), self._lock))
+        return sha1_hash.hexdigest()
+
+
+def content_sha1(data:Union[bytes, FileRange]) -> str:
+    """
+    Gets the sha1 hash of the data being uploaded, streaming it if it is a file range.
+
+    :param data: The bytes or the file range being uploaded.
+    :returns: The sha1 hexdigest of the data.
+    """
+    if isinstance(data, FileRange):
+        return data.sha1()
+    return sha1(data).hexdigest()
+
+
+class JsonArrayStream:
+    """
+    Incremental parser of a json object containing an array (such as the "files" array of the
+    file listings), which yields each item of the array as soon as it is received, instead of
+    waiting for the whole body to arrive and be parsed. The other fields of the object (such as
+    "nextFileName") are available in the "fields" attribute once the iteration finishes.
+    Only the unparsed part of the body is kept in memory.
+
+    :ivar key: The key of the array whose items are yielded.
+    :ivar fields: The other fields of the object, filled as they are parsed.
+
+    :example:
+
+    >>> stream = JsonArrayStream(response.iter_content(65536), 'files')
+    >>> for file_data in stream:
+    >>>     print(file_data['fileName'])
+    >>> print(stream.fields['nextFileName'])
+
+    """
+
+    WHITESPACE = ' \t\n\r'
+    # The parsed text is discarded once it reaches this size, so the buffer does not keep growing
+    TRIM_SIZE = 65536
+
+    def __init__(self, chunks:Iterable[bytes], key:str):
+        """
+        :param chunks: The chunks of the json-encoded (UTF-8) body.
+        :param key: The key of the array whose items are yielded.
+        """
+        self.key = key
+        self.fields:Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._decoder = getincrementaldecoder('utf-8')()
+        self._json_decoder = JSONDecoder()
+        self._text = ''
+        self._position = 0
+        self._finished = False
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == self.key:
+                yield from self._array()
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                break
+
+    def _array(self) -> Generator[Any, None, None]:
+        """ Parses the array, yielding its items. """
+        self._expect('[')
+        if self._peek() == ']':
+            self._position += 1
+            return
+        while True:
+            yield self._value()
+            if self._position >= self.TRIM_SIZE:
+                self._text = self._text[self._position:]
+                self._position = 0
+            if self._expect(',]') == ']':
+                break
+
+    def _read(self) -> bool:
+        """ Reads the next chunk of the body, returning False if the body has ended. """
+        if self._finished:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._finished = True
+            self._text += self._decoder.decode(b'', final=True)
+            return False
+        self._text += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """ Skips whitespace and gets the next character, reading more of the body if needed. """
+        while True:
+            while self._position < len(self._text) and \
+                    self._text[self._position] in self.WHITESPACE:
+                self._position += 1
+            if self._position < len(self._text):
+                return self._text[self._position]
+            if not self._read():
+                raise JSONDecodeError('Unexpected end of data', self._text, self._position)
+
+    def _expect(self, characters:str) -> str:
+        """ Consumes the next character, which must be one of the given characters. """
+        character = self._peek()
+        if character not in characters:
+            raise JSONDecodeError(f'Expected one of "{characters}"', self._text, self._position)
+        self._position += 1
+        return character
+
+    def _value(self) -> Any:
+        """ Parses the next value, reading more of the body until the value is complete. """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._text, self._position)
+                # A value ending with the buffer (e.g.: a number) might continue in the next chunk
+                if end < len(self._text) or self._finished:
+                    self._position = end
+                    return value
+            except JSONDecodeError:
+                if self._finished:
+                    raise
+            self._read()
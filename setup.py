@@ -29,6 +29,10 @@ setup(
     description=__description__,
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        'async': ['aiohttp'],
+        'json': ['orjson'],
+    },
     python_requires='>=3.7',
     classifiers=[
         'Development Status :: 4 - Beta',
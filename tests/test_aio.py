@@ -0,0 +1,192 @@
+""" Tests the blaziken.aio package. """
+# Built-in imports
+from hashlib import sha1
+from io import BytesIO
+from json import dumps as json_dumps
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+# Project imports
+from blaziken.aio import AsyncB2Objects
+from blaziken.aio import AsyncBackBlazeB2
+from blaziken.aio import AsyncBucket
+from blaziken.aio import AsyncFile
+from blaziken.aio import AsyncResponse
+from blaziken.constants import FIVE_MB
+from blaziken.enums import BucketType
+from blaziken.enums import FileAction
+from blaziken.exceptions import RequestError
+from blaziken.models import Bucket
+from blaziken.models import File
+from tests.utils import Responses
+
+
+def json_response(data):
+    """ Creates a successful response with a json-encoded body. """
+    return AsyncResponse(200, {}, json_dumps(data).encode('utf8'))
+
+
+class AsyncBackBlazeB2Tests(IsolatedAsyncioTestCase):
+    """ Tests methods of the AsyncBackBlazeB2 class. """
+
+    def setUp(self):
+        """ Sets up an authenticated api with a mocked AsyncHttp instance. """
+        self.http = MagicMock()
+        self.http.get = AsyncMock()
+        self.http.post = AsyncMock()
+        self.api = AsyncBackBlazeB2('account_id', 'app_key', self.http)
+
+    async def test_authenticate__stores_auth_data(self):
+        """ The authentication data is stored and used by the following requests. """
+        self.http.get.return_value = json_response({
+            'apiUrl': 'https://api', 'authorizationToken': 'token',
+            'downloadUrl': 'https://download', 'allowed': {'capabilities': ['listFiles']}})
+        await self.api.authenticate()
+        self.assertTrue(self.api.is_authenticated)
+        self.assertEqual(self.http.get.call_args.kwargs['auth'], ('account_id', 'app_key'))
+        self.http.post.return_value = json_response(Responses.list_files.json)
+        self.assertEqual(await self.api.list_files(bucket_id='bucket_id'),
+                         Responses.list_files.json)
+        self.assertEqual(self.http.post.call_args.args[0],
+                         'https://api/b2api/v2/b2_list_file_names')
+        self.assertEqual(self.http.post.call_args.kwargs['headers']['Authorization'], 'token')
+
+    async def test_api_method__not_authenticated__raises_request_error(self):
+        """ Methods that require authentication fail without making requests. """
+        with self.assertRaises(RequestError):
+            await self.api.list_buckets()
+        self.http.post.assert_not_called()
+
+    async def test_upload__single_part__reuses_upload_url(self):
+        """ Small files are uploaded in a single request with a pooled upload URL. """
+        self.api.auth_token = 'token'
+        self.api.upload_urls.release('bucket_id', {'uploadUrl': 'url', 'authorizationToken': 'tk'})
+        self.http.post.return_value = json_response({'fileId': 'file_id'})
+        data = b'content'
+        results = [result async for result in self.api.upload(BytesIO(data), 'name',
+                                                                file_size=len(data),
+                                                                bucket_id='bucket_id')]
+        self.assertEqual(results, [({'fileId': 'file_id'}, 0, 1)])
+        headers = self.http.post.call_args.kwargs['headers']
+        self.assertEqual(headers['X-Bz-Content-Sha1'], sha1(data).hexdigest())
+        self.assertEqual(len(self.api.upload_urls), 1)
+
+    async def test_upload_large_file__concurrent__finishes_with_sha1s_in_part_order(self):
+        """ Large files are uploaded by concurrent tasks and finished with the ordered SHA1s. """
+        self.api.auth_token = 'token'
+        self.api.set_part_size(FIVE_MB)
+        data = bytes(range(256)) * (FIVE_MB * 2 // 256 + 1)
+        self.api.start_large_file = AsyncMock(return_value={'fileId': 'file_id'})
+        self.api.get_upload_part_url = AsyncMock(
+            return_value={'uploadUrl': 'url', 'authorizationToken': 'tk'})
+        self.api.upload_part = AsyncMock(side_effect=lambda part, url, number, token: {
+            'contentSha1': sha1(part.read()).hexdigest()})
+        self.api.finish_large_file = AsyncMock(return_value={'fileId': 'file_id'})
+        results = [result async for result in self.api.upload_large_file(
+            BytesIO(data), 'name', len(data), 'bucket_id', workers=2)]
+        self.assertEqual(sorted(part for _, part, _ in results[:-1]), [1, 2, 3])
+        self.assertEqual(results[-1], ({'fileId': 'file_id'}, 0, 3))
+        self.api.finish_large_file.assert_called_once_with('file_id', [
+            sha1(data[i:i + FIVE_MB]).hexdigest() for i in range(0, len(data), FIVE_MB)])
+
+    async def test_upload__recommended_part_size__parts_planned_for_workers(self):
+        """ Without a fixed part size, parts are planned as in BackBlazeB2.plan_parts(). """
+        self.http.get.return_value = json_response({
+            'apiUrl': 'https://api', 'authorizationToken': 'token',
+            'downloadUrl': 'https://download', 'recommendedPartSize': FIVE_MB * 4,
+            'absoluteMinimumPartSize': FIVE_MB})
+        await self.api.authenticate()
+        self.api.start_large_file = AsyncMock(return_value={'fileId': 'file_id'})
+        self.api.get_upload_part_url = AsyncMock(
+            return_value={'uploadUrl': 'url', 'authorizationToken': 'tk'})
+        self.api.upload_part = AsyncMock(return_value={'contentSha1': 'sha1'})
+        self.api.finish_large_file = AsyncMock(return_value={'fileId': 'file_id'})
+        self.api.set_upload_workers(4)
+        size = FIVE_MB * 6
+        results = [result async for result in self.api.upload(
+            BytesIO(bytes(size)), 'name', file_size=size, bucket_id='bucket_id')]
+        self.assertEqual(results[-1], ({'fileId': 'file_id'}, 0, 4))
+        self.assertEqual(self.api.plan_parts(size), (size, 4, size // 4))
+
+    async def test_upload_large_file__stream__parts_share_a_lock(self):
+        """ Parts of a stream without positional reads are read while holding a shared lock. """
+        self.api.auth_token = 'token'
+        self.api.set_part_size(FIVE_MB)
+        locks = []
+
+        def upload_part(part, url, number, token):
+            locks.append(part._lock)
+            return {'contentSha1': 'sha1'}
+
+        self.api.start_large_file = AsyncMock(return_value={'fileId': 'file_id'})
+        self.api.get_upload_part_url = AsyncMock(
+            return_value={'uploadUrl': 'url', 'authorizationToken': 'tk'})
+        self.api.upload_part = AsyncMock(side_effect=upload_part)
+        self.api.finish_large_file = AsyncMock(return_value={'fileId': 'file_id'})
+        data = BytesIO(bytes(FIVE_MB * 2 + 1))
+        async for _ in self.api.upload_large_file(data, 'name', FIVE_MB * 2 + 1, 'bucket_id',
+                                                  workers=3):
+            pass
+        self.assertEqual(len(locks), 3)
+        self.assertIsNotNone(locks[0])
+        self.assertTrue(all(lock is locks[0] for lock in locks))
+
+    async def test_download_file__writes_chunks_to_file(self):
+        """ The downloaded chunks are written in order to the file, creating its folder. """
+        async def iter_download(url, chunk_size):
+            for chunk in (b'first ', b'second'):
+                yield chunk
+
+        self.api.iter_download = iter_download
+        with TemporaryDirectory() as folder:
+            save_path = Path(folder) / 'folder' / 'name'
+            await self.api.download_file('url', save_path)
+            self.assertEqual(save_path.read_bytes(), b'first second')
+
+
+class AsyncModelsTests(IsolatedAsyncioTestCase):
+    """ Tests the asynchronous object-oriented models. """
+
+    def setUp(self):
+        """ Sets up a mock of the asynchronous api. """
+        self.mock_api = MagicMock()
+        self.mock_api.list_files = AsyncMock()
+
+    async def test_buckets__lists_async_buckets(self):
+        """ B2Objects lists AsyncBucket instances. """
+        objects = AsyncB2Objects('', '', MagicMock())
+        objects.api.list_buckets = AsyncMock(return_value=Responses.list_buckets.json)
+        for bucket in await objects.buckets():
+            self.assertIsInstance(bucket, AsyncBucket)
+
+    async def test_all_files__pages_through_listing(self):
+        """ all_files yields the files of every page of the listing. """
+        self.mock_api.list_files.side_effect = [
+            {'files': [{'fileName': 'a'}, {'fileName': 'b'}], 'nextFileName': 'c'},
+            {'files': [{'fileName': 'c'}], 'nextFileName': None},
+        ]
+        bucket = AsyncBucket(self.mock_api, {'bucketId': 'bucket_id'})
+        files = [bucket_file async for bucket_file in bucket.all_files(max_files=2)]
+        self.assertEqual([bucket_file.name for bucket_file in files], ['a', 'b', 'c'])
+        self.assertTrue(all(isinstance(bucket_file, AsyncFile) for bucket_file in files))
+        self.mock_api.list_files.assert_called_with('', None, 2, 'c', 'bucket_id')
+
+    def test_models__wrap_sync_models_without_their_sync_methods(self):
+        """ The asyncio models decode the fields like the synchronous ones, but are not them. """
+        bucket = AsyncBucket(self.mock_api, {'bucketId': 'bucket_id', 'bucketName': 'name',
+                                             'bucketType': 'allPublic'})
+        self.assertNotIsInstance(bucket, Bucket)
+        self.assertEqual((bucket.id, bucket.name, bucket.type),
+                         ('bucket_id', 'name', BucketType.public))
+        b2file = AsyncFile(self.mock_api, bucket, {'fileId': 'id', 'fileName': 'a/b.txt',
+                                                   'action': 'upload'})
+        self.assertNotIsInstance(b2file, File)
+        self.assertEqual((b2file.base_name, b2file.extension, b2file.action, b2file.is_folder),
+                         ('b.txt', '.txt', FileAction.upload, False))
+        b2file.name = 'c'
+        self.assertEqual(b2file.data['fileName'], 'c')
+        for name in ('sync', 'upload_many', 'delete_prefix', 'pages'):
+            self.assertFalse(hasattr(bucket, name))
+        self.assertFalse(hasattr(b2file, 'copy_to'))
@@ -1,8 +1,24 @@
+# Built-in imports
+from gc import collect
+from hashlib import sha1
+from io import BytesIO
+from os import utime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
 from unittest import TestCase
 from unittest.mock import patch
 from unittest.mock import MagicMock
-
+# Project imports
 from blaziken import BackBlazeB2
+from blaziken.batch import UploadBatch
+from blaziken.constants import FIVE_MB
+from blaziken.constants import ONE_MB
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.exceptions import ResponseError
+from blaziken.retry import RetryPolicy
+from blaziken.utils import FileRange
 
 
 class ApiTests(TestCase):
@@ -29,3 +45,537 @@ class KeyTests(TestCase):
         self.mock_api = MagicMock()
         self.mock_blaze.return_value = self.mock_api
         self.addCleanup(self.patcher.stop)
+
+
+class UploadLargeFileTests(TestCase):
+    """ Tests the multi-part upload of large files. """
+
+    def setUp(self):
+        """ Sets up an authenticated api with the B2 endpoints of large uploads mocked. """
+        self.api = BackBlazeB2('account_id', 'app_key', http=MagicMock())
+        self.api.auth_token = 'auth_token'
+        self.api.set_part_size(FIVE_MB)
+        self.api.set_retry_policy(RetryPolicy(base_delay=0))
+        self.data = bytes(range(256)) * (FIVE_MB * 3 // 256 + 1)  # 4 parts, the last is small
+        for method in ('start_large_file', 'get_upload_part_url', 'upload_part',
+                       'finish_large_file', 'cancel_large_file'):
+            patcher = patch.object(self.api, method)
+            setattr(self, method, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.start_large_file.return_value = {'fileId': 'file_id'}
+        self.get_upload_part_url.return_value = {'uploadUrl': 'url', 'authorizationToken': 'tk'}
+        self.upload_part.side_effect = lambda data, url, number, token: {
+            'contentSha1': sha1(data.read()).hexdigest(), 'partNumber': number}
+        self.finish_large_file.return_value = {'fileId': 'file_id'}
+
+    def expected_sha1s(self):
+        """ Gets the SHA1 of each part of the uploaded data. """
+        return [sha1(self.data[i:i + FIVE_MB]).hexdigest()
+                for i in range(0, len(self.data), FIVE_MB)]
+
+    def test_upload_large_file__sequential__uploads_parts_in_order(self):
+        """ A single worker uploads the parts in order reusing a single upload part URL. """
+        results = list(self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data)))
+        self.assertEqual([part for _, part, _ in results], [1, 2, 3, 4, 0])
+        self.assertTrue(all(total == 4 for _, _, total in results))
+        self.get_upload_part_url.assert_called_once_with('file_id')
+        self.finish_large_file.assert_called_once_with('file_id', self.expected_sha1s())
+
+    def test_upload_large_file__concurrent__finishes_with_sha1s_in_part_order(self):
+        """ Multiple workers upload every part once and the SHA1s are sent in part order. """
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'large'
+            path.write_bytes(self.data)
+            results = list(self.api.upload_large_file(path, 'name', workers=3))
+        self.assertEqual(sorted(part for _, part, _ in results[:-1]), [1, 2, 3, 4])
+        self.assertEqual(results[-1][1], 0)
+        self.assertLessEqual(self.get_upload_part_url.call_count, 3)
+        self.finish_large_file.assert_called_once_with('file_id', self.expected_sha1s())
+
+    def test_upload_large_file__part_fails__cancels_upload(self):
+        """ A failure in a worker is raised and the large file is cancelled. """
+        self.upload_part.side_effect = RequestError('part failed')
+        generator = self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data),
+                                               workers=2)
+        self.assertRaises(RequestError, list, generator)
+        self.cancel_large_file.assert_called_once_with('file_id')
+        self.finish_large_file.assert_not_called()
+
+    def test_upload_large_file__transient_part_failure__retries_part_with_new_url(self):
+        """ A part that fails with a transient error is uploaded again with a new part URL. """
+        upload_part = self.upload_part.side_effect
+        failures = [RequestError('unavailable', 503, 'service_unavailable')]
+
+        def fail_once(data, url, number, token):
+            if number == 3 and failures:
+                raise failures.pop()
+            return upload_part(data, url, number, token)
+
+        self.upload_part.side_effect = fail_once
+        results = list(self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data)))
+        self.assertEqual([part for _, part, _ in results], [1, 2, 3, 4, 0])
+        self.assertEqual([call.args[2] for call in self.upload_part.call_args_list],
+                         [1, 2, 3, 3, 4])
+        self.assertEqual(self.get_upload_part_url.call_count, 2)
+        self.cancel_large_file.assert_not_called()
+        self.finish_large_file.assert_called_once_with('file_id', self.expected_sha1s())
+
+    def test_upload_large_file__part_retries_exhausted__cancels_upload(self):
+        """ The large file is cancelled once a part has exhausted its retries. """
+        self.api.set_retry_policy(RetryPolicy(max_retries=2, base_delay=0))
+        self.upload_part.side_effect = RequestError('unavailable', 503, 'service_unavailable')
+        generator = self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data))
+        self.assertRaises(RequestError, list, generator)
+        self.assertEqual(self.upload_part.call_count, 3)
+        self.cancel_large_file.assert_called_once_with('file_id')
+
+    def test_upload_large_file__resume__uploads_only_missing_parts(self):
+        """ Stored parts which SHA1 matches are kept, the others are uploaded again. """
+        sha1s = self.expected_sha1s()
+        unfinished = {'fileId': 'old_id', 'fileName': 'name',
+                      'fileInfo': {'src_content_length': str(len(self.data))}}
+        stored = [{'partNumber': 1, 'contentLength': FIVE_MB, 'contentSha1': sha1s[0]},
+                  {'partNumber': 2, 'contentLength': FIVE_MB, 'contentSha1': 'corrupted'}]
+        with patch.object(self.api, 'list_unfinished_large_files') as list_unfinished, \
+                patch.object(self.api, 'list_parts') as list_parts:
+            list_unfinished.return_value = {'files': [
+                {'fileId': 'other_id', 'fileName': 'other', 'fileInfo': {}}, unfinished]}
+            list_parts.return_value = {'parts': stored, 'nextPartNumber': None}
+            results = list(self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data),
+                                                      resume=True))
+        self.start_large_file.assert_not_called()
+        self.assertEqual([part for _, part, _ in results], [1, 2, 3, 4, 0])
+        self.assertEqual([call.args[2] for call in self.upload_part.call_args_list], [2, 3, 4])
+        self.get_upload_part_url.assert_called_once_with('old_id')
+        self.finish_large_file.assert_called_once_with('old_id', sha1s)
+
+    def test_upload_large_file__resume__keeps_part_size_of_stored_parts(self):
+        """ The parts of a resumed upload have the size of its stored first part. """
+        part_size = 6 * ONE_MB
+        unfinished = {'fileId': 'old_id', 'fileName': 'name',
+                      'fileInfo': {'src_content_length': str(len(self.data))}}
+        stored = [{'partNumber': 1, 'contentLength': part_size,
+                   'contentSha1': sha1(self.data[:part_size]).hexdigest()}]
+        with patch.object(self.api, 'list_unfinished_large_files') as list_unfinished, \
+                patch.object(self.api, 'list_parts') as list_parts:
+            list_unfinished.return_value = {'files': [unfinished]}
+            list_parts.return_value = {'parts': stored, 'nextPartNumber': None}
+            results = list(self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data),
+                                                      resume=True))
+        self.assertEqual([part for _, part, _ in results], [1, 2, 3, 0])
+        self.assertEqual([len(call.args[0]) for call in self.upload_part.call_args_list],
+                         [part_size, len(self.data) - 2 * part_size])
+        self.finish_large_file.assert_called_once_with(
+            'old_id', [sha1(self.data[i:i + part_size]).hexdigest()
+                       for i in range(0, len(self.data), part_size)])
+
+    def test_upload_large_file__resume_parts_do_not_fit__starts_over(self):
+        """ An unfinished file with parts beyond those of the file is cancelled and replaced. """
+        unfinished = {'fileId': 'old_id', 'fileName': 'name',
+                      'fileInfo': {'src_content_length': str(len(self.data))}}
+        stored = [{'partNumber': number, 'contentLength': FIVE_MB, 'contentSha1': 'sha1'}
+                  for number in range(1, 6)]
+        with patch.object(self.api, 'list_unfinished_large_files') as list_unfinished, \
+                patch.object(self.api, 'list_parts') as list_parts:
+            list_unfinished.return_value = {'files': [unfinished]}
+            list_parts.return_value = {'parts': stored, 'nextPartNumber': None}
+            results = list(self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data),
+                                                      resume=True))
+        self.cancel_large_file.assert_called_once_with('old_id')
+        self.start_large_file.assert_called_once_with(
+            None, 'name', file_info={'src_content_length': str(len(self.data))})
+        self.assertEqual([part for _, part, _ in results], [1, 2, 3, 4, 0])
+        self.finish_large_file.assert_called_once_with('file_id', self.expected_sha1s())
+
+    def test_find_unfinished_large_file__no_file_info__not_found(self):
+        """ Unfinished files are only reused when the file info identifies the local file. """
+        with patch.object(self.api, 'list_unfinished_large_files') as list_unfinished:
+            list_unfinished.return_value = {'files': [{'fileId': 'old_id', 'fileName': 'name'}]}
+            self.assertIsNone(self.api.find_unfinished_large_file('name', 'bucket_id'))
+            self.assertIsNone(self.api.find_unfinished_large_file(
+                'name', 'bucket_id', {'src_content_length': '1'}))
+            list_unfinished.assert_called_once()
+
+    def test_upload_large_file__resume_fails__keeps_unfinished_file(self):
+        """ A resumable upload that fails is not cancelled, so it can be resumed later. """
+        self.upload_part.side_effect = RequestError('part failed')
+        with patch.object(self.api, 'list_unfinished_large_files') as list_unfinished:
+            list_unfinished.return_value = {'files': []}
+            generator = self.api.upload_large_file(BytesIO(self.data), 'name', len(self.data),
+                                                   resume=True)
+            self.assertRaises(RequestError, list, generator)
+        self.start_large_file.assert_called_once()
+        self.cancel_large_file.assert_not_called()
+
+    def test_cancel_unfinished_large_files__cancels_only_stale_files(self):
+        """ Unfinished files of every page started before the threshold are cancelled. """
+        now = time() * 1000
+        with patch.object(self.api, 'list_unfinished_large_files') as list_unfinished:
+            list_unfinished.side_effect = [
+                {'files': [{'fileId': 'old', 'uploadTimestamp': now - 7200000}],
+                 'nextFileId': 'recent'},
+                {'files': [{'fileId': 'recent', 'uploadTimestamp': now - 60000}],
+                 'nextFileId': None},
+            ]
+            self.api.cancel_unfinished_large_files(3600, 'bucket_id')
+        self.assertEqual(list_unfinished.call_args.args, ('bucket_id', '', 'recent', 100))
+        self.cancel_large_file.assert_called_once_with('old')
+
+
+class CopyTests(TestCase):
+    """ Tests the server-side copy of files. """
+
+    def setUp(self):
+        """ Sets up an authenticated api with a mocked Http instance. """
+        self.http = MagicMock()
+        self.http.post.return_value.content = b'{"fileId": "copy_id", "fileName": "copy"}'
+        self.api = BackBlazeB2('account_id', 'app_key', http=self.http)
+        self.api.api_url = 'https://api'
+        self.api.auth_token = 'auth_token'
+        self.api.set_part_size(FIVE_MB)
+
+    def test_copy_file__content_type__replaces_metadata(self):
+        """ A content type replaces the metadata of the source, which is kept otherwise. """
+        self.api.copy_file('source_id', 'copy', 'bucket_id', (0, 99), 'text/plain', {'a': 'b'})
+        params = self.http.post.call_args.kwargs['json']
+        self.assertEqual(params, {'sourceFileId': 'source_id', 'fileName': 'copy',
+                                  'destinationBucketId': 'bucket_id', 'range': 'bytes=0-99',
+                                  'metadataDirective': 'REPLACE', 'contentType': 'text/plain',
+                                  'fileInfo': {'a': 'b'}})
+        self.api.copy_file('source_id', 'copy')
+        params = self.http.post.call_args.kwargs['json']
+        self.assertEqual(params, {'sourceFileId': 'source_id', 'fileName': 'copy'})
+
+    def test_copy__small_file__single_request(self):
+        """ A file up to the part size is copied with b2_copy_file. """
+        data = self.api.copy({'fileId': 'source_id', 'contentLength': FIVE_MB}, 'copy')
+        self.assertEqual(data['fileId'], 'copy_id')
+        self.http.post.assert_called_once()
+        self.assertTrue(self.http.post.call_args.args[0].endswith('/b2_copy_file'))
+
+    def test_copy__large_file__copies_ranges_as_parts(self):
+        """ A larger file is copied in parts, keeping its metadata and the parts order. """
+        source = {'fileId': 'source_id', 'contentLength': FIVE_MB * 2 + 1, 'bucketId': 'bucket',
+                  'contentType': 'text/plain', 'fileInfo': {'a': 'b'}, 'contentSha1': 'sha1'}
+        with patch.object(self.api, 'start_large_file') as start_large_file, \
+                patch.object(self.api, 'copy_part') as copy_part, \
+                patch.object(self.api, 'finish_large_file') as finish_large_file:
+            start_large_file.return_value = {'fileId': 'large_id'}
+            copy_part.side_effect = lambda source_id, file_id, number, byte_range: {
+                'contentSha1': f'sha1-{number}'}
+            self.api.copy(source, 'copy', workers=2)
+        start_large_file.assert_called_once_with('bucket', 'copy', 'text/plain',
+                                                 {'a': 'b', 'large_file_sha1': 'sha1'})
+        ranges = sorted(call.args[2:] for call in copy_part.call_args_list)
+        self.assertEqual(ranges, [(1, (0, FIVE_MB - 1)), (2, (FIVE_MB, FIVE_MB * 2 - 1)),
+                                  (3, (FIVE_MB * 2, FIVE_MB * 2))])
+        finish_large_file.assert_called_once_with('large_id', ['sha1-1', 'sha1-2', 'sha1-3'])
+
+    def test_copy__part_fails__cancels_large_file(self):
+        """ A failure copying a part cancels the large file. """
+        with patch.object(self.api, 'start_large_file') as start_large_file, \
+                patch.object(self.api, 'copy_part') as copy_part, \
+                patch.object(self.api, 'cancel_large_file') as cancel_large_file:
+            start_large_file.return_value = {'fileId': 'large_id'}
+            copy_part.side_effect = RequestError('part failed')
+            self.assertRaises(RequestError, self.api.copy,
+                              {'fileId': 'source_id', 'contentLength': FIVE_MB * 2}, 'copy')
+        cancel_large_file.assert_called_once_with('large_id')
+
+
+class AuthTests(TestCase):
+    """ Tests the renewal of expired authorization tokens. """
+
+    def setUp(self):
+        """ Sets up an api authenticated with a mocked Http instance. """
+        self.http = MagicMock()
+        self.http.get.return_value.content = b'{"apiUrl": "https://api", "downloadUrl": ' \
+                                             b'"https://download", "authorizationToken": "new"}'
+        self.timer_patcher = patch('blaziken.api.Timer')
+        self.mock_timer = self.timer_patcher.start()
+        self.addCleanup(self.timer_patcher.stop)
+        self.api = BackBlazeB2('account_id', 'app_key', http=self.http)
+        self.api.api_url = 'https://api'
+        self.api.auth_token = 'old'
+
+    def test_post__expired_token__reauthenticates_and_replays(self):
+        """ A request failing with an expired token is made again with a new token. """
+        response = MagicMock(content=b'{"buckets": []}')
+        self.http.post.side_effect = [RequestError('expired', 401, 'expired_auth_token'), response]
+        self.assertEqual(self.api.list_buckets(), {'buckets': []})
+        self.http.get.assert_called_once()
+        tokens = [call.kwargs['headers']['Authorization'] for call in self.http.post.call_args_list]
+        self.assertEqual(tokens, ['old', 'new'])
+
+    def test_authenticate__part_sizes__used_to_plan_parts(self):
+        """ The part sizes recommended at authentication are used unless a size is set. """
+        self.http.get.return_value.content = b'{"apiUrl": "https://api", "downloadUrl": ' \
+            b'"https://download", "authorizationToken": "new", ' \
+            b'"recommendedPartSize": 20971520, "absoluteMinimumPartSize": 5242880}'
+        self.api.authenticate()
+        self.assertEqual(self.api.part_size, 20 * ONE_MB)
+        self.assertEqual(self.api.plan_parts(50 * ONE_MB)[1:], (3, 50 * ONE_MB // 3 + 1))
+        self.api.set_part_size(FIVE_MB)
+        self.assertEqual(self.api.plan_parts(50 * ONE_MB)[1:], (10, FIVE_MB))
+        self.api.set_part_size(0)
+        self.assertEqual(self.api.part_size, 20 * ONE_MB)
+
+    def test_post__other_unauthorized_error__raised(self):
+        """ Only expired tokens are renewed, other errors are raised without retrying. """
+        self.http.post.side_effect = RequestError('unauthorized', 401, 'unauthorized')
+        self.assertRaises(RequestError, self.api.list_buckets)
+        self.http.get.assert_not_called()
+        self.assertEqual(self.http.post.call_count, 1)
+
+    def test_authenticate__schedules_background_refresh(self):
+        """ Authenticating schedules a refresh of the token, replaced by the next one. """
+        self.api.set_auth_refresh(60)
+        self.assertEqual(self.mock_timer.call_args.args[0], 60)
+        self.api.authenticate()
+        self.mock_timer.return_value.cancel.assert_called()
+        self.assertEqual(self.mock_timer.call_count, 2)
+        self.assertTrue(self.mock_timer.return_value.daemon)
+
+    def test_refresh_auth__garbage_collected__timer_cancelled(self):
+        """ The refresh timer is cancelled when the api is garbage-collected without closing it. """
+        self.api.set_auth_refresh(60)
+        self.mock_timer.return_value.cancel.reset_mock()
+        del self.api
+        collect()
+        self.mock_timer.return_value.cancel.assert_called_once()
+
+    def test_refresh_auth__failure__tried_again_later(self):
+        """ A failed background refresh is scheduled again, keeping the current token. """
+        self.http.get.side_effect = InternetError('offline')
+        self.api.refresh_auth()
+        self.assertEqual(self.api.auth_token, 'old')
+        self.assertEqual(self.mock_timer.call_args.args[0], BackBlazeB2.AUTH_REFRESH_RETRY)
+
+    def test_refresh_auth__limited_key__keeps_bucket_and_prefix(self):
+        """ Renewing the token of a limited key keeps the selected bucket and prefix. """
+        self.http.get.return_value.content = b'{"apiUrl": "https://api", "downloadUrl": ' \
+            b'"https://download", "authorizationToken": "first", "allowed": {' \
+            b'"bucketId": "bucket_id", "bucketName": "bucket", "namePrefix": "a/"}}'
+        self.api.authenticate()
+        self.api.set_prefix('a/b/')
+        self.api._bucket_id = 'other_id'
+        self.http.get.return_value.content = self.http.get.return_value.content.replace(
+            b'"first"', b'"second"')
+        self.api.refresh_auth()
+        self.assertEqual(self.api.auth_token, 'second')
+        self.assertEqual(self.api.prefix(), 'a/b/')
+        self.assertEqual(self.api.bucket_id, 'other_id')
+        self.assertEqual(self.api.bucket_name, 'bucket')
+
+
+class UploadFileTests(TestCase):
+    """ Tests the single-part uploads. """
+
+    def setUp(self):
+        """ Sets up an authenticated api with a mocked Http instance. """
+        self.http = MagicMock()
+        self.http.post.return_value.content = b'{"fileId": "file_id"}'
+        self.api = BackBlazeB2('account_id', 'app_key', http=self.http)
+        self.api.auth_token = 'auth_token'
+        self.api.upload_urls.release('bucket_id', {'uploadUrl': 'url', 'authorizationToken': 'tk'})
+
+    def test_upload_io__streams_file_range(self):
+        """ The file is sent as a stream with its length and sha1 computed beforehand. """
+        data = b'0123456789'
+        results = list(self.api.upload_io(BytesIO(data), len(data), 'name', 'bucket_id'))
+        self.assertEqual(results, [({'fileId': 'file_id'}, 0, 1)])
+        kwargs = self.http.post.call_args.kwargs
+        self.assertIsInstance(kwargs['data'], FileRange)
+        self.assertEqual(kwargs['data'].read(), data)
+        self.assertEqual(kwargs['headers']['Content-Length'], str(len(data)))
+        self.assertEqual(kwargs['headers']['X-Bz-Content-Sha1'], sha1(data).hexdigest())
+
+    def test_upload_many__other_bucket__selected_bucket_unchanged(self):
+        """ Uploading through the pool to another bucket does not select that bucket. """
+        self.api._bucket_id = 'bucket_a'
+        self.http.post.return_value.content = b'{"fileId": "file_id", "bucketId": "bucket_b", ' \
+                                              b'"uploadUrl": "url_b", "authorizationToken": "tk"}'
+        with TemporaryDirectory() as directory:
+            (Path(directory) / 'file').write_bytes(b'content')
+            results = list(UploadBatch(self.api, 'bucket_b', directory, workers=2))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(self.api.bucket_id, 'bucket_a')
+        self.assertEqual(self.http.post.call_args_list[0].kwargs['json'], {'bucketId': 'bucket_b'})
+
+    def test_upload_path__sends_modification_time(self):
+        """ The file's modification time is stored in its src_last_modified_millis info. """
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'file'
+            path.write_bytes(b'content')
+            utime(path, (1000.5, 1000.5))
+            list(self.api.upload_path(path, bucket_id='bucket_id'))
+        headers = self.http.post.call_args.kwargs['headers']
+        self.assertEqual(headers['X-Bz-Info-src_last_modified_millis'], '1000500')
+
+    def test_upload_io__transient_error__retried_with_new_url(self):
+        """ A failed upload is retried from the start with a new upload URL. """
+        self.http.retry = RetryPolicy(base_delay=0)
+        response = MagicMock(content=b'{"fileId": "file_id"}')
+        self.http.post.side_effect = [RequestError('busy', 503, 'service_unavailable'), response]
+        new_url = {'uploadUrl': 'new_url', 'authorizationToken': 'new_tk'}
+        with patch.object(self.api, 'request_upload_url', return_value=new_url):
+            results = list(self.api.upload_io(BytesIO(b'data'), 4, 'name', 'bucket_id'))
+        self.assertEqual(results, [({'fileId': 'file_id'}, 0, 1)])
+        urls = [call.args[0] for call in self.http.post.call_args_list]
+        self.assertEqual(urls, ['url', 'new_url'])
+        self.assertEqual(self.http.post.call_args.kwargs['data'].read(), b'data')
+        self.assertEqual(self.http.retry.retries, 1)
+
+    def test_upload_io__permanent_error__not_retried(self):
+        """ Errors that are not transient are raised right away. """
+        self.http.retry = RetryPolicy(base_delay=0)
+        self.http.post.side_effect = RequestError('bad', 400, 'bad_request')
+        with self.assertRaises(RequestError):
+            list(self.api.upload_io(BytesIO(b'data'), 4, 'name', 'bucket_id'))
+        self.assertEqual(self.http.post.call_count, 1)
+
+    def test_list_files__empty_delimiter__lists_recursively_without_prefix(self):
+        """ An empty delimiter is not sent and no prefix is used when none is set. """
+        self.http.post.return_value.content = b'{"files": []}'
+        self.api.list_files(delimiter='', bucket_id='bucket_id')
+        params = self.http.post.call_args.kwargs['json']
+        self.assertEqual(params['prefix'], '')
+        self.assertNotIn('delimiter', params)
+
+    def test_list_file_versions__cursor__sends_start_id(self):
+        """ Version listings are recursive by default and resume from a name and id. """
+        self.http.post.return_value.content = b'{"files": []}'
+        self.api.list_file_versions('p/', '', 10, 'p/b', 'b1', 'bucket_id')
+        params = self.http.post.call_args.kwargs['json']
+        self.assertTrue(self.http.post.call_args.args[0].endswith('/b2_list_file_versions'))
+        self.assertEqual((params['startFileName'], params['startFileId']), ('p/b', 'b1'))
+        self.assertNotIn('delimiter', params)
+
+    def test_iter_list_files__streamed_response__yields_files(self):
+        """ The files of a streamed listing are yielded and the next name is kept in fields. """
+        response = self.http.post.return_value.__enter__.return_value
+        response.iter_content.return_value = iter([b'{"files": [{"fileName": "a"}', b'], ',
+                                                   b'"nextFileName": "b"}'])
+        stream = self.api.iter_list_files(delimiter='', bucket_id='bucket_id')
+        self.assertEqual(list(stream), [{'fileName': 'a'}])
+        self.assertEqual(stream.fields, {'nextFileName': 'b'})
+        self.assertTrue(self.http.post.call_args.kwargs['stream'])
+
+
+class DownloadFileTests(TestCase):
+    """ Tests the streamed downloads. """
+
+    def setUp(self):
+        """ Sets up an authenticated api with a mocked Http instance. """
+        self.http = MagicMock()
+        self.api = BackBlazeB2('account_id', 'app_key', http=self.http)
+        self.api.auth_token = 'auth_token'
+        self.api.set_retry_policy(RetryPolicy(base_delay=0))
+        self.response = self.http.get.return_value.__enter__.return_value
+        self.response.iter_content.return_value = iter([b'abc', b'def'])
+
+    def test_download_file__writes_chunks(self):
+        """ The file content is requested as a stream and written chunk by chunk. """
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'sub' / 'file'
+            self.api.download_file('url', path, 3)
+            self.assertEqual(path.read_bytes(), b'abcdef')
+        self.assertTrue(self.http.get.call_args.kwargs['stream'])
+        self.response.iter_content.assert_called_with(3)
+
+    def test_iter_download__yields_chunks(self):
+        """ The content is yielded in chunks without writing it anywhere. """
+        self.assertEqual(list(self.api.iter_download('url', 3)), [b'abc', b'def'])
+
+    def test_download_file__concurrent__ranges_written_at_offsets(self):
+        """ Large files are downloaded in ranges that are written at their own offsets. """
+        data = bytes(range(256)) * 4
+        failures = {'remaining': 1}
+
+        def iter_download(_, __, start, end, retry=True):
+            if start == 512 and failures['remaining']:  # Fails once midway through the range
+                failures['remaining'] -= 1
+                yield data[start:start + 10]
+                raise InternetError('connection lost')
+            yield data[start:end + 1]
+
+        with patch.object(self.api, 'download_size', return_value=len(data)), \
+                patch.object(self.api, 'iter_download', side_effect=iter_download) as mock_iter, \
+                TemporaryDirectory() as directory:
+            path = Path(directory) / 'file'
+            self.api.download_file('url', path, workers=3, range_size=256)
+            self.assertEqual(path.read_bytes(), data)
+        self.assertEqual(mock_iter.call_count, 5)
+        mock_iter.assert_any_call('url', ONE_MB, 522, 767, retry=False)
+
+    def test_download_file__concurrent_failure__no_partial_file_left(self):
+        """ A failed ranged download leaves neither the destination nor a temporary file. """
+        def iter_download(_, __, start, end, retry=True):
+            if start == 256:
+                raise InternetError('connection lost')
+            yield bytes(end - start + 1)
+
+        with patch.object(self.api, 'download_size', return_value=1024), \
+                patch.object(self.api, 'iter_download', side_effect=iter_download), \
+                TemporaryDirectory() as directory:
+            path = Path(directory) / 'file'
+            self.assertRaises(InternetError, self.api.download_file, 'url', path, workers=2,
+                              range_size=256)
+            self.assertEqual(list(path.parent.iterdir()), [])
+
+    def test_download_file__range_not_found__not_retried(self):
+        """ Ranges failing with errors that are not transient are not requested again. """
+        error = RequestError('not found', 404, 'not_found')
+        with patch.object(self.api, 'download_size', return_value=1024), \
+                patch.object(self.api, 'iter_download', side_effect=error) as mock_iter, \
+                TemporaryDirectory() as directory:
+            self.assertRaises(RequestError, self.api.download_file, 'url',
+                              Path(directory) / 'file', workers=1, range_size=512)
+        self.assertEqual(mock_iter.call_count, 1)
+
+    def test_download_file__resume__continues_interrupted_download(self):
+        """ An interrupted resumable download only requests the missing ranges later. """
+        data = bytes(range(256)) * 4
+        headers = {'Content-Length': str(len(data)), 'X-Bz-File-Id': 'file_id',
+                   'X-Bz-Content-Sha1': sha1(data).hexdigest()}
+        failures = {'remaining': 1}
+
+        def iter_download(_, __, start, end, retry=True):
+            if start == 512 and failures['remaining']:  # Fails midway through the range
+                failures['remaining'] -= 1
+                yield data[start:start + 10]
+                raise InternetError('connection lost')
+            yield data[start:end + 1]
+
+        with patch.object(self.api, '_download_headers', return_value=headers), \
+                patch.object(self.api, 'iter_download', side_effect=iter_download) as mock_iter, \
+                TemporaryDirectory() as directory:
+            path = Path(directory) / 'file'
+            self.assertRaises(InternetError, self.api.download_file, 'url', path, workers=1,
+                              range_size=256, range_attempts=1, resume=True)
+            self.assertFalse(path.exists())
+            self.assertTrue(path.with_name('file.download.json').exists())
+            mock_iter.reset_mock()
+            self.api.download_file('url', path, workers=2, range_size=256, resume=True)
+            self.assertEqual(path.read_bytes(), data)
+            self.assertEqual(sorted(path.parent.iterdir()), [path])
+        requested = sorted(call.args[2:] for call in mock_iter.call_args_list)
+        self.assertEqual(requested[0], (522, 767))  # The written ranges are not requested again
+        self.assertTrue(all(start >= 768 for start, _ in requested[1:]))
+
+    def test_download_file__resume_sha1_mismatch__raises_response_error(self):
+        """ A resumable download which SHA1 does not match is discarded. """
+        headers = {'Content-Length': '6', 'X-Bz-Content-Sha1': 'none',
+                   'X-Bz-Info-large_file_sha1': sha1(b'other!').hexdigest()}
+        with patch.object(self.api, '_download_headers', return_value=headers), \
+                patch.object(self.api, 'iter_download', return_value=iter([b'abcdef'])), \
+                TemporaryDirectory() as directory:
+            path = Path(directory) / 'file'
+            self.assertRaises(ResponseError, self.api.download_file, 'url', path, resume=True)
+            self.assertEqual(list(path.parent.iterdir()), [])
+
+    def test_iter_download__range_ignored__raises_request_error(self):
+        """ A range request answered with the whole file must not be used. """
+        self.response.status_code = 200
+        self.assertRaises(RequestError, list, self.api.iter_download('url', 3, 10, 20))
+        self.assertEqual(self.http.get.call_args.kwargs['headers']['Range'], 'bytes=10-20')
@@ -0,0 +1,131 @@
+""" Tests the blaziken.batch package. """
+# Built-in imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Lock
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+# Project imports
+from blaziken.batch import DeleteBatch
+from blaziken.batch import UploadBatch
+from blaziken.exceptions import RequestError
+
+
+class UploadBatchTests(TestCase):
+    """ Tests the concurrent uploads of the UploadBatch class. """
+
+    def setUp(self):
+        """ Sets up a directory tree and an api mock that fails to upload one of its files. """
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.directory = Path(self.temp_dir.name)
+        (self.directory / 'sub').mkdir()
+        for name in ('a.txt', 'b.txt', 'sub/c.txt', 'sub/fail.txt'):
+            (self.directory / name).write_bytes(b'12345')
+        self.mock_api = MagicMock()
+        self.mock_api.append_filename.side_effect = lambda prefix, name: f'{prefix}/{name}'
+
+        def upload_path(path, name, bucket_id):
+            if path.name == 'fail.txt':
+                raise RequestError('failed')
+            return iter([({'fileName': name, 'bucketId': bucket_id}, 0, 1)])
+
+        self.mock_api.upload_path.side_effect = upload_path
+
+    def test_iter__directory__uploads_tree_and_reports_failures(self):
+        """ All files are uploaded with their relative paths and a failure does not abort. """
+        batch = UploadBatch(self.mock_api, 'bucket_id', self.directory, 'backup', workers=3)
+        results = {result.name: result for result in batch}
+        self.assertEqual(set(results), {'backup/a.txt', 'backup/b.txt', 'backup/sub/c.txt',
+                                        'backup/sub/fail.txt'})
+        self.assertFalse(results['backup/sub/fail.txt'].ok)
+        self.assertIsInstance(results['backup/sub/fail.txt'].error, RequestError)
+        self.assertEqual(results['backup/a.txt'].data,
+                         {'fileName': 'backup/a.txt', 'bucketId': 'bucket_id'})
+        self.assertEqual((batch.stats.files, batch.stats.failed, batch.stats.bytes), (3, 1, 15))
+        self.assertGreater(batch.stats.elapsed, 0)
+
+    def test_iter__paths__uploaded_with_base_names(self):
+        """ Files given as a list of paths are uploaded using their base names. """
+        paths = [self.directory / 'a.txt', self.directory / 'sub' / 'c.txt']
+        names = sorted(result.name for result in UploadBatch(self.mock_api, 'bucket_id', paths))
+        self.assertEqual(names, ['a.txt', 'c.txt'])
+
+    def test_init__invalid_workers__raises_value_error(self):
+        """ At least one worker is required. """
+        self.assertRaises(ValueError, UploadBatch, self.mock_api, 'bucket_id', [], workers=0)
+
+
+class DeleteBatchTests(TestCase):
+    """ Tests the concurrent deletions of the DeleteBatch class. """
+
+    def setUp(self):
+        """ Sets up an api mock with 2 pages of versions, one of which fails to be deleted. """
+        self.mock_api = MagicMock()
+        self.mock_api.list_file_versions.side_effect = \
+            lambda prefix, delimiter, page_size, name, file_id, bucket_id: {
+                ('', ''): {'files': [
+                    {'fileName': 'p/a', 'fileId': 'a2', 'action': 'upload', 'contentLength': 5},
+                    {'fileName': 'p/a', 'fileId': 'a1', 'action': 'hide', 'contentLength': 0},
+                ], 'nextFileName': 'p/b', 'nextFileId': 'b1'},
+                ('p/b', 'b1'): {'files': [
+                    {'fileName': 'p/b', 'fileId': 'b1', 'action': 'upload', 'contentLength': 7},
+                    {'fileName': 'p/c', 'fileId': 'c1', 'action': 'start', 'contentLength': 0},
+                    {'fileName': 'p/d', 'fileId': 'd1', 'action': 'upload', 'contentLength': 9},
+                ], 'nextFileName': None, 'nextFileId': None}}[(name, file_id)]
+
+        def delete_file(file_id, name):
+            if file_id == 'b1':
+                raise RequestError('gone', 400, 'file_not_present')
+            if file_id == 'd1':
+                raise RequestError('busy', 503, 'service_unavailable')
+            return {'fileId': file_id, 'fileName': name}
+
+        self.mock_api.delete_file.side_effect = delete_file
+
+    def test_prefix__deletes_all_versions_and_reports_failures(self):
+        """ Every version is deleted, large files cancelled and failures do not abort. """
+        batch = DeleteBatch.prefix(self.mock_api, 'bucket_id', 'p/', workers=3, page_size=2,
+                                   throttle_delay=0, max_throttles=2)
+        results = {result.file_id: result for result in batch}
+        self.assertEqual(set(results), {'a2', 'a1', 'b1', 'c1', 'd1'})
+        self.assertTrue(results['b1'].ok)  # Already deleted
+        self.assertIsNone(results['b1'].data)
+        self.assertFalse(results['d1'].ok)
+        self.mock_api.cancel_large_file.assert_called_once_with('c1')
+        self.assertEqual((batch.stats.files, batch.stats.failed, batch.stats.bytes), (4, 1, 12))
+        self.assertEqual(batch.throttled, 2)
+
+    def test_iter__burst_of_rejections__pauses_instead_of_failing(self):
+        """ Deletions rejected by a burst of 503s pause the batch and are made again. """
+        rejections = {'remaining': 6}
+        lock = Lock()
+
+        def delete_file(file_id, name):
+            with lock:
+                if rejections['remaining']:
+                    rejections['remaining'] -= 1
+                    raise RequestError('busy', 503, 'service_unavailable')
+            return {'fileId': file_id, 'fileName': name}
+
+        self.mock_api.delete_file.side_effect = delete_file
+        files = [{'fileName': f'p/{index}', 'fileId': str(index)} for index in range(8)]
+        with patch('blaziken.batch.sleep') as mock_sleep:
+            batch = DeleteBatch(self.mock_api, 'bucket_id', files, workers=4, throttle_delay=0.5)
+            results = list(batch)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(batch.stats.files, 8)
+        self.assertEqual(batch.throttled, 6)
+        self.assertEqual(self.mock_api.delete_file.call_count, 14)
+        self.assertTrue(mock_sleep.called)
+
+    def test_prefix__hide__hides_visible_names(self):
+        """ Hiding lists the visible names and hides them instead of deleting versions. """
+        self.mock_api.list_files.return_value = {'files': [
+            {'fileName': 'p/a', 'action': 'upload'}, {'fileName': 'p/b', 'action': 'hide'},
+        ], 'nextFileName': None}
+        results = list(DeleteBatch.prefix(self.mock_api, 'bucket_id', 'p/', hide=True))
+        self.assertEqual([result.name for result in results], ['p/a'])
+        self.mock_api.hide_file.assert_called_once_with('p/a', 'bucket_id')
+        self.mock_api.delete_file.assert_not_called()
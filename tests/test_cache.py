@@ -0,0 +1,176 @@
+""" Tests the blaziken.cache package. """
+# Built-in imports
+from os import stat
+from stat import S_IMODE
+from tempfile import TemporaryDirectory
+from time import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+# Project imports
+from blaziken import BackBlazeB2
+from blaziken.cache import AuthCache
+from blaziken.cache import DownloadAuthCache
+from blaziken.cache import ListingCache
+
+
+class ListingCacheTests(TestCase):
+    """ Tests the expiration, eviction and invalidation of the ListingCache class. """
+
+    def test_get__expired_entry__counts_miss(self):
+        """ Listings are served until their TTL expires. """
+        cache = ListingCache(ttl=10)
+        with patch('blaziken.cache.monotonic', return_value=100):
+            cache.put(('bucket', 'a/', '/', 100, ''), {'files': []})
+            self.assertEqual(cache.get(('bucket', 'a/', '/', 100, '')), {'files': []})
+        with patch('blaziken.cache.monotonic', return_value=111):
+            self.assertIsNone(cache.get(('bucket', 'a/', '/', 100, '')))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 0))
+
+    def test_put__full__evicts_least_recently_used(self):
+        """ The least-recently-used listing is evicted when the cache is full. """
+        cache = ListingCache(max_entries=2)
+        cache.put(('bucket', 'a', '', 100, ''), {})
+        cache.put(('bucket', 'b', '', 100, ''), {})
+        cache.get(('bucket', 'a', '', 100, ''))
+        cache.put(('bucket', 'c', '', 100, ''), {})
+        self.assertIsNotNone(cache.get(('bucket', 'a', '', 100, '')))
+        self.assertIsNone(cache.get(('bucket', 'b', '', 100, '')))
+
+    def test_invalidate__removes_listings_matching_file(self):
+        """ Only the listings of the file's bucket which prefix matches the file are removed. """
+        cache = ListingCache()
+        for key in (('bucket', '', '', 100, ''), ('bucket', 'a/', '/', 100, ''),
+                    ('bucket', 'b/', '/', 100, ''), ('other', 'a/', '/', 100, '')):
+            cache.put(key, {})
+        cache.invalidate('a/file', 'bucket')
+        self.assertIsNone(cache.get(('bucket', '', '', 100, '')))
+        self.assertIsNone(cache.get(('bucket', 'a/', '/', 100, '')))
+        self.assertIsNotNone(cache.get(('bucket', 'b/', '/', 100, '')))
+        self.assertIsNotNone(cache.get(('other', 'a/', '/', 100, '')))
+
+
+class ApiListingCacheTests(TestCase):
+    """ Tests the use of the listing cache by BackBlazeB2. """
+
+    def setUp(self):
+        """ Sets up an authenticated api with a listing cache and a mocked Http instance. """
+        self.http = MagicMock()
+        self.http.post.return_value.content = b'{"files": [], "nextFileName": null}'
+        self.api = BackBlazeB2('account_id', 'app_key', http=self.http)
+        self.api.auth_token = 'auth_token'
+        self.api.set_list_cache(ListingCache())
+
+    def test_list_files__cached__no_request_made(self):
+        """ Repeated listings are served from the cache. """
+        self.api.list_files('a/', '/', 100, bucket_id='bucket_id')
+        self.api.list_files('a/', '/', 100, bucket_id='bucket_id')
+        self.assertEqual(self.http.post.call_count, 1)
+        self.assertEqual((self.api.list_cache.hits, self.api.list_cache.misses), (1, 1))
+
+    def test_delete_file__invalidates_listing(self):
+        """ Deleting a file through the api invalidates the listings that contain it. """
+        self.api.list_files('a/', '/', 100, bucket_id='bucket_id')
+        self.http.post.return_value.content = b'{"fileId": "id", "fileName": "a/file"}'
+        self.api.delete_file('id', 'a/file')
+        self.http.post.return_value.content = b'{"files": [], "nextFileName": null}'
+        self.api.list_files('a/', '/', 100, bucket_id='bucket_id')
+        self.assertEqual(self.http.post.call_count, 3)
+
+
+class DownloadAuthCacheTests(TestCase):
+    """ Tests methods of the DownloadAuthCache class and its use by the api. """
+
+    def test_get__broader_prefix_valid_long_enough__reused(self):
+        """ Tokens of broader prefixes are reused, if allowed, while valid for long enough. """
+        cache = DownloadAuthCache(min_remaining=0.5)
+        with patch('blaziken.cache.monotonic', return_value=0):
+            cache.put('bucket', 'photos/', 'folder_token', 100)
+            cache.put('bucket', '', 'bucket_token', 60)
+            cache.put('other', 'photos/cat.jpg', 'other_token', 1000)
+            self.assertEqual(cache.get('bucket', 'photos/cat.jpg', 100, True), 'folder_token')
+            self.assertEqual(cache.get('bucket', 'docs/a.txt', 100, True), 'bucket_token')
+            self.assertIsNone(cache.get('bucket', 'docs/a.txt', 200, True))  # Not valid for 100s
+        with patch('blaziken.cache.monotonic', return_value=70):
+            self.assertIsNone(cache.get('bucket', 'photos/cat.jpg', 100, True))
+            self.assertEqual(cache.get('bucket', 'photos/cat.jpg', 50, True), 'folder_token')
+        self.assertEqual((cache.hits, cache.misses), (3, 2))
+
+    def test_get__broader_prefix_not_allowed__not_reused(self):
+        """ Only the token of the same prefix is used unless broader prefixes are allowed. """
+        cache = DownloadAuthCache()
+        cache.put('bucket', '', 'bucket_token', 3600)
+        cache.put('bucket', 'photos/', 'folder_token', 3600)
+        self.assertIsNone(cache.get('bucket', 'photos/cat.jpg', 60))
+        self.assertEqual(cache.get('bucket', 'photos/', 60), 'folder_token')
+
+    def test_api_download_urls__one_token_per_folder(self):
+        """ Signing many URLs requests a single token per folder, and one per root file. """
+        http = MagicMock()
+        http.post.return_value.content = b'{"authorizationToken": "token"}'
+        api = BackBlazeB2('account_id', 'app_key', http=http)
+        api.auth_token = 'auth_token'
+        api.download_url = 'https://download'
+        self.assertIsNone(api.download_auth_cache)
+        api.set_download_auth_cache(DownloadAuthCache())
+        urls = api.download_urls(['a/1', 'a/2', 'b/1', 'c', 'd'], 3600, 'bucket', 'bucket_id')
+        self.assertEqual(urls[0], 'https://download/file/bucket/a/1?Authorization=token')
+        prefixes = [call.kwargs['json']['fileNamePrefix'] for call in http.post.call_args_list]
+        self.assertEqual(prefixes, ['a/', 'b/', 'c', 'd'])
+        api.get_download_auth('a/3', 3600, 'bucket_id')
+        self.assertEqual(http.post.call_count, 5)  # The folder token is not used for a file
+        api.get_download_auth('a/4', 3600, 'bucket_id', allow_broader=True)
+        self.assertEqual(http.post.call_count, 5)
+
+
+class AuthCacheTests(TestCase):
+    """ Tests methods of the AuthCache class and its use by the api. """
+
+    def setUp(self):
+        """ Sets up a cache in a temporary directory. """
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = AuthCache(directory.name, ttl=60)
+        self.data = {'apiUrl': 'https://api', 'downloadUrl': 'https://download',
+                     'authorizationToken': 'cached', 'allowed': {'capabilities': ['listFiles']}}
+
+    def test_get__keyed_by_key_and_secret(self):
+        """ Authorizations are only found with the same key id and secret. """
+        self.cache.put('key_id', 'secret', self.data, created=1000.0)
+        self.assertIsNone(self.cache.get('key_id', 'secret'))  # Expired
+        self.cache.put('key_id', 'secret', self.data)
+        data, created = self.cache.get('key_id', 'secret')
+        self.assertEqual(data, self.data)
+        self.assertAlmostEqual(created, time(), delta=5)
+        self.assertIsNone(self.cache.get('key_id', 'other secret'))
+        self.assertIsNone(self.cache.get('other_key_id', 'secret'))
+        path = self.cache._path('key_id', 'secret')  # pylint: disable = protected-access
+        self.assertEqual(S_IMODE(stat(path).st_mode), 0o600)
+        self.assertNotIn('secret', path.name)
+        self.cache.remove('key_id', 'secret')
+        self.assertIsNone(self.cache.get('key_id', 'secret'))
+
+    def test_authenticate__cached__starts_without_request(self):
+        """ An api with a cached authorization does not authenticate with the service. """
+        self.cache.put('key_id', 'secret', self.data)
+        http = MagicMock()
+        api = BackBlazeB2('key_id', 'secret', http=http, auth_cache=self.cache)
+        api.set_auth_refresh(0)
+        api.authenticate()
+        http.get.assert_not_called()
+        self.assertEqual((api.api_url, api.auth_token), ('https://api', 'cached'))
+        self.assertEqual(api.capabilities, ['listFiles'])
+
+    def test_authenticate__stale_token__renewed_and_cached(self):
+        """ An authorization with the token being replaced is requested again and cached. """
+        self.cache.put('key_id', 'secret', self.data)
+        http = MagicMock()
+        http.get.return_value.content = b'{"apiUrl": "https://api", "downloadUrl": "https://d", ' \
+                                        b'"authorizationToken": "renewed"}'
+        api = BackBlazeB2('key_id', 'secret', http=http, auth_cache=self.cache)
+        api.set_auth_refresh(0)
+        api.auth_token = 'cached'
+        api.authenticate()
+        http.get.assert_called_once()
+        self.assertEqual(api.auth_token, 'renewed')
+        self.assertEqual(self.cache.get('key_id', 'secret')[0]['authorizationToken'], 'renewed')
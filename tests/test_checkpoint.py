@@ -0,0 +1,57 @@
+""" Tests the blaziken.checkpoint package. """
+# Built-in imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+# Project imports
+from blaziken.checkpoint import DownloadCheckpoint
+
+
+class DownloadCheckpointTests(TestCase):
+    """ Tests the recording, saving and loading of the ranges of a DownloadCheckpoint. """
+
+    identity = {'fileId': 'file_id', 'size': 100, 'sha1': 'sha1'}
+
+    def test_add__adjacent_ranges__merged(self):
+        """ Written ranges are joined when they overlap or are adjacent. """
+        checkpoint = DownloadCheckpoint('checkpoint.json', self.identity, interval=3600)
+        for start, end in ((50, 59), (0, 9), (10, 19), (55, 69), (20, 19)):
+            checkpoint.add(start, end)
+        self.assertEqual(checkpoint.ranges, [(0, 19), (50, 69)])
+        self.assertEqual(checkpoint.completed, 40)
+        self.assertEqual(checkpoint.missing(100), [(20, 49), (70, 99)])
+
+    def test_load__same_identity__restores_ranges(self):
+        """ A saved checkpoint is only loaded for the same file. """
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'checkpoint.json'
+            checkpoint = DownloadCheckpoint(path, self.identity, interval=0)
+            checkpoint.add(0, 9)
+            self.assertEqual(DownloadCheckpoint.load(path, self.identity).ranges, [(0, 9)])
+            changed = dict(self.identity, sha1='other')
+            self.assertEqual(DownloadCheckpoint.load(path, changed).ranges, [])
+            checkpoint.remove()
+            self.assertFalse(path.exists())
+            self.assertEqual(DownloadCheckpoint.load(path, self.identity).ranges, [])
+
+    def test_add__within_interval__not_saved(self):
+        """ The checkpoint file is only written once the interval has elapsed, or on save. """
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'checkpoint.json'
+            checkpoint = DownloadCheckpoint(path, self.identity, interval=3600)
+            checkpoint.add(0, 9)
+            self.assertFalse(path.exists())
+            checkpoint.save()
+            self.assertEqual(DownloadCheckpoint.load(path, self.identity).ranges, [(0, 9)])
+
+    def test_save__synced_before_replacing_file(self):
+        """ The new checkpoint file is synced to the disk before it replaces the previous one. """
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'checkpoint.json'
+            checkpoint = DownloadCheckpoint(path, self.identity, [(0, 9)])
+            with patch('blaziken.checkpoint.fsync') as mock_fsync, \
+                    patch('blaziken.checkpoint.replace') as mock_replace:
+                mock_replace.side_effect = lambda *_: mock_fsync.assert_called_once()
+                checkpoint.save()
+            mock_replace.assert_called_once()
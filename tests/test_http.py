@@ -0,0 +1,126 @@
+""" Tests the blaziken.http package. """
+# Built-in imports
+from io import BytesIO
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+# Third-party imports
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout as RequestsConnectTimeout
+# Project imports
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.http import Http
+from blaziken.retry import RetryPolicy
+
+
+# pylint: disable = protected-access  # In tests its ok accessing private members
+class HttpTests(TestCase):
+    """ Tests methods and properties of the Http class. """
+
+    def setUp(self):
+        """ Sets up the Session mock used to make the requests. """
+        self.patcher = patch('blaziken.http.Session')
+        self.mock_session_class = self.patcher.start()
+        self.mock_session = MagicMock()
+        self.mock_session.headers = {}
+        self.mock_session_class.return_value = self.mock_session
+        self.addCleanup(self.patcher.stop)
+        sleep_patcher = patch('blaziken.retry.sleep')
+        self.mock_sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    # region Http.session tests
+    def test_session__created_once_and_reused(self):
+        """ All requests must go through the same session, so connections are reused. """
+        self.mock_session.request.return_value.status_code = 200
+        http = Http()
+        http.get('https://api.example.com/a')
+        http.post('https://api.example.com/b')
+        http.get('https://download.example.com/c')
+        self.mock_session_class.assert_called_once()
+        self.assertEqual(self.mock_session.request.call_count, 3)
+
+    def test_session__mounts_configured_pools(self):
+        """ The pool settings must be used by the adapters mounted in the session. """
+        with patch('blaziken.http.HTTPAdapter') as mock_adapter:
+            http = Http(pool_connections=3, pool_maxsize=7, pool_block=True)
+            http.session  # pylint: disable = pointless-statement
+        mock_adapter.assert_called_with(pool_connections=3, pool_maxsize=7, pool_block=True)
+        mounted = [call.args[0] for call in self.mock_session.mount.call_args_list]
+        self.assertEqual(mounted, ['https://', 'http://'])
+
+    def test_session__keep_alive_disabled__closes_connections(self):
+        """ Disabling keep-alive must send the 'Connection: close' header. """
+        self.assertNotIn('Connection', Http().session.headers)
+        self.assertEqual(Http(keep_alive=False).session.headers['Connection'], 'close')
+
+    def test_close__session_closed_and_recreated_on_demand(self):
+        """ Closing releases the pooled connections and a new session is created afterwards. """
+        http = Http()
+        http.session  # pylint: disable = pointless-statement
+        http.close()
+        self.mock_session.close.assert_called_once()
+        self.assertIsNone(http._session)
+        http.session  # pylint: disable = pointless-statement
+        self.assertEqual(self.mock_session_class.call_count, 2)
+    # endregion
+
+    # region Http._do_request() tests
+    def test_do_request__default_timeout_used(self):
+        """ The default timeout must be sent unless another one is specified. """
+        self.mock_session.request.return_value.status_code = 200
+        http = Http(timeout=3.0)
+        http.get('url')
+        self.mock_session.request.assert_called_with('GET', 'url', timeout=3.0)
+        http.post('url', timeout=None)
+        self.mock_session.request.assert_called_with('POST', 'url', timeout=None)
+
+    def test_do_request__connection_error__raises_internet_error(self):
+        """ Connection problems must be raised as InternetError. """
+        self.mock_session.request.side_effect = RequestsConnectionError
+        self.assertRaises(InternetError, Http().get, 'url')
+
+    def test_do_request__error_status__raises_request_error(self):
+        """ Responses with error status codes must be raised as RequestError. """
+        self.mock_session.request.return_value.status_code = 400
+        self.mock_session.request.return_value.text = '{}'
+        self.assertRaises(RequestError, Http().post, 'url')
+
+    def test_do_request__busy_status__retried_after_retry_after(self):
+        """ Requests rejected as busy are retried after the time asked by the server. """
+        busy = MagicMock(status_code=503, text='{"code": "service_unavailable"}',
+                         headers={'Retry-After': '2'})
+        success = MagicMock(status_code=200)
+        self.mock_session.request.side_effect = [busy, success]
+        http = Http()
+        self.assertIs(http.post('https://api.example.com/b2api/v2/b2_hide_file'), success)
+        self.mock_sleep.assert_called_once_with(2.0)
+        self.assertEqual(http.retry.retries, 1)
+
+    def test_do_request__connection_error__retried_only_if_idempotent(self):
+        """ Requests that may have been processed are only retried by idempotent endpoints. """
+        self.mock_session.request.side_effect = RequestsConnectionError
+        http = Http(retry=RetryPolicy(max_retries=2))
+        self.assertRaises(InternetError, http.post, 'https://api.example.com/b2_hide_file')
+        self.assertEqual(self.mock_session.request.call_count, 1)
+        self.assertRaises(InternetError, http.post, 'https://api.example.com/b2_list_file_names')
+        self.assertEqual(self.mock_session.request.call_count, 4)
+
+    def test_do_request__body_rewound_before_retry(self):
+        """ Seekable bodies are sent again from their start. """
+        body = BytesIO(b'data')
+        self.mock_session.request.side_effect = [RequestsConnectTimeout, MagicMock(status_code=200)]
+        Http().post('https://api.example.com/b2_list_file_names', data=body)
+        self.assertEqual(body.tell(), 0)
+        self.assertEqual(self.mock_session.request.call_count, 2)
+
+    def test_do_request__retry_disabled__made_once(self):
+        """ Requests of callers that retry them on their own are not retried by the Http. """
+        self.mock_session.request.return_value = MagicMock(
+            status_code=503, text='{"code": "service_unavailable"}', headers={})
+        self.assertRaises(RequestError, Http().get, 'https://download.example.com/file/b/name',
+                          retry=False)
+        self.assertEqual(self.mock_session.request.call_count, 1)
+        self.assertNotIn('retry', self.mock_session.request.call_args.kwargs)
+    # endregion
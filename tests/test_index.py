@@ -0,0 +1,69 @@
+""" Tests the blaziken.index package. """
+# Built-in imports
+from unittest import TestCase
+from unittest.mock import MagicMock
+# Project imports
+from blaziken import BackBlazeB2
+from blaziken.index import BucketIndex
+
+
+def file_data(name, size=1, file_id=''):
+    """ Creates the json-encoded data of a file, as returned by the B2 service. """
+    return {'fileName': name, 'fileId': file_id or f'id_{name}', 'contentLength': size,
+            'contentSha1': 'sha1', 'action': 'upload', 'bucketId': 'bucket_id'}
+
+
+class BucketIndexTests(TestCase):
+    """ Tests the lookups and updates of the BucketIndex class. """
+
+    def setUp(self):
+        """ Sets up an in-memory index attached to an api with a mocked Http instance. """
+        self.http = MagicMock()
+        self.api = BackBlazeB2('account_id', 'app_key', http=self.http)
+        self.api.auth_token = 'auth_token'
+        self.api.list_files = MagicMock(side_effect=[
+            {'files': [file_data('a/1', 10), file_data('a/2', 20)], 'nextFileName': 'a/3'},
+            {'files': [file_data('a/3', 30)], 'nextFileName': None},
+        ])
+        self.index = BucketIndex(':memory:', 'bucket_id', self.api)
+        self.addCleanup(self.index.close)
+
+    def test_refresh__indexes_listed_files(self):
+        """ Refreshed files can be looked up by name, id and prefix and aggregated. """
+        self.assertEqual(self.index.refresh('a/', 2), 3)
+        self.assertEqual(self.index.get('a/2'), file_data('a/2', 20))
+        self.assertEqual(self.index.get_by_id('id_a/3')['fileName'], 'a/3')
+        self.assertIn('a/1', self.index)
+        self.assertNotIn('a/4', self.index)
+        self.assertEqual([data['fileName'] for data in self.index.files('a/', 2)], ['a/1', 'a/2'])
+        self.assertEqual(self.index.summary('a/'), (3, 60))
+        self.assertIsNotNone(self.index.refreshed_at('a/'))
+
+    def test_refresh__removes_files_no_longer_listed(self):
+        """ A refresh replaces the files of the prefix, keeping files of other prefixes. """
+        self.index.file_changed(file_data('a/0'), False)
+        self.index.file_changed(file_data('b/0'), False)
+        self.index.refresh('a/', 2)
+        self.assertEqual([data['fileName'] for data in self.index.files()],
+                         ['a/1', 'a/2', 'a/3', 'b/0'])
+
+    def test_file_changed__api_changes__update_index(self):
+        """ Uploads, hides and deletes made through the api update the index in place. """
+        self.http.post.return_value.content = b'{"fileId": "id_c", "fileName": "c", ' \
+                                              b'"action": "upload", "bucketId": "bucket_id"}'
+        self.api.upload_file(b'data', 'url', 'token', 'c')
+        self.assertTrue(self.index.exists('c'))
+        self.http.post.return_value.content = b'{"fileId": "id_c", "fileName": "c"}'
+        self.api.delete_file('id_c', 'c')
+        self.assertFalse(self.index.exists('c'))
+        self.index.close()
+        self.assertEqual(self.api._file_listeners, [])  # pylint: disable = protected-access
+
+    def test_file_changed__copies_and_hides__update_index(self):
+        """ Copied files are indexed, hidden files are removed and other changes are ignored. """
+        self.index.file_changed(dict(file_data('c'), action='copy'), False)
+        self.assertTrue(self.index.exists('c'))
+        self.index.file_changed(dict(file_data('c', file_id='id_start'), action='start'), False)
+        self.assertEqual(self.index.get('c')['fileId'], 'id_c')
+        self.index.file_changed(dict(file_data('c', file_id='id_hide'), action='hide'), False)
+        self.assertFalse(self.index.exists('c'))
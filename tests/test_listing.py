@@ -0,0 +1,109 @@
+""" Tests the blaziken.listing package. """
+# Built-in imports
+from unittest import TestCase
+from unittest.mock import MagicMock
+# Project imports
+from blaziken.exceptions import RequestError
+from blaziken.listing import Paginator
+from blaziken.listing import ParallelListing
+from blaziken.listing import name_midpoint
+
+
+class NameMidpointTests(TestCase):
+    """ Tests the name_midpoint function. """
+
+    def test_name_midpoint__between_bounds(self):
+        """ The midpoint is strictly between its bounds, also for adjacent or unbounded ones. """
+        for low, high in (('', 'b'), ('a', 'c'), ('ab', 'b'), ('a', 'ab'), ('az', None),
+                          ('photos/001', 'photos/999'), ('\x7f', None)):
+            middle = name_midpoint(low, high)
+            self.assertLess(low, middle)
+            if high is not None:
+                self.assertLess(middle, high)
+
+    def test_name_midpoint__no_name_between__returns_none(self):
+        """ There is no name between a name and itself followed by the first valid character. """
+        self.assertIsNone(name_midpoint('a', 'a\x1f'))
+
+
+class PaginatorTests(TestCase):
+    """ Tests the cursor-based pagination of the Paginator class. """
+
+    def setUp(self):
+        """ Sets up an api mock with a listing of 3 pages. """
+        self.mock_api = MagicMock()
+        self.mock_api.list_keys.side_effect = lambda account_id, page_size, cursor: {
+            '': {'keys': [1, 2], 'nextApplicationKeyId': 'k3'},
+            'k3': {'keys': [3, 4], 'nextApplicationKeyId': 'k5'},
+            'k5': {'keys': [5], 'nextApplicationKeyId': None}}[cursor]
+
+    def test_pages__yields_pages_with_next_cursors(self):
+        """ Each page is yielded with the cursor where the following page starts. """
+        for prefetch in (True, False):
+            paginator = Paginator.keys(self.mock_api, 'account_id', 2, prefetch)
+            self.assertEqual(list(paginator.pages()),
+                             [([1, 2], 'k3'), ([3, 4], 'k5'), ([5], None)])
+
+    def test_items__cursor__resumes_listing(self):
+        """ A listing can be resumed from a cursor, with no state kept in the paginator. """
+        paginator = Paginator.keys(self.mock_api, 'account_id', 2)
+        first = paginator.items()
+        self.assertEqual(next(first), 1)
+        self.assertEqual(list(paginator.items('k3')), [3, 4, 5])
+        self.assertEqual(list(first), [2, 3, 4, 5])
+
+
+class ParallelListingTests(TestCase):
+    """ Tests the concurrent listing of the ParallelListing class. """
+
+    def setUp(self):
+        """ Sets up an api mock that lists the names of a bucket like the B2 service. """
+        self.names = sorted([f'flat{i:03}' for i in range(150)] + [
+            f'dir{i}/file{j:02}' for i in range(3) for j in range(40)] + ['dir', 'dir-1'])
+        self.mock_api = MagicMock()
+        self.mock_api.list_files.side_effect = self.list_files
+
+    def list_files(self, prefix, delimiter, max_files, start_name, bucket_id):
+        """ Lists the names in order, grouping them in folders if a delimiter is given. """
+        files = []
+        for name in self.names:
+            if not name.startswith(prefix) or name < start_name:
+                continue
+            if delimiter and delimiter in name[len(prefix):]:
+                folder = name[:name.index(delimiter, len(prefix)) + 1]
+                if files and files[-1]['fileName'] == folder:
+                    continue
+                files.append({'fileName': folder, 'action': 'folder'})
+            else:
+                files.append({'fileName': name, 'action': 'upload'})
+            if len(files) > max_files:
+                return {'files': files[:max_files], 'nextFileName': files[max_files]['fileName']}
+        return {'files': files, 'nextFileName': None}
+
+    def test_iter__ordered__yields_all_files_in_name_order(self):
+        """ Shards are split as workers become idle and their files are merged in order. """
+        listing = ParallelListing(self.mock_api, 'bucket_id', workers=4, ordered=True,
+                                  page_size=10, queue_size=1)
+        self.assertEqual([data['fileName'] for data in listing], self.names)
+
+    def test_iter__unordered__yields_every_file_once(self):
+        """ Files are yielded as they are listed, each of them exactly once. """
+        listing = ParallelListing(self.mock_api, 'bucket_id', workers=4, page_size=10,
+                                  delimiter=None)
+        names = [data['fileName'] for data in listing]
+        self.assertEqual(sorted(names), self.names)
+
+    def test_iter__prefix__lists_only_prefixed_files(self):
+        """ The shards are restricted to the names starting with the prefix. """
+        listing = ParallelListing(self.mock_api, 'bucket_id', 'dir1/', workers=3, ordered=True,
+                                  page_size=5)
+        self.assertEqual([data['fileName'] for data in listing],
+                         [name for name in self.names if name.startswith('dir1/')])
+
+    def test_iter__listing_fails__raises_error(self):
+        """ An error listing a shard is raised by the iterator. """
+        self.mock_api.list_files.side_effect = [
+            {'files': [{'fileName': 'a/', 'action': 'folder'}]}, RequestError('failed'),
+            RequestError('failed')]
+        self.assertRaises(RequestError, list, ParallelListing(self.mock_api, 'bucket_id',
+                                                              workers=2))
@@ -6,17 +6,22 @@ from typing import TYPE_CHECKING
 from pathlib import Path
 from unittest import TestCase
 from unittest.mock import ANY
+from unittest.mock import call
 from unittest.mock import MagicMock
 from unittest.mock import patch
 # Project imports
 from blaziken import B2Objects
+from blaziken.constants import HUNDRED_MB
+from blaziken.constants import ONE_MB
 from blaziken.enums import BucketType
 from blaziken.enums import FileAction
 from blaziken.exceptions import BucketError
 from blaziken.exceptions import FileError
+from blaziken.exceptions import RequestError
 from blaziken.exceptions import ResponseError
 from blaziken.models import Bucket
 from blaziken.models import File
+from blaziken.models import FilePage
 from tests.utils import Responses
 
 if TYPE_CHECKING:
@@ -43,7 +48,7 @@ class B2ObjectsTests(TestCase):
         account_id ='account_id'
         app_key = 'app_key'
         B2Objects(account_id, app_key)
-        self.mock_blaze.assert_called_with(account_id, app_key, False, None)
+        self.mock_blaze.assert_called_with(account_id, app_key, False, None, None)
     # endregion
 
     # region B2Objects.properties tests
@@ -207,25 +212,22 @@ class BucketTests(TestCase):
 
     # region Bucket.all_files() tests
     def test_all_files__files_available__lists_files(self):
-        """ Tests that all_files calls both files() and more_files() and yields File objects. """
-        bucket = Bucket(self.mock_api, {})
+        """ Tests that all_files pages through the listing and yields File objects. """
+        bucket = Bucket(self.mock_api, {'bucketId': 'bucket_id'})
         names = ('f1', 'f2', 'f3',)
-        f1 = File(self.mock_api, bucket, {'fileName': names[0]})
-        f2 = File(self.mock_api, bucket, {'fileName': names[1]})
-        f3 = File(self.mock_api, bucket, {'fileName': names[2]})
-        bucket.files = MagicMock()
-        bucket.more_files = MagicMock()
-        bucket.files.return_value = [f1]
-        bucket.more_files.return_value = [[f2], [f3]]
-        args = ('prefix', 'delimiter', 0, 'start_name',)
-        index = 0
-        for index, bucket_file in enumerate(bucket.all_files(*args)):
+        self.mock_api.list_files.side_effect = [
+            {'files': [{'fileName': names[0]}, {'fileName': names[1]}], 'nextFileName': 'f3'},
+            {'files': [{'fileName': names[2]}], 'nextFileName': None},
+        ]
+        args = ('prefix', 'delimiter', 2, 'start_name',)
+        files = list(bucket.all_files(*args))
+        self.assertEqual([bucket_file.name for bucket_file in files], list(names))
+        for bucket_file in files:
             self.assertTrue(isinstance(bucket_file, File))
             self.assertIs(bucket_file._api, self.mock_api)
-            self.assertEqual(bucket_file.name, names[index])
-        bucket.files.assert_called_with(*args)
-        bucket.more_files.assert_called()
-        self.assertEqual(index, len(names) - 1)
+        self.mock_api.list_files.assert_has_calls([
+            call('prefix', 'delimiter', 2, 'start_name', 'bucket_id'),
+            call('prefix', 'delimiter', 2, 'f3', 'bucket_id')])
     # endregion
 
     # region Bucket.folder() tests
@@ -276,6 +278,17 @@ class BucketTests(TestCase):
         self.assertIs(file_._api, self.mock_api)  # pylint: disable = protected-access
         self.assertEqual(file_.name, file_name)
 
+    def test_file__indexed__retrieves_file_without_requests(self):
+        """ Tests retrieving a file from the bucket's index. """
+        bucket = Bucket(self.mock_api, {})
+        bucket.files = MagicMock()
+        bucket.index = MagicMock()
+        bucket.index.get.return_value = {'fileName': 'file_name'}
+        file_ = bucket.file(file_name='file_name')
+        bucket.index.get.assert_called_with('file_name')
+        bucket.files.assert_not_called()
+        self.assertEqual(file_.name, 'file_name')
+
     def test_file__retrieve_by_id_failure__raises_file_error(self):
         """ Tests failure when retrieving a file by its name. """
         self.mock_api.get_file_info.side_effect = ResponseError
@@ -297,6 +310,35 @@ class BucketTests(TestCase):
         bucket = Bucket(self.mock_api, {'bucketId': bucket_id})
         bucket.delete()
         self.mock_api.delete_bucket.assert_called_with(bucket.id)
+
+    def test_delete__empty__deletes_versions_first(self):
+        """ Emptying deletes every version and the bucket is kept if any deletion fails. """
+        bucket = Bucket(self.mock_api, {'bucketId': 'bucket_id', 'bucketName': 'name'})
+        self.mock_api.list_file_versions.return_value = {'files': [
+            {'fileName': 'a', 'fileId': 'a1', 'action': 'upload'},
+            {'fileName': 'b', 'fileId': 'b1', 'action': 'upload'},
+        ], 'nextFileName': None}
+        self.mock_api.delete_file.side_effect = [{}, RequestError('denied', 401, 'unauthorized')]
+        self.assertRaises(BucketError, bucket.delete, empty=True, workers=1)
+        self.mock_api.delete_bucket.assert_not_called()
+        self.mock_api.delete_file.side_effect = None
+        bucket.delete(empty=True)
+        self.mock_api.delete_bucket.assert_called_once_with('bucket_id')
+    # endregion
+
+    # region Bucket.download_urls() tests
+    def test_download_urls__private_bucket__signed_in_bulk(self):
+        """ Private URLs are signed in bulk by the api, public ones are not signed. """
+        files = [File(self.mock_api, None, {'fileName': name}) for name in ('a/1', 'a/2')]
+        bucket = Bucket(self.mock_api, {'bucketId': 'id', 'bucketName': 'name',
+                                        'bucketType': 'allPrivate'})
+        self.mock_api.download_urls.return_value = ['url1', 'url2']
+        self.assertEqual(bucket.download_urls(files, 60), ['url1', 'url2'])
+        self.mock_api.download_urls.assert_called_once_with(['a/1', 'a/2'], 60, 'name', 'id')
+        bucket.type = BucketType.public
+        bucket.download_urls(files)
+        self.mock_api.download_url_path.assert_called_with('a/2', bucket_name='name')
+        self.mock_api.download_urls.assert_called_once()
     # endregion
 
     # region Bucket.upload() tests
@@ -313,7 +355,7 @@ class BucketTests(TestCase):
         args = (Path(), 'upload', True, 0)
         for iteration, expected in zip(bucket.upload_iter(*args), iter_data):
             self.assertEqual(iteration, expected)
-        self.mock_api.upload.assert_called_with(*args, bucket.id)
+        self.mock_api.upload.assert_called_with(*args, bucket.id, False)
 
     def test_upload__upload_success(self):
         """ Tests uploading a file to the bucket. """
@@ -332,7 +374,7 @@ class BucketTests(TestCase):
         self.assertEqual(file.bucket, bucket)
         self.assertEqual(file.id, file_info['fileId'])
         self.assertEqual(file.name, file_info['fileName'])
-        self.mock_api.upload.assert_called_with(*args, bucket.id)
+        self.mock_api.upload.assert_called_with(*args, bucket.id, False)
     # endregion
 
 class FileTests(TestCase):
@@ -379,6 +421,50 @@ class FileTests(TestCase):
         self.assertTrue(File(None, None, {'action': FileAction.folder.value}).is_folder)
         self.assertTrue(File(None, None, {}).is_folder)
         self.assertFalse(File(None, None, {'fileId': 'file_id'}).is_folder)
+
+    def test_lazy_fields__decoded_on_access(self):
+        """ Tests that fields are read from the file data without a per-instance __dict__. """
+        data = dict(Responses.get_file_info.value.dict, uploadTimestamp=1557200412000)
+        b2file = File(None, None, data)
+        self.assertFalse(hasattr(b2file, '__dict__'))
+        self.assertIs(b2file.data, data)
+        self.assertEqual(b2file.sha1, data['contentSha1'])
+        self.assertEqual(b2file.upload_time.timestamp(), data['uploadTimestamp'] / 1000)
+
+    def test_fields__assigned__data_copied(self):
+        """ Tests that fields can be assigned without modifying the data they were read from. """
+        data = {'fileId': 'file_id', 'fileName': 'name', 'action': 'upload'}
+        b2file = File(None, None, data)
+        b2file.name = 'new name'
+        b2file.action = FileAction.hide
+        self.assertEqual((b2file.name, b2file.action, b2file.id),
+                         ('new name', FileAction.hide, 'file_id'))
+        self.assertEqual(data, {'fileId': 'file_id', 'fileName': 'name', 'action': 'upload'})
+    # endregion
+
+    # region FilePage tests
+    def test_file_page__columns_rebuild_files(self):
+        """ Tests that a page stores its files in columns and rebuilds them on demand. """
+        data = Responses.get_file_info.value.dict
+        bucket = MagicMock()
+        bucket.id = data['bucketId']
+        page = FilePage(self.mock_api, bucket, [data, {'fileName': 'folder/', 'action': 'folder'}],
+                        'next')
+        self.assertEqual(len(page), 2)
+        self.assertEqual(page.names, [data['fileName'], 'folder/'])
+        self.assertEqual(page.total_size, data['contentLength'])
+        expected = dict(data, uploadTimestamp=-1)
+        del expected['accountId']
+        self.assertEqual(page[0].data, expected)
+        self.assertEqual([b2file.is_folder for b2file in page], [False, True])
+        self.assertEqual(page.action(1), FileAction.folder)
+
+    def test_file_page__unknown_action__stored_as_null(self):
+        """ Tests that files with actions unknown to FileAction do not break the page. """
+        page = FilePage(self.mock_api, None, [{'fileName': 'a', 'action': 'unknown'}])
+        self.assertEqual(page.action(0), FileAction.null)
+        self.assertEqual(page[0].name, 'a')
+        self.assertEqual(File(None, None, {'action': 'unknown'}).action, FileAction.null)
     # endregion
 
     # region File.download_url() tests
@@ -415,10 +501,10 @@ class FileTests(TestCase):
         path = Path(__file__)
         download_url = 'download url'
         b2file = File(self.mock_api, self.mock_bucket, {})
-        b2file.download_url = MagicMock()
-        b2file.download_url.return_value = download_url
-        b2file.download(path)
-        self.mock_api.download_file.assert_called_with(download_url, path)
+        with patch.object(File, 'download_url', return_value=download_url):
+            b2file.download(path)
+        self.mock_api.download_file.assert_called_with(download_url, path, ONE_MB, 0,
+                                                        HUNDRED_MB, resume=False)
 
     def test_download__path_is_dir__appends_filename_and_downloads_file(self):
         """ Tests that download appends a name to the path if the path points to a directory. """
@@ -426,10 +512,22 @@ class FileTests(TestCase):
         download_url = 'download url'
         name = 'file name'
         b2file = File(self.mock_api, self.mock_bucket, {'fileName': name})
-        b2file.download_url = MagicMock()
-        b2file.download_url.return_value = download_url
-        b2file.download(path)
-        self.mock_api.download_file.assert_called_with(download_url, path / name)
+        with patch.object(File, 'download_url', return_value=download_url):
+            b2file.download(path)
+        self.mock_api.download_file.assert_called_with(download_url, path / name, ONE_MB, 0,
+                                                        HUNDRED_MB, resume=False)
+    # endregion
+
+    # region File.iter_content() tests
+    def test_iter_content__yields_downloaded_chunks(self):
+        """ Tests that the content is streamed from the file's download url. """
+        download_url = 'download url'
+        chunks = [b'a', b'b']
+        self.mock_api.iter_download.return_value = iter(chunks)
+        b2file = File(self.mock_api, self.mock_bucket, {})
+        with patch.object(File, 'download_url', return_value=download_url):
+            self.assertEqual(list(b2file.iter_content(2)), chunks)
+        self.mock_api.iter_download.assert_called_with(download_url, 2)
     # endregion
 
     # region File.delete() tests
@@ -440,3 +538,21 @@ class FileTests(TestCase):
         b2file.delete()
         self.mock_api.delete_file.assert_called_with(data['fileId'], data['fileName'])
     # endregion
+
+    # region File.copy_to() tests
+    def test_copy_to__defaults__copies_to_same_bucket_and_name(self):
+        """ Tests that a copy keeps the bucket and name of the file unless others are given. """
+        data = Responses.get_file_info.value.dict
+        self.mock_bucket.id = data['bucketId']
+        self.mock_api.copy.return_value = dict(data, fileId='copy_id', action='copy')
+        b2file = File(self.mock_api, self.mock_bucket, data)
+        copy = b2file.copy_to()
+        self.mock_api.copy.assert_called_with(data, data['fileName'], data['bucketId'], None,
+                                              None, 0)
+        self.assertEqual(copy.id, 'copy_id')
+        self.assertIs(copy.action, FileAction.copy)
+        self.assertIs(copy.bucket, self.mock_bucket)
+        other = MagicMock()
+        b2file.copy_to(other, 'other name', 'text/plain')
+        self.mock_api.copy.assert_called_with(data, 'other name', other.id, 'text/plain', None, 0)
+    # endregion
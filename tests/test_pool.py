@@ -0,0 +1,71 @@
+""" Tests the blaziken.pool package. """
+# Built-in imports
+from unittest import TestCase
+from unittest.mock import MagicMock
+# Project imports
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.pool import UploadUrlPool
+
+
+class UploadUrlPoolTests(TestCase):
+    """ Tests methods of the UploadUrlPool class. """
+
+    def setUp(self):
+        """ Sets up an api mock that gives a new upload URL at each call. """
+        self.mock_api = MagicMock()
+        self.mock_api.request_upload_url.side_effect = lambda bucket_id: {
+            'bucketId': bucket_id,
+            'uploadUrl': f'url{self.mock_api.request_upload_url.call_count}',
+            'authorizationToken': 'token',
+        }
+        self.pool = UploadUrlPool(self.mock_api)
+
+    def test_checkout__success__url_reused(self):
+        """ A URL is returned to the pool after a successful upload and reused by the next one. """
+        with self.pool.checkout('bucket') as first:
+            pass
+        with self.pool.checkout('bucket') as second:
+            pass
+        self.assertIs(first, second)
+        self.mock_api.request_upload_url.assert_called_once_with('bucket')
+        self.assertEqual(len(self.pool), 1)
+
+    def test_checkout__concurrent_uploads__different_urls(self):
+        """ A URL is checked out to a single uploader at a time. """
+        with self.pool.checkout('bucket') as first:
+            with self.pool.checkout('bucket') as second:
+                self.assertNotEqual(first['uploadUrl'], second['uploadUrl'])
+        self.assertEqual(len(self.pool), 2)
+
+    def test_checkout__buckets_do_not_share_urls(self):
+        """ URLs of a bucket are not used to upload to other buckets. """
+        with self.pool.checkout('bucket1'):
+            pass
+        with self.pool.checkout('bucket2') as upload_data:
+            self.assertEqual(upload_data['bucketId'], 'bucket2')
+
+    def test_checkout__invalidating_error__url_discarded(self):
+        """ URLs failing with 401, 503 or connection errors are not returned to the pool. """
+        for error in (RequestError('', 401), RequestError('', 503), InternetError()):
+            with self.assertRaises(type(error)):
+                with self.pool.checkout('bucket'):
+                    raise error
+            self.assertEqual(len(self.pool), 0)
+
+    def test_checkout__other_error__url_returned(self):
+        """ Errors that do not invalidate the URL (e.g.: bad file name) return it to the pool. """
+        with self.assertRaises(RequestError):
+            with self.pool.checkout('bucket'):
+                raise RequestError('', 400)
+        self.assertEqual(len(self.pool), 1)
+
+    def test_clear__urls_discarded(self):
+        """ Clearing the pool discards the URLs of a bucket or of all buckets. """
+        for bucket_id in ('bucket1', 'bucket2'):
+            with self.pool.checkout(bucket_id):
+                pass
+        self.pool.clear('bucket1')
+        self.assertEqual(len(self.pool), 1)
+        self.pool.clear()
+        self.assertEqual(len(self.pool), 0)
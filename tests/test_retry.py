@@ -0,0 +1,91 @@
+""" Tests the blaziken.retry package. """
+# Built-in imports
+from email.utils import formatdate
+from time import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+# Third-party imports
+from requests.exceptions import ConnectTimeout
+from requests.exceptions import ReadTimeout
+# Project imports
+from blaziken.exceptions import InternetError
+from blaziken.exceptions import RequestError
+from blaziken.retry import RetryBudget
+from blaziken.retry import RetryPolicy
+
+API_URL = 'https://api000.backblazeb2.com/b2api/v2'
+UPLOAD_URL = 'https://pod-000-1000-00.backblaze.com/b2api/v2/b2_upload_file/bucket/c000'
+
+
+class RetryBudgetTests(TestCase):
+    """ Tests methods of the RetryBudget class. """
+
+    def test_withdraw__reserve_spent__refilled_by_requests(self):
+        """ Retries are allowed in bursts up to the reserve and then at the configured ratio. """
+        budget = RetryBudget(ratio=0.5, reserve=2)
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        for _ in range(10):
+            budget.deposit()
+        self.assertEqual(budget.tokens, 2)
+
+
+class RetryPolicyTests(TestCase):
+    """ Tests methods of the RetryPolicy class. """
+
+    def test_is_retryable__statuses_and_idempotency(self):
+        """ Rejected requests are always retried, ambiguous failures only if idempotent. """
+        policy = RetryPolicy()
+        busy = RequestError('busy', 503)
+        internal = RequestError('internal', 500)
+        lost = InternetError('lost')
+        self.assertTrue(policy.is_retryable(busy, 'POST', f'{API_URL}/b2_hide_file'))
+        self.assertTrue(policy.is_retryable(RequestError('', 429), 'POST', f'{API_URL}/b2_x'))
+        self.assertFalse(policy.is_retryable(RequestError('', 400), 'GET', f'{API_URL}/b2_x'))
+        self.assertFalse(policy.is_retryable(internal, 'POST', f'{API_URL}/b2_hide_file'))
+        self.assertTrue(policy.is_retryable(internal, 'POST', f'{API_URL}/b2_list_file_names'))
+        self.assertFalse(policy.is_retryable(ReadTimeout(), 'POST', f'{API_URL}/b2_create_key'))
+        self.assertTrue(policy.is_retryable(ConnectTimeout(), 'POST', f'{API_URL}/b2_create_key'))
+        self.assertTrue(policy.is_retryable(lost, 'GET', 'https://f000.backblazeb2.com/file/a'))
+
+    def test_is_retryable__uploads__only_with_fresh_url(self):
+        """ Uploads are only retried by callers that use a new upload URL. """
+        policy = RetryPolicy()
+        self.assertFalse(policy.is_retryable(RequestError('', 503), 'POST', UPLOAD_URL))
+        self.assertTrue(policy.is_retryable(RequestError('', 503), 'POST', UPLOAD_URL, True))
+        self.assertTrue(policy.is_retryable(RequestError('', 401), 'POST', UPLOAD_URL, True))
+        self.assertFalse(policy.is_retryable(RequestError('', 400), 'POST', UPLOAD_URL, True))
+
+    def test_parse_retry_after__seconds_and_dates(self):
+        """ The Retry-After header can be a number of seconds or a date. """
+        self.assertEqual(RetryPolicy.parse_retry_after('3'), 3.0)
+        self.assertIsNone(RetryPolicy.parse_retry_after(None))
+        self.assertIsNone(RetryPolicy.parse_retry_after('soon'))
+        delay = RetryPolicy.parse_retry_after(formatdate(time() + 30, usegmt=True))
+        self.assertAlmostEqual(delay, 30, delta=2)
+
+    def test_backoff__full_jitter_bounded(self):
+        """ Delays are random up to the exponential bound, capped by the maximum delay. """
+        policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+        with patch('blaziken.retry.uniform', side_effect=lambda low, high: high):
+            self.assertEqual([policy.backoff(attempt) for attempt in range(5)], [1, 2, 4, 8, 10])
+
+    def test_next_delay__limits__gives_up_and_counts(self):
+        """ No delay is returned after the maximum retries or when the budget is exhausted. """
+        listener = MagicMock()
+        policy = RetryPolicy(max_retries=2, budget=RetryBudget(reserve=1))
+        policy.add_retry_listener(listener)
+        error = RequestError('busy', 503)
+        self.assertIsNotNone(policy.next_delay(error, 0))
+        self.assertIsNone(policy.next_delay(error, 1))  # Budget exhausted
+        self.assertIsNone(policy.next_delay(error, 2))  # Too many retries
+        self.assertIsNone(policy.next_delay(error, 0, headers={'Retry-After': '3600'}))
+        self.assertEqual((policy.retries, policy.exhausted), (1, 3))
+        listener.assert_called_once()
+        self.assertEqual(listener.call_args.args[0].attempt, 1)
@@ -0,0 +1,145 @@
+""" Tests the blaziken.sync package. """
+# Built-in imports
+from hashlib import sha1
+from json import dumps as json_dumps
+from os import utime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock
+# Project imports
+from blaziken import BackBlazeB2
+from blaziken.enums import SyncAction
+from blaziken.sync import Sync
+from blaziken.sync import walk_sorted
+
+
+class SyncTests(TestCase):
+    """ Tests the merge of the local and remote listings done by the Sync class. """
+
+    def setUp(self):
+        """ Sets up a local directory and an api mock that lists files from a dict. """
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.directory = Path(self.temp_dir.name)
+        self.remote = {}
+        self.mock_api = MagicMock()
+        self.mock_api.append_filename.side_effect = lambda prefix, name: f'{prefix}/{name}'
+        self.mock_api.list_files.side_effect = self.list_files
+        self.mock_api.upload_path.side_effect = lambda path, name, bucket_id: iter(
+            [({'fileName': name}, 0, 1)])
+
+    def list_files(self, prefix, delimiter, max_files, start_name, bucket_id):
+        """ Lists the remote files in name order, one page of max_files at a time. """
+        names = sorted(name for name in self.remote if name.startswith(prefix)
+                       and name >= start_name)
+        return {'files': [self.remote[name] for name in names[:max_files]],
+                'nextFileName': names[max_files] if len(names) > max_files else None}
+
+    def add_file(self, name, content, remote_content=None, modified=None):
+        """ Writes a local file and, optionally, its remote counterpart. """
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        utime(path, (1000, 1000))
+        if remote_content is not None:
+            self.add_remote(f'backup/{name}', remote_content, modified)
+
+    def add_remote(self, name, content, modified=None):
+        """ Adds a file to the remote listing. """
+        self.remote[name] = {
+            'fileId': f'id_{name}', 'fileName': name, 'action': 'upload',
+            'contentLength': len(content), 'contentSha1': sha1(content).hexdigest(),
+            'fileInfo': {'src_last_modified_millis': str(modified)} if modified else {}}
+
+    def test_walk_sorted__yields_files_in_b2_name_order(self):
+        """ Directories are sorted as if their names ended with the folder delimiter. """
+        for name in ('a/b', 'a.txt', 'a-b', 'b'):
+            self.add_file(name, b'')
+        self.assertEqual([name for name, _ in walk_sorted(self.directory)],
+                         ['a-b', 'a.txt', 'a/b', 'b'])
+
+    def test_iter__uploads_only_new_or_changed_files(self):
+        """ Files with the same modification time or SHA1 are skipped, others are uploaded. """
+        self.add_file('new.txt', b'new')
+        self.add_file('same_time.txt', b'data', b'data', 1000000)
+        self.add_file('same_sha1.txt', b'data', b'data', 5)
+        self.add_file('sub/changed.txt', b'data', b'diff', 5)
+        self.add_file('sub/resized.txt', b'data', b'larger', 1000000)
+        sync = Sync(self.mock_api, 'bucket_id', self.directory, 'backup', workers=2,
+                    page_size=2)
+        actions = {result.name: result.action for result in sync}
+        self.assertEqual(actions, {
+            'backup/new.txt': SyncAction.upload, 'backup/same_time.txt': SyncAction.skip,
+            'backup/same_sha1.txt': SyncAction.skip, 'backup/sub/changed.txt': SyncAction.upload,
+            'backup/sub/resized.txt': SyncAction.upload})
+        self.assertEqual(sync.stats.actions[SyncAction.upload], 3)
+        self.assertEqual(sync.stats.bytes, 11)
+        self.mock_api.hide_file.assert_not_called()
+
+    def test_iter__on_missing_hide__hides_remote_only_files(self):
+        """ Remote files that no longer exist locally are hidden. """
+        self.add_file('kept.txt', b'data', b'data', 1000000)
+        self.add_remote('backup/removed.txt', b'old')
+        self.add_remote('other/file.txt', b'old')
+        results = list(Sync(self.mock_api, 'bucket_id', self.directory, 'backup',
+                            on_missing=SyncAction.hide))
+        self.assertEqual(sorted((result.name, result.action) for result in results), [
+            ('backup/kept.txt', SyncAction.skip), ('backup/removed.txt', SyncAction.hide)])
+        self.mock_api.hide_file.assert_called_once_with('backup/removed.txt', 'bucket_id')
+
+    def test_iter__dry_run__changes_nothing(self):
+        """ A dry run reports the actions without uploading or deleting files. """
+        self.add_file('new.txt', b'new')
+        self.add_remote('backup/removed.txt', b'old')
+        results = list(Sync(self.mock_api, 'bucket_id', self.directory, 'backup',
+                            on_missing=SyncAction.delete, dry_run=True))
+        self.assertEqual(sorted(result.action.value for result in results), ['delete', 'upload'])
+        self.mock_api.upload_path.assert_not_called()
+        self.mock_api.delete_file.assert_not_called()
+
+    def test_iter__on_missing_delete__deletes_every_version(self):
+        """ Deleting a remote-only file deletes its versions behind hide markers too. """
+        self.add_remote('backup/removed.txt', b'old')
+        self.mock_api.list_file_versions.return_value = {'files': [
+            {'fileName': 'backup/removed.txt', 'fileId': 'id3', 'action': 'upload'},
+            {'fileName': 'backup/removed.txt', 'fileId': 'id2', 'action': 'hide'},
+            {'fileName': 'backup/removed.txt', 'fileId': 'id1', 'action': 'upload'},
+            {'fileName': 'backup/removed.txt.bak', 'fileId': 'id0', 'action': 'upload'},
+        ], 'nextFileName': None}
+        results = list(Sync(self.mock_api, 'bucket_id', self.directory, 'backup',
+                            on_missing=SyncAction.delete))
+        self.assertEqual([result.action for result in results], [SyncAction.delete])
+        self.assertTrue(results[0].ok)
+        self.assertEqual([call.args for call in self.mock_api.delete_file.call_args_list],
+                         [(file_id, 'backup/removed.txt') for file_id in ('id3', 'id2', 'id1')])
+        self.assertEqual(self.mock_api.list_file_versions.call_args.args[0], 'backup/removed.txt')
+
+    def test_iter__on_missing_delete_restricted_key__deletes_versions_of_name_only(self):
+        """ With a key restricted to a prefix, versions are found among all files of the prefix. """
+        self.add_remote('backup/removed.txt', b'old')
+        http = MagicMock()
+        http.post.return_value.content = json_dumps({'files': [
+            {'fileName': 'backup/a.txt', 'fileId': 'id_a', 'action': 'upload'},
+            {'fileName': 'backup/removed.txt', 'fileId': 'id2', 'action': 'upload'},
+            {'fileName': 'backup/removed.txt', 'fileId': 'id1', 'action': 'start'},
+            {'fileName': 'backup/z.txt', 'fileId': 'id_z', 'action': 'upload'},
+        ], 'nextFileName': None}).encode('utf8')
+        api = BackBlazeB2('key_id', 'app_key', http=http)
+        api.auth_token = 'auth_token'
+        api._use_restrictions({'allowed': {  # pylint: disable = protected-access
+            'bucketId': 'bucket_id', 'bucketName': 'bucket', 'namePrefix': 'backup/'}})
+        api.list_files = MagicMock(side_effect=self.list_files)
+        api.delete_file = MagicMock(return_value={'fileId': 'id2'})
+        api.cancel_large_file = MagicMock(return_value={'fileId': 'id1'})
+        results = list(Sync(api, 'bucket_id', self.directory, 'backup',
+                            on_missing=SyncAction.delete))
+        self.assertTrue(results[0].ok)
+        self.assertEqual(http.post.call_args.kwargs['json']['prefix'], 'backup/')
+        api.delete_file.assert_called_once_with('id2', 'backup/removed.txt')
+        api.cancel_large_file.assert_called_once_with('id1')
+
+    def test_init__invalid_missing_action__raises_value_error(self):
+        """ Only skip, hide and delete are valid for missing files. """
+        self.assertRaises(ValueError, Sync, self.mock_api, 'bucket_id', self.directory,
+                          on_missing=SyncAction.upload)
@@ -2,10 +2,19 @@
 # Meta imports
 from __future__ import annotations
 # Built-in imports
+from hashlib import sha1
+from io import BytesIO
+from tempfile import TemporaryFile
+from threading import Lock
 from unittest import TestCase
 from unittest.mock import MagicMock
 # Project imports
 from blaziken import utils
+from blaziken.constants import FIVE_GB
+from blaziken.constants import HUNDRED_MB
+from blaziken.constants import MAX_LARGE_FILE_PARTS
+from blaziken.constants import ONE_GB
+from blaziken.constants import ONE_MB
 from blaziken.exceptions import RequestError
 from blaziken.exceptions import ResponseError
 
@@ -42,8 +51,11 @@ class UtilsTests(TestCase):
         """ The check_response_error() raises a RequestError if an error is found. """
         response = MagicMock()
         response.status_code = 400
-        response.text = '{"message": "foo", "code": 1, "status": 400}'
-        self.assertRaises(RequestError, utils.check_response_error, response)
+        response.text = '{"message": "foo", "code": "bad_request", "status": 400}'
+        with self.assertRaises(RequestError) as context:
+            utils.check_response_error(response)
+        self.assertEqual(context.exception.status, 400)
+        self.assertEqual(context.exception.code, 'bad_request')
     # endregion
 
     # region check_b2_errors() tests
@@ -61,3 +73,88 @@ class UtilsTests(TestCase):
         except ResponseError as error:
             self.assertEqual(str(error), message)
     # endregion
+
+    # region read_range() tests
+    def test_read_range__file_descriptor__reads_without_moving_position(self):
+        """ Positional reads must not depend on nor change the position of the file. """
+        with TemporaryFile() as file_handle:
+            file_handle.write(b'0123456789')
+            file_handle.seek(3)
+            self.assertEqual(utils.read_range(file_handle, 5, 3), b'567')
+            self.assertEqual(utils.read_range(file_handle, 8, 10), b'89')
+            self.assertEqual(file_handle.tell(), 3)
+
+    def test_read_range__no_file_descriptor__seeks_and_reads(self):
+        """ File-like objects without a file descriptor are read by seeking. """
+        self.assertEqual(utils.read_range(BytesIO(b'0123456789'), 2, 4, Lock()), b'2345')
+    # endregion
+
+    # region FileRange tests
+    def test_file_range__reads_only_its_range(self):
+        """ A FileRange reads, seeks and measures only the bytes of its range. """
+        file_range = utils.FileRange(BytesIO(b'0123456789'), 2, 5)
+        self.assertEqual(len(file_range), 5)
+        self.assertEqual(file_range.read(2), b'23')
+        self.assertEqual(file_range.tell(), 2)
+        self.assertEqual(file_range.read(), b'456')
+        self.assertEqual(file_range.read(), b'')
+        file_range.seek(-1, 2)
+        self.assertEqual(file_range.read(10), b'6')
+
+    def test_file_range__sha1_streamed(self):
+        """ The sha1 of the range is computed in blocks without moving the position. """
+        file_range = utils.FileRange(BytesIO(b'0123456789'), 2, 5)
+        self.assertEqual(file_range.sha1(block_size=2), sha1(b'23456').hexdigest())
+        self.assertEqual(utils.content_sha1(file_range), sha1(b'23456').hexdigest())
+        self.assertEqual(utils.content_sha1(b'23456'), sha1(b'23456').hexdigest())
+        self.assertEqual(file_range.tell(), 0)
+    # endregion
+
+    # region JsonArrayStream tests
+    def test_json_array_stream__any_chunk_size__yields_items_and_fields(self):
+        """ The items are parsed regardless of how the response is split into chunks. """
+        body = '{"files": [{"fileName": "a", "size": 1}, {"fileName": "é/b"}], ' \
+               '"nextFileName": "c"}'.encode()
+        for size in (1, 3, len(body)):
+            chunks = (body[i:i + size] for i in range(0, len(body), size))
+            stream = utils.JsonArrayStream(chunks, 'files')
+            self.assertEqual(list(stream), [{'fileName': 'a', 'size': 1}, {'fileName': 'é/b'}])
+            self.assertEqual(stream.fields, {'nextFileName': 'c'})
+
+    def test_json_array_stream__truncated_body__raises_value_error(self):
+        """ A response that ends before the array is complete is an error. """
+        with self.assertRaises(ValueError):
+            list(utils.JsonArrayStream(iter([b'{"files": [{"fileName": "a"}, ']), 'files'))
+
+    def test_json_decode__bytes__decoded(self):
+        """ The json_decode() accepts the raw bytes of a response. """
+        self.assertEqual(utils.json_decode(b'{"a": [1, "\xc3\xa9"]}'), {'a': [1, 'é']})
+    # endregion
+
+    # region plan_upload_parts() tests
+    def test_plan_upload_parts__small_file__single_request(self):
+        """ Files that can't be split in parts worth their requests are uploaded at once. """
+        self.assertEqual(utils.plan_upload_parts(20 * ONE_MB, workers=4)[1], 1)
+        self.assertEqual(utils.plan_upload_parts(99 * ONE_MB)[1], 1)
+        self.assertEqual(utils.plan_upload_parts(0)[1], 1)
+
+    def test_plan_upload_parts__medium_file__split_for_workers(self):
+        """ Files smaller than a part per worker are split to upload them in parallel. """
+        self.assertEqual(utils.plan_upload_parts(250 * ONE_MB, workers=4),
+                         (250 * ONE_MB, 4, 250 * ONE_MB // 4))
+        self.assertEqual(utils.plan_upload_parts(60 * ONE_MB, workers=4)[1:], (3, 20 * ONE_MB))
+        self.assertEqual(utils.plan_upload_parts(400 * ONE_MB, workers=4)[1:], (4, HUNDRED_MB))
+
+    def test_plan_upload_parts__above_recommended__balanced_parts(self):
+        """ A file slightly larger than the recommended part is split in halves. """
+        size = HUNDRED_MB + ONE_MB
+        self.assertEqual(utils.plan_upload_parts(size), (size, 2, size // 2))
+
+    def test_plan_upload_parts__huge_file__parts_limit_respected(self):
+        """ The parts grow to keep the number of parts within the limit, up to 5GB. """
+        size, parts, part_size = utils.plan_upload_parts(2 * 1024 * ONE_GB, workers=8)
+        self.assertEqual(parts, MAX_LARGE_FILE_PARTS)
+        self.assertGreaterEqual(parts * part_size, size)
+        with self.assertRaises(ValueError):
+            utils.plan_upload_parts(MAX_LARGE_FILE_PARTS * FIVE_GB + 1)
+    # endregion